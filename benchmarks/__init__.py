@@ -0,0 +1,6 @@
+"""
+Benchmarks for the hot paths of the game
+
+Each module in this package can be run from the game folder, for example:
+    python -m benchmarks.sprite_cache
+"""
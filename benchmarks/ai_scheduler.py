@@ -0,0 +1,81 @@
+"""
+Benchmark for monster moves with and without the AI scheduler
+
+Plays the same frames twice for each number of monsters: once moving every monster on every
+second arrow key press (the old way) and once with a gameAI.AIScheduler, and reports the time
+spent on monsters each frame. Moving everything at once makes the frames where the player
+moves much slower than the rest; the scheduler spreads the same work over every frame and
+never spends more than its budget in one. The scheduler's clock is the frame count at 30
+frames a second, so both runs see the same game time.
+
+Typical usage example:
+    python -m benchmarks.ai_scheduler --monsters 1000 10000 50000 --frames 300
+"""
+import argparse
+import random
+import statistics
+import time
+
+import gameAI
+import gameGraphics
+import gameSpatial
+
+def make_monsters(count):
+    random.seed(1)
+    monsters = [gameGraphics.WanderingMonster() for i in range(count)]
+    occupancy = gameSpatial.OccupancyGrid()
+    occupancy.sync(monsters)
+    occupancy.move(gameSpatial.PLAYER, [0, 0])
+    return monsters, occupancy
+
+def play(count, frames, keyEvery, scheduler):
+    monsters, occupancy = make_monsters(count)
+    player = [0, 0]
+
+    def move(monster):
+        monster.move(occupancy, gameGraphics.blockOccupiedCells)
+
+    times = []
+    moves = 0
+    presses = 0
+    for frame in range(frames):
+        start = time.perf_counter()
+        if scheduler is not None:
+            moves += scheduler.update(monsters, player, move)
+        elif frame % keyEvery == 0:
+            presses += 1
+            if presses % 2 == 0:
+                for monster in monsters:
+                    move(monster)
+                moves += len(monsters)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.mean(times), times[int(0.99 * len(times))], times[-1], moves / frames
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--monsters', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--key-every', type=int, default=4, help='frames between arrow key presses')
+    parser.add_argument('--budget', type=float, default=0.002, help='seconds a frame may spend on monsters')
+    parser.add_argument('--buckets', type=int, default=4)
+    parser.add_argument('--wake-radius', type=int, default=None, help='cells from the player beyond which monsters sleep')
+    args = parser.parse_args()
+
+    print(f'{"monsters":>9} {"way":>10} {"mean ms":>8} {"p99 ms":>8} {"max ms":>8} {"moves/frame":>12} {"sleeping":>9} {"dropped":>8}')
+    for count in args.monsters:
+        mean, p99, worst, moves = play(count, args.frames, args.key_every, None)
+        print(f'{count:>9} {"every key":>10} {mean:>8.2f} {p99:>8.2f} {worst:>8.2f} {moves:>12.0f} {0:>9} {0:>8}')
+        frame = [0]
+
+        def clock():
+            frame[0] += 1
+            return frame[0] / 30
+
+        scheduler = gameAI.AIScheduler(buckets=args.buckets, budget=args.budget, wakeRadius=args.wake_radius, clock=clock)
+        mean, p99, worst, moves = play(count, args.frames, args.key_every, scheduler)
+        stats = scheduler.stats()
+        print(f'{count:>9} {"scheduler":>10} {mean:>8.2f} {p99:>8.2f} {worst:>8.2f} {moves:>12.0f} {stats["sleeping"]:>9} {stats["dropped"]:>8}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark for frame pacing while the console menus are open
+
+Plays a number of rounds of "walk on the map, then spend some time in the menu", once with the
+blocking gameGraphics.main path and once with gameLoop.GameLoop, and reports the time between
+frames. With the blocking path the window gets no frames at all while the menu is open, so the
+longest gap is as long as the menu visit. A helper thread stands in for the player, pressing
+arrow keys and then 'm'. Runs with SDL's dummy video driver, so no window is opened.
+
+Typical usage example:
+    python -m benchmarks.async_loop --rounds 5 --menu-seconds 0.5
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import gameGraphics
+import gameLoop
+
+def press_keys(stop, delay):
+    # Walk right and left a few times, then open the menu, over and over
+    keys = [pygame.K_RIGHT, pygame.K_RIGHT, pygame.K_LEFT, pygame.K_LEFT, pygame.K_m]
+    index = 0
+    while not stop.is_set():
+        time.sleep(delay)
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=keys[index % len(keys)]))
+        index += 1
+
+def rounds_flow(rounds, menuSeconds, monsters):
+    def flow(playMap):
+        for round in range(rounds):
+            option, monster = playMap(monsters)
+            # Reading the menu and typing an answer
+            time.sleep(menuSeconds)
+    return flow
+
+def run_blocking(rounds, menuSeconds, monsters, renderer):
+    # The old path has no frames while the menu is open; time each map visit and each menu visit
+    gaps = []
+    for round in range(rounds):
+        gameGraphics.running = True
+        renderer.run(monsters)
+        start = time.perf_counter()
+        time.sleep(menuSeconds)
+        gaps.append((time.perf_counter() - start) * 1000)
+    return gaps
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--menu-seconds', type=float, default=0.5)
+    parser.add_argument('--monsters', type=int, default=10)
+    parser.add_argument('--key-delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    # Keep the monsters off the player's starting cell so no fight starts
+    monsters = [gameGraphics.WanderingMonster() for i in range(args.monsters)]
+    for monster in monsters:
+        monster.move = lambda occupancy=None, blocking=False, paths=None: None
+        monster.position = [gameGraphics.gridSize - 1, gameGraphics.gridSize - 1]
+
+    stop = threading.Event()
+    typist = threading.Thread(target=press_keys, args=(stop, args.key_delay), daemon=True)
+    pygame.init()
+    typist.start()
+
+    renderer = gameGraphics.GameRenderer()
+    blockingGaps = run_blocking(args.rounds, args.menu_seconds, monsters, renderer)
+    renderer.close()
+
+    loop = gameLoop.GameLoop(gameGraphics.GameRenderer())
+    asyncio.run(loop.run(rounds_flow(args.rounds, args.menu_seconds, monsters)))
+    stop.set()
+
+    stats = loop.frame_stats()
+    print(f'{"path":>9} {"phase":>5} {"frames":>7} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8}')
+    print(f'{"blocking":>9} {"menu":>5} {0:>7} {"-":>8} {"-":>8} {max(blockingGaps):>8.1f}')
+    for phase in (gameLoop.MAP, gameLoop.MENU):
+        phaseStats = stats[phase]
+        print(f'{"async":>9} {phase:>5} {phaseStats["frames"]:>7} {phaseStats["p50"]:>8.1f} {phaseStats["p99"]:>8.1f} {phaseStats["max"]:>8.1f}')
+
+if __name__ == '__main__':
+    main()
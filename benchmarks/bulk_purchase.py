@@ -0,0 +1,63 @@
+"""
+Benchmark for crediting large purchases to an inventory
+
+Adds the items of a bulk purchase the way shop_menu used to (one copied dictionary appended per
+unit) and through add_item_to_inventory with a stacked gameEntities.Inventory, then uses one
+item of each kind. Reports the time and memory each takes.
+
+Typical usage example:
+    python -m benchmarks.bulk_purchase --quantities 1000 100000 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import gameEntities
+import gamefunctions
+
+POTION = {'name': 'Potion', 'type': 'consumable', 'price': 100}
+SWORD = {'name': 'Sword', 'type': 'weapon', 'price': 15, 'power': 10, 'maxDurability': 100, 'currentDurability': 80}
+
+def buy_into_list(quantity):
+    inventory = []
+    for number in range(quantity):
+        inventory.append(POTION.copy())
+    for number in range(quantity):
+        inventory.append(SWORD.copy())
+    # fight_monster used to rebuild these lists and remove from the flat list
+    consumables = [item for item in inventory if item['type'] == 'consumable']
+    inventory.remove(consumables[-1])
+    weapons = [item for item in inventory if item['type'] == 'weapon']
+    inventory.remove(weapons[-1])
+    return inventory
+
+def buy_into_inventory(quantity):
+    inventory = gameEntities.Inventory()
+    gamefunctions.add_item_to_inventory(inventory, gameEntities.make_item('Potion'), quantity)
+    gamefunctions.add_item_to_inventory(inventory, gameEntities.make_item('Sword', currentDurability=80), quantity)
+    inventory.remove(inventory.consumables()[-1])
+    inventory.wear(inventory.weapons()[-1], 10)
+    return inventory
+
+def measure(buy, quantity):
+    tracemalloc.start()
+    start = time.perf_counter()
+    inventory = buy(quantity)
+    elapsed = time.perf_counter() - start
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quantities', type=int, nargs='+', default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f'{"quantity":>9} {"list ms":>9} {"list MB":>8} {"stacked ms":>11} {"stacked MB":>11}')
+    for quantity in args.quantities:
+        listTime, listMemory = measure(buy_into_list, quantity)
+        stackTime, stackMemory = measure(buy_into_inventory, quantity)
+        print(f'{quantity:>9} {listTime:>9.1f} {listMemory:>8.1f} {stackTime:>11.3f} {stackMemory:>11.3f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmark for resolving fights with the headless combat engine
+
+Runs seeded fights between random_monster draws with each built-in strategy and reports
+fights per second and per minute, with the event log on and off.
+
+Typical usage example:
+    python -m benchmarks.combat --fights 100000
+"""
+import argparse
+import random
+import time
+
+import gameCombat
+import gamefunctions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fights', type=int, default=50000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    pairs = [(gamefunctions.random_monster(), gamefunctions.random_monster()) for i in range(1000)]
+    sword = {'name': 'Sword', 'type': 'weapon', 'price': 15, 'power': 10, 'maxDurability': 100, 'currentDurability': 100}
+    potion = {'name': 'Potion', 'type': 'consumable', 'price': 100}
+    print(f'{"strategy":>8} {"record":>7} {"fights/s":>10} {"fights/min":>12}')
+    for strategy in gameCombat.STRATEGIES:
+        for record in (True, False):
+            rng = random.Random(args.seed)
+            start = time.perf_counter()
+            for fight in range(args.fights):
+                player, enemy = pairs[fight % len(pairs)]
+                player = dict(player, inventory=[dict(sword), potion])
+                gameCombat.simulate_fight(player, dict(enemy), strategy, rng, record)
+            rate = args.fights / (time.perf_counter() - start)
+            print(f'{strategy:>8} {str(record):>7} {rate:>10.0f} {rate * 60:>12.0f}')
+
+if __name__ == '__main__':
+    main()
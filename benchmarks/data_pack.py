@@ -0,0 +1,132 @@
+"""
+Per-worker startup time and memory of the game data, read from JSON against the mapped pack
+
+Writes a large synthetic species and item table to a temporary folder and compiles it with
+gameData. Then, for each worker count, starts that many fresh worker processes at once. Every
+worker loads the tables the way each process used to, by reading the JSON into records and
+dictionaries by name, or maps the compiled pack with gameData.GameData. It then does a number
+of lookups by name and by number, spread over the whole table or, with --hot, over its first
+entries only (a working set, like the species that spawn in one area).
+
+The table shows the mean load time and lookup time per worker, and how much each worker's
+memory grew: RSS, PSS (shared pages split between the processes that map them) and private
+pages. Memory is read from /proc while all the workers are still alive, so it is only
+reported on Linux.
+
+Typical usage example:
+    python -m benchmarks.data_pack --species 20000 --items 5000 --workers 1 4
+    python -m benchmarks.data_pack --workers 1 --hot 4500
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+import gameData
+
+WORDS = ['lone', 'mighty', 'fearsome', 'menacing', 'goblin', 'dragon', 'ogre', 'troll', 'rushes', 'soars', 'lumbers', 'grunts',
+         'dagger', 'flames', 'club', 'rock', 'shadow', 'quickly', 'above', 'towards']
+
+def write_sources(folder, speciesCount, itemCount, seed):
+    # Writes species.json and items.json shaped like the game's own, and returns their paths
+    import json
+
+    rng = random.Random(seed)
+    species = [{'name': f'Beast {number:06d}', 'description': ' '.join(rng.choice(WORDS) for word in range(24)),
+                'health': [10, rng.randint(10, 100)], 'power': [5, rng.randint(5, 80)], 'money': [1, rng.randint(1, 1000)],
+                'moveRate': rng.choice([0.5, 1.0, 1.5, 2.0]), 'hostile': rng.random() < 0.5} for number in range(speciesCount)]
+    items = [{'name': f'Item {number:06d}', 'type': 'weapon', 'price': rng.randint(1, 500), 'power': rng.randint(1, 50),
+              'maxDurability': 100, 'description': ' '.join(rng.choice(WORDS) for word in range(12)),
+              'shop': {'durability': [30, 100]}} for number in range(itemCount)]
+    sources = {'species': os.path.join(folder, 'species.json'), 'items': os.path.join(folder, 'items.json')}
+    for table, entries in (('species', species), ('items', items)):
+        with open(sources[table], 'w') as file:
+            json.dump(entries, file)
+    return sources
+
+def memory():
+    # Returns (rss, pss, private) in bytes for this process, or None where /proc is not available
+    try:
+        with open('/proc/self/smaps_rollup') as file:
+            fields = dict(line.split(':', 1) for line in file if ':' in line and not line[0].isdigit())
+    except OSError:
+        return None
+    size = {name: int(value.split()[0]) * 1024 for name, value in fields.items()}
+    return size['Rss'], size['Pss'], size['Private_Clean'] + size['Private_Dirty']
+
+def worker(mode, pack, sources, speciesCount, itemCount, lookups, barrier, results):
+    before = memory()
+    start = time.perf_counter()
+    if mode == 'json':
+        species = gameData.read_species(sources['species'])
+        items = gameData.read_items(sources['items'])
+        speciesByName = {entry.name: entry for entry in species}
+        itemsByName = {kind.name: kind for kind in items}
+    else:
+        data = gameData.GameData(pack, sources=None)
+        species, speciesByName, itemsByName = data.species, data.speciesByName, data.itemsByName
+    loaded = time.perf_counter()
+    rng = random.Random(os.getpid())
+    total = 0
+    for lookup in range(lookups):
+        total += speciesByName[f'Beast {rng.randrange(speciesCount):06d}'].health[1]
+        total += species[rng.randrange(speciesCount)].power[1]
+        total += itemsByName[f'Item {rng.randrange(itemCount):06d}'].price
+    looked = time.perf_counter()
+    # Measure while every worker still has its tables, so shared pages are split between all of them
+    barrier.wait()
+    after = memory()
+    results.put((loaded - start, (looked - loaded) / lookups, None if before is None else [a - b for a, b in zip(after, before)]))
+    barrier.wait()
+
+def run(mode, workers, pack, sources, speciesCount, itemCount, lookups):
+    # Fresh interpreters, so no worker starts with tables inherited from this process
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(mode, pack, sources, speciesCount, itemCount, lookups, barrier, results))
+                 for number in range(workers)]
+    for process in processes:
+        process.start()
+    found = [results.get() for process in processes]
+    for process in processes:
+        process.join()
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--species', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--lookups', type=int, default=20000, help='lookups of each kind per worker')
+    parser.add_argument('--hot', type=int, default=0, help='only look up the first HOT species and items (default: all of them)')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    hotSpecies = min(args.hot, args.species) if args.hot else args.species
+    hotItems = min(args.hot, args.items) if args.hot else args.items
+
+    with tempfile.TemporaryDirectory() as folder:
+        sources = write_sources(folder, args.species, args.items, args.seed)
+        pack = os.path.join(folder, 'game.pack')
+        start = time.perf_counter()
+        gameData.compile_pack(pack, sources)
+        compileMs = (time.perf_counter() - start) * 1000
+        jsonBytes = sum(os.path.getsize(path) for path in sources.values())
+        print(f'{args.species} species, {args.items} items: {jsonBytes / 2**20:.1f} MB of JSON, '
+              f'{os.path.getsize(pack) / 2**20:.1f} MB pack compiled in {compileMs:.0f} ms')
+        print(f'{"mode":>5} {"workers":>8} {"load ms":>8} {"lookup us":>10} {"RSS MB":>7} {"PSS MB":>7} {"private MB":>11}')
+        for workers in args.workers:
+            for mode in ('json', 'pack'):
+                found = run(mode, workers, pack, sources, hotSpecies, hotItems, args.lookups)
+                loadMs = sum(result[0] for result in found) / workers * 1000
+                lookupUs = sum(result[1] for result in found) / workers * 1e6
+                line = f'{mode:>5} {workers:>8} {loadMs:>8.1f} {lookupUs:>10.2f}'
+                if found[0][2] is not None:
+                    rss, pss, private = (sum(result[2][field] for result in found) / workers / 2**20 for field in range(3))
+                    line += f' {rss:>7.1f} {pss:>7.1f} {private:>11.1f}'
+                print(line)
+
+if __name__ == '__main__':
+    main()
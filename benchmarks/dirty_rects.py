@@ -0,0 +1,59 @@
+"""
+Benchmark for full-window redraws against dirty-rectangle rendering
+
+Draws the same sequence of frames with GameRenderer's full redraw path and with its dirty
+rectangle path on boards of growing size. Monsters only move on some frames, like they do
+when the player is walking around, so most frames are idle. Runs with SDL's dummy video
+driver, so no window is opened.
+
+Typical usage example:
+    python -m benchmarks.dirty_rects --grids 10 50 100 --monsters 20 --frames 300
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import gameGraphics
+
+def set_grid_size(size):
+    gameGraphics.gridSize = size
+    gameGraphics.windowSize = size * gameGraphics.cellSize
+
+def frames_per_second(dirtyRects, monsters, frames, moveEvery):
+    renderer = gameGraphics.GameRenderer(dirtyRects=dirtyRects)
+    renderer.open()
+    random.seed(1)
+    start = time.perf_counter()
+    for frame in range(frames):
+        if frame % moveEvery == 0:
+            for monster in monsters:
+                monster.move()
+        renderer.draw(monsters)
+    elapsed = time.perf_counter() - start
+    renderer.close()
+    return frames / elapsed, renderer.presented
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--grids', type=int, nargs='+', default=[10, 30, 60])
+    parser.add_argument('--monsters', type=int, default=20)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--move-every', type=int, default=10, help='frames between monster moves')
+    args = parser.parse_args()
+
+    print(f'{"grid":>6} {"full fps":>10} {"dirty fps":>10} {"speedup":>8} {"presented":>10}')
+    for size in args.grids:
+        set_grid_size(size)
+        random.seed(0)
+        monsters = [gameGraphics.WanderingMonster() for i in range(args.monsters)]
+        full, fullPresented = frames_per_second(False, monsters, args.frames, args.move_every)
+        dirty, dirtyPresented = frames_per_second(True, monsters, args.frames, args.move_every)
+        print(f'{size:>6} {full:>10.1f} {dirty:>10.1f} {dirty / full:>7.1f}x {dirtyPresented:>4}/{fullPresented:<5}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Memory benchmark for monster and item dictionaries against gameEntities objects
+
+Builds the same monsters, each carrying a sword and a few potions, once as plain dictionaries
+(every item a copied dictionary, as shop_menu used to make) and once as gameEntities objects,
+and measures the memory each takes with tracemalloc.
+
+Typical usage example:
+    python -m benchmarks.entity_memory --entities 100000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+import gameEntities
+
+SWORD = {'name': 'Sword', 'type': 'weapon', 'price': 15, 'power': 10, 'maxDurability': 100, 'currentDurability': 100}
+POTION = {'name': 'Potion', 'type': 'consumable', 'price': 100}
+
+def build_dicts(count, potions):
+    monsters = []
+    for i in range(count):
+        monster = {'name': 'Goblin', 'description': 'A goblin.', 'health': random.randint(10, 30), 'power': random.randint(5, 15), 'money': random.randint(1, 50), 'inventory': []}
+        monster['inventory'].append(dict(SWORD, currentDurability=random.randint(30, 100)))
+        for potion in range(potions):
+            monster['inventory'].append(POTION.copy())
+        monsters.append(monster)
+    return monsters
+
+def build_entities(count, potions):
+    monsters = []
+    potion = gameEntities.make_item('Potion')
+    for i in range(count):
+        monster = gameEntities.Monster('Goblin', 'A goblin.', random.randint(10, 30), random.randint(5, 15), random.randint(1, 50))
+        monster.inventory.append(gameEntities.make_item('Sword', currentDurability=random.randint(30, 100)))
+        for copy in range(potions):
+            monster.inventory.append(potion.copy())
+        monsters.append(monster)
+    return monsters
+
+def read_dicts(monsters):
+    total = 0
+    for monster in monsters:
+        total += monster['health'] + monster['inventory'][0]['currentDurability']
+    return total
+
+def read_entities(monsters):
+    total = 0
+    for monster in monsters:
+        total += monster.health + monster.inventory.weapons()[0].currentDurability
+    return total
+
+def measure(build, read, count, potions):
+    tracemalloc.start()
+    start = time.perf_counter()
+    monsters = build(count, potions)
+    elapsed = time.perf_counter() - start
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Read a field from every monster and every weapon, as the combat and render loops do
+    start = time.perf_counter()
+    read(monsters)
+    access = time.perf_counter() - start
+    return size, elapsed, access
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entities', type=int, default=100000)
+    parser.add_argument('--potions', type=int, default=3, help='potions carried by each monster')
+    args = parser.parse_args()
+
+    print(f'{"model":<10} {"MB":>8} {"bytes/entity":>13} {"build s":>8} {"access s":>9}')
+    for name, build, read in (('dicts', build_dicts, read_dicts), ('entities', build_entities, read_entities)):
+        random.seed(0)
+        size, elapsed, access = measure(build, read, args.entities, args.potions)
+        print(f'{name:<10} {size / 1e6:>8.1f} {size / args.entities:>13.0f} {elapsed:>8.2f} {access:>9.3f}')
+
+if __name__ == '__main__':
+    main()
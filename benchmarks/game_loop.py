@@ -0,0 +1,47 @@
+"""
+Benchmark for whole game sessions played headless from a key script
+
+Replays a recorded session (benchmarks/sample_session.json by default) through the real
+game.game and gameGraphics.main with SDL's dummy video driver and no frame rate limit, and
+reports session throughput, map frames per second and the latency of the render, ai,
+collision and combat phases. Record a new script with python gameHarness.py --record PATH.
+
+Typical usage example:
+    python -m benchmarks.game_loop --sessions 200
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import gameHarness
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'sample_session.json')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--script', default=SAMPLE)
+    args = parser.parse_args()
+
+    script = gameHarness.load_script(args.script)
+    timer = gameHarness.PhaseTimer()
+    frames = 0
+    failed = 0
+    start = time.perf_counter()
+    for session in range(args.sessions):
+        result = gameHarness.run_session(script['answers'], seed=script['seed'], keys=script['keys'], timer=timer)
+        frames += result.frames
+        failed += not result.completed
+    elapsed = time.perf_counter() - start
+
+    print(f'{args.sessions} sessions in {elapsed:.2f}s: {args.sessions / elapsed:.0f} sessions/s, {frames / elapsed:.0f} frames/s')
+    if failed:
+        print(f'{failed} sessions did not follow the script; re-record it')
+    print(f'{"phase":>10} {"calls":>7} {"total ms":>9} {"p50 us":>8} {"p99 us":>8}')
+    for phase, stats in timer.summary().items():
+        print(f'{phase:>10} {stats["calls"]:>7} {stats["total"]:>9.1f} {stats["p50"] * 1000:>8.1f} {stats["p99"] * 1000:>8.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark for chasing the player with a shared distance field against A* per monster
+
+Puts thousands of monsters on a grid with random rock and, for a number of ticks, moves the
+player one cell and gets every monster's next step towards them: once from a single
+gamePath.DistanceField and once with an A* search for each monster. A* is only run for a
+sample of the monsters and the time is scaled up to all of them, because a full run takes
+minutes. The A* path lengths are checked against the field's distances.
+
+Typical usage example:
+    python -m benchmarks.pathfinding --size 100 --monsters 1000 5000 --ticks 20
+"""
+import argparse
+import heapq
+import random
+import time
+
+import gamePath
+
+def astar(start, goal, size, rock):
+    # Returns the first step and the length of a shortest path, or (None, None) if there is none
+    start = tuple(start)
+    if start == goal:
+        return None, 0
+    frontier = [(abs(start[0] - goal[0]) + abs(start[1] - goal[1]), 0, start)]
+    came = {start: None}
+    cost = {start: 0}
+    while frontier:
+        estimate, steps, cell = heapq.heappop(frontier)
+        if cell == goal:
+            length = steps
+            while came[cell] != start:
+                cell = came[cell]
+            return cell, length
+        if steps > cost[cell]:
+            continue
+        x, y = cell
+        for near in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= near[0] < size and 0 <= near[1] < size and near not in rock and steps + 1 < cost.get(near, size * size):
+                cost[near] = steps + 1
+                came[near] = cell
+                heapq.heappush(frontier, (steps + 1 + abs(near[0] - goal[0]) + abs(near[1] - goal[1]), steps + 1, near))
+    return None, None
+
+def make_map(size, count, seed):
+    rng = random.Random(seed)
+    rock = {(x, y) for x in range(size) for y in range(size) if rng.random() < 0.2}
+    openCells = [(x, y) for x in range(size) for y in range(size) if (x, y) not in rock]
+    monsters = [list(rng.choice(openCells)) for i in range(count)]
+    return rng, rock, openCells, monsters
+
+def walk(rng, player, size, rock):
+    # One random step for the player that stays on the map and off rock
+    x, y = player
+    steps = [(x + dx, y + dy) for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1))]
+    steps = [cell for cell in steps if 0 <= cell[0] < size and 0 <= cell[1] < size and cell not in rock]
+    return rng.choice(steps) if steps else player
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', type=int, default=100)
+    parser.add_argument('--monsters', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--radius', type=int, default=None, help='only chase within this many cells of the player')
+    parser.add_argument('--astar-sample', type=int, default=100, help='monsters A* is timed on each tick')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f'{"monsters":>9} {"field ms/tick":>14} {"builds":>7} {"A* ms/tick":>11} {"speedup":>8} {"checked":>8}')
+    for count in args.monsters:
+        rng, rock, openCells, monsters = make_map(args.size, count, args.seed)
+        player = rng.choice(openCells)
+        field = gamePath.DistanceField(args.size, args.size, radius=args.radius, blocked=rock)
+        fieldTime = 0.0
+        astarTime = 0.0
+        checked = 0
+        for tick in range(args.ticks):
+            player = walk(rng, player, args.size, rock)
+            start = time.perf_counter()
+            field.set_target(player)
+            steps = [field.next_step(position) for position in monsters]
+            fieldTime += time.perf_counter() - start
+
+            sample = monsters[:args.astar_sample]
+            start = time.perf_counter()
+            found = [astar(position, player, args.size, rock) for position in sample]
+            astarTime += (time.perf_counter() - start) * count / len(sample)
+            for position, (step, length) in zip(sample, found):
+                distance = field.distance(position)
+                if args.radius is None:
+                    assert (length if length is not None else gamePath.UNREACHED) == distance, 'A* and the field disagree'
+                    checked += 1
+            for position, step in zip(monsters, steps):
+                if step is not None:
+                    position[:] = step
+        fieldMs = fieldTime / args.ticks * 1000
+        astarMs = astarTime / args.ticks * 1000
+        print(f'{count:>9} {fieldMs:>14.2f} {field.builds:>7} {astarMs:>11.1f} {astarMs / fieldMs:>7.0f}x {checked:>8}')
+
+if __name__ == '__main__':
+    main()
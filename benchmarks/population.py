@@ -0,0 +1,54 @@
+"""
+Benchmark for moving monsters as Python objects and as a NumPy population
+
+For each monster count, measures one move step for every monster plus the check for monsters
+on the player's cell, once with a list of WanderingMonster objects and once with a
+MonsterPopulation.
+
+Typical usage example:
+    python -m benchmarks.population --monsters 1000 10000 100000 1000000 --grid 1000
+"""
+import argparse
+import random
+import time
+
+import gameGraphics
+import gamePopulation
+
+def per_call(function, repeats):
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--monsters', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--grid', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    gameGraphics.gridSize = args.grid
+    random.seed(0)
+    player = [args.grid // 2, args.grid // 2]
+    print(f'{"monsters":>9} {"objects ms":>11} {"numpy ms":>9} {"speedup":>8}')
+    for count in args.monsters:
+        objects = [gameGraphics.WanderingMonster() for i in range(count)]
+        population = gamePopulation.MonsterPopulation(args.grid)
+        population.add([monster.data for monster in objects], [monster.position for monster in objects])
+
+        def objects_step():
+            for monster in objects:
+                monster.move()
+            return [monster for monster in objects if monster.position == player]
+
+        def population_step():
+            population.step()
+            return population.collisions(player)
+
+        before = per_call(objects_step, args.repeats)
+        after = per_call(population_step, args.repeats)
+        print(f'{count:>9} {before:>11.2f} {after:>9.3f} {before / after:>7.0f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark for the cost of the gameProfile instrumentation
+
+Times a bare span, and a frame of the map (events, monster moves, encounter check and drawing),
+with the profiler off, on, and on with tracing. The span numbers show what every instrumented
+call costs while the profiler is off. Runs with SDL's dummy video driver, so no window is opened.
+
+Typical usage example:
+    python -m benchmarks.profile_overhead --frames 2000
+"""
+import argparse
+import os
+import time
+import timeit
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import gameGraphics
+import gameProfile
+
+def time_frames(renderer, monsters, frames):
+    start = time.perf_counter()
+    for frame in range(frames):
+        renderer.handle_events(monsters)
+        renderer.move_monsters(monsters)
+        renderer.find_encounter(monsters)
+        renderer.draw(monsters)
+        gameProfile.frame()
+    return (time.perf_counter() - start) / frames * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--monsters', type=int, default=50)
+    args = parser.parse_args()
+
+    renderer = gameGraphics.GameRenderer(fps=0)
+    renderer.open()
+    monsters = [gameGraphics.WanderingMonster() for i in range(args.monsters)]
+    renderer.occupancy.sync(monsters)
+    profiler = gameProfile.profiler
+
+    print(f'{"profiler":>9} {"span ns":>8} {"frame us":>9}')
+    for label, enable in (('off', None), ('on', False), ('tracing', True)):
+        profiler.disable()
+        profiler.reset()
+        if enable is not None:
+            profiler.enable(tracing=enable)
+        calls = 200000
+        spanTime = timeit.timeit("with span('x'): pass", globals={'span': gameProfile.span}, number=calls) / calls * 1e9
+        frameTime = time_frames(renderer, monsters, args.frames)
+        print(f'{label:>9} {spanTime:>8.0f} {frameTime:>9.1f}')
+    renderer.close()
+
+if __name__ == '__main__':
+    main()
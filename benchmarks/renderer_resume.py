@@ -0,0 +1,71 @@
+"""
+Benchmark for getting back to the map after a fight or the menu
+
+Measures how long it takes from calling into gameGraphics until the first frame is handled,
+once by opening a new window every time (the old init_window path) and once by resuming the
+long-lived GameRenderer. A queued 'm' key press makes every call return after one frame.
+Runs with SDL's dummy video driver, so no window is opened.
+
+Typical usage example:
+    python -m benchmarks.renderer_resume --calls 50
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import gameGraphics
+
+def press_menu_key():
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_m))
+
+def time_calls(calls, prepare, monsters):
+    timings = []
+    for call in range(calls):
+        renderer = prepare()
+        gameGraphics.running = True
+        # Time spent in the menu, so the frame limiter does not count against the resume
+        time.sleep(1 / renderer.fps)
+        start = time.perf_counter()
+        renderer.resume()
+        press_menu_key()
+        renderer.run(monsters)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--monsters', type=int, default=10)
+    args = parser.parse_args()
+
+    monsters = [gameGraphics.WanderingMonster() for i in range(args.monsters)]
+
+    def cold():
+        # A fresh renderer after pygame.quit is what every main call used to cost
+        pygame.quit()
+        return gameGraphics.GameRenderer(gameGraphics.gameAssets.AssetCache(gameGraphics.cellSize))
+
+    shared = gameGraphics.GameRenderer()
+    # Open the window once so the resume timings do not include the first start
+    shared.open()
+
+    def warm():
+        return shared
+
+    coldTimes = time_calls(args.calls, cold, monsters)
+    pygame.quit()
+    shared.screen = None
+    shared.open()
+    warmTimes = time_calls(args.calls, warm, monsters)
+    print(f'{"path":>8} {"median ms":>10} {"max ms":>8}')
+    print(f'{"startup":>8} {statistics.median(coldTimes):>10.2f} {max(coldTimes):>8.2f}')
+    print(f'{"resume":>8} {statistics.median(warmTimes):>10.2f} {max(warmTimes):>8.2f}')
+    shared.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for saving and loading large saves as JSON and in the binary snapshot format
+
+For each inventory size, builds a save whose inventory has that many stacks, then times writing
+and reading it as indented JSON (the old game_save_data.json format) and with gameSaveFormat,
+plus reading only the player summary from the binary file.
+
+Typical usage example:
+    python -m benchmarks.save_format --entries 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import gameSaveFormat
+
+def make_state(entries):
+    inventory = []
+    for index in range(entries):
+        if index % 2:
+            inventory.append({'name': 'Potion', 'type': 'consumable', 'price': 100, 'count': random.randint(2, 50)})
+        else:
+            inventory.append({'name': 'Sword', 'type': 'weapon', 'price': 15, 'power': 10, 'maxDurability': 100, 'currentDurability': index})
+    monster = {'name': 'Goblin', 'description': 'A goblin.', 'health': 20, 'power': 10, 'money': 50, 'inventory': inventory}
+    return {'username': 'Cameron', 'monster': monster}
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    random.seed(0)
+    directory = tempfile.mkdtemp()
+    jsonPath = os.path.join(directory, 'save.json')
+    binaryPath = os.path.join(directory, 'save.sav')
+    print(f'{"entries":>8} {"json MB":>8} {"json save ms":>13} {"json load ms":>13} {"sav MB":>7} {"sav save ms":>12} {"sav load ms":>12} {"summary ms":>11}')
+    for entries in args.entries:
+        state = make_state(entries)
+
+        def save_json():
+            with open(jsonPath, 'w') as file:
+                json.dump(state, file, indent=4)
+
+        def load_json():
+            with open(jsonPath, 'r') as file:
+                return json.load(file)
+
+        def save_binary():
+            with open(binaryPath, 'wb') as file:
+                file.write(gameSaveFormat.encode_state(state))
+
+        def load_binary():
+            with open(binaryPath, 'rb') as file:
+                return gameSaveFormat.decode_state(file.read())
+
+        unused, jsonSave = timed(save_json)
+        unused, jsonLoad = timed(load_json)
+        unused, binarySave = timed(save_binary)
+        loaded, binaryLoad = timed(load_binary)
+        assert loaded[0] == state
+        unused, summary = timed(lambda: gameSaveFormat.read_summary(binaryPath))
+        print(f'{entries:>8} {os.path.getsize(jsonPath) / 1e6:>8.1f} {jsonSave:>13.1f} {jsonLoad:>13.1f} '
+              f'{os.path.getsize(binaryPath) / 1e6:>7.1f} {binarySave:>12.1f} {binaryLoad:>12.1f} {summary:>11.3f}')
+    for path in (jsonPath, binaryPath):
+        os.remove(path)
+    os.rmdir(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Load generator for the multi-session game server
+
+Starts gameServer with a number of worker processes, then plays many short scripted sessions
+against it from several client processes at once (new game, walking about and fighting
+whatever turns up, sleeping, shopping, saving and quitting) and reports sessions per second,
+commands per second and the p50 and p99 latency of a command. Runs once for each worker count,
+so the scaling across cores can be read off the table. Saves go to a temporary folder.
+
+Typical usage example:
+    python -m benchmarks.server_load --workers 1 2 4 --sessions 2000 --concurrency 100
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import gameClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WALK = ['right', 'right', 'down', 'down', 'left', 'left', 'up', 'up']
+
+async def play_session(host, port, name, latencies):
+    client = await gameClient.GameClient.connect(host, port)
+
+    async def send(line):
+        start = time.perf_counter()
+        response = await client.send(line)
+        latencies.append((time.perf_counter() - start) * 1000)
+        return response
+
+    try:
+        await send(f'new {name}')
+        for direction in WALK:
+            await send(f'move {direction}')
+            # Fight whatever turns up until the fight is over
+            while client.mode == 'fight':
+                await send('attack')
+        for line in ('sleep', 'shop', 'buy potion 1', 'save', 'status', 'quit'):
+            await send(line)
+    finally:
+        await client.close()
+
+async def play_many(host, port, prefix, sessions, concurrency):
+    latencies = []
+    queue = list(range(sessions))
+
+    async def player():
+        while queue:
+            number = queue.pop()
+            await play_session(host, port, f'{prefix}-{number}', latencies)
+
+    await asyncio.gather(*(player() for i in range(concurrency)))
+    return latencies
+
+def run_client(host, port, prefix, sessions, concurrency):
+    # Runs in a client process
+    return asyncio.run(play_many(host, port, prefix, sessions, concurrency))
+
+def wait_for_port(host, port, timeout=10):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'the server did not start listening on {host}:{port}')
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def run(workers, clients, sessions, concurrency):
+    host = '127.0.0.1'
+    port = free_port()
+    with tempfile.TemporaryDirectory() as saves:
+        server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'gameServer.py'), '--port', str(port),
+                                   '--workers', str(workers), '--saves', saves, '--seed', '1'],
+                                  cwd=ROOT, stdout=subprocess.DEVNULL, start_new_session=True)
+        try:
+            wait_for_port(host, port)
+            share = sessions // clients
+            start = time.perf_counter()
+            with concurrent.futures.ProcessPoolExecutor(clients) as pool:
+                futures = [pool.submit(run_client, host, port, f'c{client}', share, max(1, concurrency // clients)) for client in range(clients)]
+                latencies = [latency for future in futures for latency in future.result()]
+            elapsed = time.perf_counter() - start
+        finally:
+            # The server and its worker processes share a process group
+            os.killpg(server.pid, signal.SIGTERM)
+            server.wait()
+    return share * clients, latencies, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=None, help='client processes (default: as many as server workers)')
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=100, help='sessions open at once, across all clients')
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} cores')
+    print(f'{"workers":>8} {"sessions":>9} {"sessions/s":>11} {"commands/s":>11} {"p50 ms":>8} {"p99 ms":>8}')
+    for workers in args.workers:
+        clients = args.clients or workers
+        sessions, latencies, elapsed = run(workers, clients, args.sessions, args.concurrency)
+        latencies.sort()
+        print(f'{workers:>8} {sessions:>9} {sessions / elapsed:>11.0f} {len(latencies) / elapsed:>11.0f} '
+              f'{latencies[len(latencies) // 2]:>8.2f} {latencies[int(0.99 * len(latencies))]:>8.2f}')
+
+if __name__ == '__main__':
+    main()
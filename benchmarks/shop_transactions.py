@@ -0,0 +1,102 @@
+"""
+Benchmark for shop transactions through gameShop, against buying one unit at a time
+
+Buys items in a loop with no menu and no pauses, the way a bot or a test would. For each
+quantity per purchase it times:
+
+    per unit   purchase_item, then one add_item_to_inventory of a copy per unit bought, into a
+               plain list inventory, the way shop_menu used to credit a purchase
+    buy        Shop.buy, one kind of item per checkout
+    checkout   Shop.checkout of a cart with both kinds of item, all or nothing
+
+Every player starts rich enough for every purchase, and a fresh player is made every 1000
+transactions so the inventory stays the size it would in a game. Reports transactions and
+units per second. The per unit rows are skipped above --per-unit-limit units, where a single
+purchase takes seconds and as much memory as it has units.
+
+Typical usage example:
+    python -m benchmarks.shop_transactions --seconds 1 --quantities 1 1000 1000000
+"""
+import argparse
+import time
+
+import gameEntities
+import gamefunctions
+import gameShop
+
+# The kinds of item in a checkout cart: everything the game sells
+CART = ['Potion', 'Sword']
+
+def new_player(money, listInventory=False):
+    monster = gameEntities.Monster('Hero', 'The player.', 100, 10, money)
+    if listInventory:
+        monster['inventory'] = []
+    return monster
+
+def per_unit(shop, quantity, count):
+    # Returns the units bought
+    item = shop.find('Potion')
+    units = 0
+    for number in range(count):
+        if number % 1000 == 0:
+            monster = new_player(item['price'] * quantity * 1000, listInventory=True)
+        quantityPurchased, remainingMoney = gamefunctions.purchase_item(item['price'], monster['money'], quantity)
+        monster['money'] = remainingMoney
+        for unit in range(quantityPurchased):
+            monster['inventory'] = gamefunctions.add_item_to_inventory(monster['inventory'], item.copy())
+        units += quantityPurchased
+    return units
+
+def buy(shop, quantity, count):
+    price = shop.find('Potion')['price']
+    units = 0
+    for number in range(count):
+        if number % 1000 == 0:
+            monster = new_player(price * quantity * 1000)
+        units += shop.buy(monster, 'Potion', quantity).lines[0].bought
+    return units
+
+def checkout(shop, quantity, count):
+    cart = shop.cart()
+    for name in CART:
+        cart.add(name, quantity)
+    total = cart.total()
+    units = 0
+    for number in range(count):
+        if number % 1000 == 0:
+            monster = new_player(total * 1000)
+        receipt = shop.checkout(monster, cart)
+        units += sum(line.bought for line in receipt.lines)
+    return units
+
+def measure(way, quantity, seconds):
+    # Runs batches of transactions until seconds have passed, and returns (transactions, units, elapsed)
+    shop = gameShop.Shop(stock=[gameEntities.make_item(name) for name in CART])
+    transactions = units = 0
+    batch = 1
+    start = time.perf_counter()
+    while True:
+        units += way(shop, quantity, batch)
+        transactions += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return transactions, units, elapsed
+        batch = min(batch * 2, 100000)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=1.0, help='time to spend on each row')
+    parser.add_argument('--quantities', type=int, nargs='+', default=[1, 1000, 1000000])
+    parser.add_argument('--per-unit-limit', type=int, default=1000, help='the largest quantity to time one unit at a time')
+    args = parser.parse_args()
+
+    print(f'{"way":>9} {"quantity":>9} {"transactions/s":>15} {"units/s":>14} {"us/transaction":>15}')
+    for quantity in args.quantities:
+        for name, way in (('per unit', per_unit), ('buy', buy), ('checkout', checkout)):
+            if way is per_unit and quantity > args.per_unit_limit:
+                continue
+            transactions, units, elapsed = measure(way, quantity, args.seconds)
+            print(f'{name:>9} {quantity:>9} {transactions / elapsed:>15.0f} {units / elapsed:>14.0f} {elapsed / transactions * 1e6:>15.2f}')
+
+if __name__ == '__main__':
+    main()
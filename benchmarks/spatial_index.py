@@ -0,0 +1,62 @@
+"""
+Benchmark for finding encounters with a linear scan and with the occupancy grid
+
+For each monster count, measures the cost of one frame's encounter check (the old loop over
+every monster against one occupancy lookup) and of one monster move step with and without
+keeping the occupancy grid up to date.
+
+Typical usage example:
+    python -m benchmarks.spatial_index --monsters 10 1000 100000 --grid 1000
+"""
+import argparse
+import random
+import time
+
+import gameGraphics
+import gameSpatial
+
+def per_call(function, repeats):
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--monsters', type=int, nargs='+', default=[10, 1000, 100000])
+    parser.add_argument('--grid', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    gameGraphics.gridSize = args.grid
+    random.seed(0)
+    position = [args.grid // 2, args.grid // 2]
+    print(f'{"monsters":>9} {"scan us":>10} {"index us":>10} {"move us":>10} {"move+index us":>14}')
+    for count in args.monsters:
+        monsters = [gameGraphics.WanderingMonster() for i in range(count)]
+        occupancy = gameSpatial.OccupancyGrid()
+        occupancy.sync(monsters)
+        occupancy.add(gameSpatial.PLAYER, position)
+
+        def scan():
+            for monster in monsters:
+                if position == monster.position:
+                    return monster
+
+        def lookup():
+            return occupancy.at(position) - {gameSpatial.PLAYER}
+
+        def move_plain():
+            for monster in monsters:
+                monster.move()
+
+        def move_indexed():
+            for monster in monsters:
+                monster.move(occupancy)
+
+        moveRepeats = max(1, args.repeats * 1000 // count)
+        print(f'{count:>9} {per_call(scan, args.repeats):>10.1f} {per_call(lookup, args.repeats):>10.2f} '
+              f'{per_call(move_plain, moveRepeats):>10.0f} {per_call(move_indexed, moveRepeats):>14.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Microbenchmark for the cost of spawning one monster
+
+Compares the per-monster cost of the old random_monster (lists rebuilt and an if/elif chain on
+every call), the table-driven random_monster and the batched gameSpecies.random_monsters.
+
+Typical usage example:
+    python -m benchmarks.spawn --count 100000
+"""
+import argparse
+import random
+import time
+
+import gamefunctions
+import gameSpecies
+
+def random_monster_before_table():
+    # random_monster as it was before the species table
+    names = ['Goblin', 'Dragon', 'Ogre', 'Troll']
+    descriptions = ['This is a lone goblin. When it notices you, it rushes at you quickly with a sharp dagger drawn.', 'This is a mighty dragon. It soars above you, casting a shadow over the land before unleashing a torrent of flames.', 'This is a fearsome ogre. It lumbers towards you, its massive club swinging menacingly.', 'This is a menacing troll. It grunts and growls, brandishing a large, jagged rock.']
+    name = random.choice(names)
+    description = descriptions[names.index(name)]
+    if name == 'Goblin':
+        health = random.randint(10, 30)
+        power = random.randint(5, 15)
+        money = random.randint(1, 50)
+    elif name == 'Dragon':
+        health = random.randint(50, 100)
+        power = random.randint(70, 80)
+        money = random.randint(100, 1000)
+    elif name == 'Ogre':
+        health = random.randint(30, 60)
+        power = random.randint(45, 60)
+        money = random.randint(50, 200)
+    elif name == 'Troll':
+        health = random.randint(20, 50)
+        power = random.randint(15, 30)
+        money = random.randint(20, 100)
+    return {'name': name, 'description': description, 'health': health, 'power': power, 'money': money, 'inventory': []}
+
+def nanoseconds_per_monster(spawn, count):
+    start = time.perf_counter()
+    spawn(count)
+    return (time.perf_counter() - start) / count * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    # Import NumPy before timing the batched path
+    gameSpecies.random_monsters(1)
+    paths = [
+        ('random_monster (before table)', lambda count: [random_monster_before_table() for i in range(count)]),
+        ('random_monster', lambda count: [gamefunctions.random_monster() for i in range(count)]),
+        ('random_monsters', lambda count: gameSpecies.random_monsters(count, rng=0)),
+    ]
+    for name, spawn in paths:
+        print(f'{name:<30} {nanoseconds_per_monster(spawn, args.count):>10.0f} ns/monster')
+
+if __name__ == '__main__':
+    main()
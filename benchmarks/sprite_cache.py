@@ -0,0 +1,58 @@
+"""
+Benchmark for drawing the board with and without the sprite cache
+
+Draws a full frame (grid, player and N monsters) as fast as possible using the old
+draw_square code, which loaded the PNG for every square, and the cached draw_square.
+Runs with SDL's dummy video driver, so no window is opened.
+
+Typical usage example:
+    python -m benchmarks.sprite_cache --monsters 10 50 200 --frames 200
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import gameGraphics
+
+def draw_square_uncached(screen, position, type):
+    # The draw_square body from before the sprite cache existed
+    if type == 'player':
+        image = pygame.image.load('assets/player.png')
+    else:
+        image = pygame.image.load('assets/monster.png')
+    pygame.transform.scale(image, (gameGraphics.cellSize, gameGraphics.cellSize))
+    screen.blit(image, (position[0] * gameGraphics.cellSize, position[1] * gameGraphics.cellSize))
+
+def frames_per_second(screen, positions, draw, frames):
+    start = time.perf_counter()
+    for frame in range(frames):
+        screen.fill((255, 255, 255))
+        gameGraphics.draw_grid(screen)
+        draw(screen, [0, 0], 'player')
+        for position in positions:
+            draw(screen, position, 'monster')
+        pygame.display.flip()
+    return frames / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--monsters', type=int, nargs='+', default=[1, 10, 50, 200])
+    parser.add_argument('--frames', type=int, default=100)
+    args = parser.parse_args()
+
+    screen, clock, position = gameGraphics.init_window()
+    print(f'{"monsters":>8} {"uncached fps":>14} {"cached fps":>12} {"speedup":>8}')
+    for count in args.monsters:
+        positions = [[i % gameGraphics.gridSize, (i // gameGraphics.gridSize) % gameGraphics.gridSize] for i in range(count)]
+        before = frames_per_second(screen, positions, draw_square_uncached, args.frames)
+        after = frames_per_second(screen, positions, gameGraphics.draw_square, args.frames)
+        print(f'{count:>8} {before:>14.1f} {after:>12.1f} {after / before:>7.1f}x')
+    print(f'cache: {gameGraphics.sprites.stats()}')
+    pygame.quit()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark for writing the console menus and fights as buffered screens
+
+Plays rounds of the console screens at instant pace: the user menu, the inventory (with a few
+stacks in it), buying a potion in the shop and a fight fought with attacks. Every prompt is
+answered by a scripted input, which reads the prompt from the end of the last write. Each round is played twice into every sink:
+
+    screens    the way gamefunctions writes now, one write per screen (see gameScreen)
+    per line   the same text split into one write per line, the way print wrote to a terminal
+
+The sinks are memory (gameScreen.MemorySink), terminal (gameScreen.TerminalSink writing to a
+line-buffered /dev/null, like a terminal) and socket (gameScreen.SocketSink on a socket pair
+drained by a thread). Reports rounds per second and writes per round.
+
+Typical usage example:
+    python -m benchmarks.text_ui --rounds 2000
+"""
+import argparse
+import builtins
+import contextlib
+import os
+import socket
+import threading
+import time
+
+import gameEntities
+import gamefunctions
+import gamePacing
+import gameScreen
+
+# The answer to each prompt, by how the prompt starts
+ANSWERS = {
+    'Enter your choice': '0',
+    'Enter the number of the item': '2',
+    'How many': '1',
+    'What\'s your next move': '1',
+}
+
+class PerLine:
+    """
+    Passes every line of a write on as a write of its own, like print does on a line-buffered terminal.
+    """
+    def __init__(self, sink):
+        self.sink = sink
+
+    def write(self, text):
+        for line in text.splitlines(keepends=True):
+            self.sink.write(line)
+
+class ScriptedInput:
+    """
+    Passes writes on to a sink and answers input() from ANSWERS by the prompt at the end of the last write.
+    """
+    def __init__(self, sink):
+        self.sink = sink
+        self.last = ''
+
+    def write(self, text):
+        self.last = text
+        self.sink.write(text)
+
+    def input(self, prompt=''):
+        prompt = prompt or self.last.rpartition('\n')[2]
+        for start, answer in ANSWERS.items():
+            if prompt.startswith(start):
+                return answer
+        return ''
+
+def play_round(enemy):
+    monster = gameEntities.Monster('Hero', 'The player.', 10000, 50, 1000)
+    gamefunctions.add_item_to_inventory(monster['inventory'], gameEntities.make_item('Potion'), 3)
+    gamefunctions.add_item_to_inventory(monster['inventory'], gameEntities.make_item('Sword', currentDurability=80), 2)
+    gamefunctions.print_user_menu('Hero', monster)
+    gamefunctions.view_inventory(monster)
+    gamefunctions.shop_menu(monster)
+    gamefunctions.fight_monster(monster, gameEntities.Monster.from_dict(enemy))
+
+def run(sink, rounds, perLine=False):
+    enemy = {'name': 'Troll', 'description': 'A troll.', 'health': 200, 'power': 20, 'money': 50, 'inventory': []}
+    scripted = ScriptedInput(PerLine(sink) if perLine else sink)
+    realInput = builtins.input
+    builtins.input = scripted.input
+    start = time.perf_counter()
+    try:
+        with gameScreen.redirect(scripted):
+            for number in range(rounds):
+                play_round(enemy)
+                if isinstance(sink, gameScreen.MemorySink):
+                    sink.clear()
+    finally:
+        builtins.input = realInput
+    return time.perf_counter() - start
+
+def drain(connection):
+    while connection.recv(65536):
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+
+    gamePacing.configure('instant')
+    print(f'{"sink":>9} {"mode":>9} {"rounds/s":>9} {"writes/round":>13} {"KB/round":>9}')
+    with open(os.devnull, 'w', buffering=1) as terminal, contextlib.redirect_stdout(terminal):
+        writer, reader = socket.socketpair()
+        drainer = threading.Thread(target=drain, args=(reader,), daemon=True)
+        drainer.start()
+        results = []
+        for name, makeSink in (('memory', gameScreen.MemorySink), ('terminal', gameScreen.TerminalSink),
+                               ('socket', lambda: gameScreen.SocketSink(writer))):
+            for mode in ('screens', 'per line'):
+                sink = makeSink()
+                elapsed = run(sink, args.rounds, perLine=mode == 'per line')
+                results.append((name, mode, elapsed, sink.writes, sink.characters))
+        writer.close()
+        drainer.join()
+    for name, mode, elapsed, writes, characters in results:
+        print(f'{name:>9} {mode:>9} {args.rounds / elapsed:>9.0f} {writes / args.rounds:>13.1f} {characters / args.rounds / 1024:>9.2f}')
+
+if __name__ == '__main__':
+    main()
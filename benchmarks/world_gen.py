@@ -0,0 +1,47 @@
+"""
+Benchmark for deterministic chunk generation
+
+Makes a square block of chunks in this process and across a process pool, checks that both
+give exactly the same chunks, and reports chunks per second. Also reports how much memory
+the finished chunks take, against what is kept per chunk once they are dropped (nothing,
+unless the player changed something in them).
+
+Typical usage example:
+    python -m benchmarks.world_gen --chunks 4096 --workers 4
+"""
+import argparse
+import os
+import pickle
+import time
+
+import gameWorldGen
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chunks', type=int, default=2500)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    side = int(args.chunks ** 0.5)
+    keys = [(x, y) for x in range(side) for y in range(side)]
+    size = 10000
+
+    start = time.perf_counter()
+    sequential = gameWorldGen.generate_chunks(args.seed, keys, 16, size, size)
+    sequentialTime = time.perf_counter() - start
+    start = time.perf_counter()
+    pooled = gameWorldGen.generate_chunks(args.seed, keys, 16, size, size, workers=args.workers)
+    pooledTime = time.perf_counter() - start
+
+    assert sequential == pooled, 'the pool made different chunks'
+    again = gameWorldGen.generate_chunks(args.seed, keys[:50], 16, size, size)
+    assert again == sequential[:50], 'making the same chunks twice gave different results'
+
+    print(f'{len(keys)} chunks, identical in both runs')
+    print(f'{"in process":>12}: {sequentialTime:.2f}s ({len(keys) / sequentialTime:.0f} chunks/s)')
+    print(f'{f"{args.workers} workers":>12}: {pooledTime:.2f}s ({len(keys) / pooledTime:.0f} chunks/s)')
+    print(f'{"made chunks":>12}: {len(pickle.dumps(sequential)) / len(keys):.0f} bytes each when pickled; dropped chunks keep only player changes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark for playing the map in large streamed worlds
+
+Walks the player a long way through worlds of growing size and times each frame (player
+move, monster moves, encounter check and drawing). The frame time and the memory held should
+stay the same whatever the size of the world, because only the chunks around the camera are
+made and kept. Runs with SDL's dummy video driver, so no window is opened.
+
+Typical usage example:
+    python -m benchmarks.world_stream --sizes 100 1000 10000 --steps 3000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import gameWorld
+
+SIDESTEPS = {pygame.K_RIGHT: pygame.K_DOWN, pygame.K_LEFT: pygame.K_UP, pygame.K_DOWN: pygame.K_RIGHT, pygame.K_UP: pygame.K_LEFT}
+
+def walk(steps):
+    # Long straight legs, so the camera keeps reaching chunks it has not seen
+    keys = [pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_DOWN]
+    leg = 200
+    for step in range(steps):
+        yield keys[(step // leg) % len(keys)]
+
+def play(size, steps, maxChunks, workers):
+    random.seed(1)
+    world = gameWorld.World(size, size, maxChunks=maxChunks, seed=1, workers=workers)
+    renderer = gameWorld.WorldRenderer(world, fps=0)
+    renderer.open()
+    monsters = renderer.enter_map([])
+    times = []
+    tracemalloc.start()
+    for step, key in enumerate(walk(steps)):
+        start = time.perf_counter()
+        before = list(renderer.position)
+        renderer.move_player(key)
+        if renderer.position == before:
+            # Step round the rock in the way
+            renderer.move_player(SIDESTEPS[key])
+        if step % 2:
+            renderer.move_monsters(monsters)
+        renderer.find_encounter(monsters)
+        renderer.draw(monsters)
+        times.append((time.perf_counter() - start) * 1e6)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    renderer.close()
+    world.close()
+    times.sort()
+    return world, statistics.mean(times), times[int(0.99 * len(times))], peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--steps', type=int, default=3000)
+    parser.add_argument('--max-chunks', type=int, default=64)
+    parser.add_argument('--workers', type=int, default=0, help='processes that make chunks ahead of the camera')
+    args = parser.parse_args()
+
+    print(f'{"world":>11} {"mean us":>8} {"p99 us":>8} {"peak KiB":>9} {"resident":>9} {"made":>6} {"changed":>8} {"all chunks":>11}')
+    for size in args.sizes:
+        world, mean, p99, peak = play(size, args.steps, args.max_chunks, args.workers)
+        stats = world.stats()
+        allChunks = (-(-size // world.chunkSize)) ** 2
+        print(f'{f"{size}x{size}":>11} {mean:>8.1f} {p99:>8.1f} {peak / 1024:>9.0f} {stats["resident"]:>9} '
+              f'{stats["generated"]:>6} {stats["changed"]:>8} {allChunks:>11}')
+
+if __name__ == '__main__':
+    main()
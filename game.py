@@ -1,65 +1,142 @@
 # Cameron Seaman
 # game.py
 
+import argparse
+import random
+import sys
+
+import gameData
 import gamefunctions
 import gameGraphics
+import gameSave
+import gameScreen
+import gameStartup
+
+# In console mode, the chance that exploring turns up a monster
+ENCOUNTER_CHANCE = 0.5
 
-def game():
+def console_map(monsters):
+    # Stands in for gameGraphics.main in console mode, so the game can be played without a window or SDL
+    while True:
+        choice = gameScreen.ask("Press Enter to explore, 'm' for the menu or 'q' to quit: ").strip().lower()
+        if choice == 'm':
+            return 'm', None
+        if choice == 'q':
+            sys.exit()
+        if choice == '':
+            if random.random() < ENCOUNTER_CHANCE:
+                monster = random.choice(monsters)
+                gameScreen.show(f'You meet a {monster.data["name"]}!')
+                return 'f', monster
+            gameScreen.show('You explore for a while but find nothing.')
+        else:
+            gameScreen.show('Invalid option. Please try again.')
+
+def game(playMap=None):
+    # playMap runs the map until the player opens the menu or meets a monster; gameHarness swaps in a scripted one
+    if playMap is None:
+        playMap = gameGraphics.main
     preGameChoice = gamefunctions.pregame_menu()
     while preGameChoice != '1' and preGameChoice != '2':
-        print('Invalid option. Please try again.')
+        gameScreen.show('Invalid option. Please try again.')
         preGameChoice = gamefunctions.pregame_menu()
     if preGameChoice == '1':
-        username = input('Enter your name to get started: ')
+        username = gameScreen.ask('Enter your name to get started: ')
+        if gamefunctions.saves.exists(username):
+            gameScreen.show(f'There is already a saved game named {username}. Saving this game will replace it.')
         monster = gamefunctions.random_monster()
         gamefunctions.print_welcome(username)
     elif preGameChoice == '2':
         monster, username = gamefunctions.load_game()
         if monster is None or username is None:
-            print('No saved game found. Starting a new game.')
-            username = input('Enter your name to get started: ')
+            gameScreen.show('No saved game found. Starting a new game.')
+            username = gameScreen.ask('Enter your name to get started: ')
             monster = gamefunctions.random_monster()
         gamefunctions.print_welcome(username)
-    print()
-    print('Press \'m\' to access the game menu.')
-    print('Press \'q\' to quit the game.')
-    print()
+    gameScreen.show('', 'Press \'m\' to access the game menu.', 'Press \'q\' to quit the game.', '')
     running = True
     enemies = [gameGraphics.WanderingMonster()]
-    while running:
-        option, enemy = gameGraphics.main(enemies)
-        if option == 'm':
-            gameGraphics.running = False
-            consoleoption = gamefunctions.print_user_menu(username, monster)
-            while consoleoption != '5':
-                if consoleoption == '1':
-                    monster = gamefunctions.sleep(monster)
-                elif consoleoption == '2':
-                    monster = gamefunctions.shop_menu(monster)
-                elif consoleoption == '3':
-                    gamefunctions.view_inventory(monster)
-                elif consoleoption == '4':
-                    gamefunctions.save_game(monster, username)
-                elif consoleoption == '0':
-                    print('Returning to game...')
-                    print()
-                    gameGraphics.running = True
-                    break
-                else:
-                    print('Invalid option. Please try again.')
+    # Saves after every fight and menu visit without making the game wait for the disk. Autosaves
+    # go to a slot of their own, so only the player's own saves ever replace their slot
+    autosaver = gameSave.Autosaver(gamefunctions.saves, username + gameSave.AUTOSAVE_SUFFIX)
+    try:
+        while running:
+            # Edits to data/species.json or data/items.json take effect between visits to the map
+            try:
+                gameData.pack.reload_if_changed()
+            except (OSError, ValueError, KeyError) as error:
+                gameScreen.show(f'Could not reload game data, keeping the old data: {error}')
+            option, enemy = playMap(enemies)
+            if option == 'm':
+                gameGraphics.running = False
                 consoleoption = gamefunctions.print_user_menu(username, monster)
-            if consoleoption == '5':
-                save = input('Would you like to save your game before quitting? (y/n): ')
-                if save == 'y':
-                    gamefunctions.save_game(monster, username)
-                running = False
-        elif option == 'f':
-            monster, enemy.data = gamefunctions.fight_monster(monster, enemy.data)
-            if enemy.data['health'] <= 0:
-                enemies = [monster for monster in enemies if id(monster) != id(enemy)]
-            if len(enemies) == 0:
-                enemies.append(gameGraphics.WanderingMonster())
-                enemies.append(gameGraphics.WanderingMonster())
+                while consoleoption != '5':
+                    if consoleoption == '1':
+                        monster = gamefunctions.sleep(monster)
+                    elif consoleoption == '2':
+                        monster = gamefunctions.shop_menu(monster)
+                    elif consoleoption == '3':
+                        gamefunctions.view_inventory(monster)
+                    elif consoleoption == '4':
+                        gamefunctions.save_game(monster, username)
+                    elif consoleoption == '0':
+                        gameScreen.show('Returning to game...', '')
+                        gameGraphics.running = True
+                        break
+                    else:
+                        gameScreen.show('Invalid option. Please try again.')
+                    consoleoption = gamefunctions.print_user_menu(username, monster)
+                if consoleoption == '5':
+                    save = gameScreen.ask('Would you like to save your game before quitting? (y/n): ')
+                    if save == 'y':
+                        gamefunctions.save_game(monster, username)
+                    running = False
+                else:
+                    autosaver.request(monster, username)
+            elif option == 'f':
+                monster, enemy.data = gamefunctions.fight_monster(monster, enemy.data)
+                if enemy.data['health'] <= 0:
+                    enemies = [monster for monster in enemies if id(monster) != id(enemy)]
+                    gameGraphics.renderer.occupancy.remove(enemy)
+                if len(enemies) == 0:
+                    enemies.append(gameGraphics.WanderingMonster())
+                    enemies.append(gameGraphics.WanderingMonster())
+                autosaver.request(monster, username)
+    finally:
+        # Also writes a save still waiting in the queue when the game ends by an error or sys.exit
+        autosaver.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play the adventure game.')
+    parser.add_argument('--console', action='store_true', help='play in the console only, without the game window')
+    parser.add_argument('--startup-bench', action='store_true', help='report the cold start and import times of the game and exit')
+    parser.add_argument('--world', type=int, metavar='SIZE', help='play the map in a streamed world of SIZE by SIZE cells instead of the single board')
+    parser.add_argument('--seed', type=int, help='world seed for --world; the same seed always gives the same world')
+    args = parser.parse_args(argv)
+    if args.console and args.world is not None:
+        parser.error('--world needs the game window, so it can not be used with --console')
+    if args.startup_bench:
+        gameStartup.startup_report()
+    elif args.console:
+        # pygame is never imported, so this works without a display
+        game(console_map)
+    else:
+        # Only the window needs the asyncio loop, so console mode does not pay for importing it
+        import asyncio
+        import gameLoop
+
+        world = None
+        if args.world is not None:
+            import gameWorld
+
+            world = gameWorld.World(args.world, args.world, seed=args.seed)
+            gameWorld.install(world)
+        try:
+            # The window keeps drawing while the console menus wait for input
+            asyncio.run(gameLoop.GameLoop().run(game))
+        finally:
+            if world is not None:
+                world.close()
 
 if __name__ == '__main__':
-    game()
\ No newline at end of file
+    main()
\ No newline at end of file
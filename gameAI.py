@@ -0,0 +1,189 @@
+"""
+Fixed-timestep scheduling for the wandering monsters
+
+Monsters used to move only when the player pressed an arrow key, all of them at once, so the
+frame where the player moved paid for every monster. The AIScheduler moves them on its own
+clock instead. Time is split into fixed ticks (tickRate a second) and the monsters into
+buckets; each tick visits one bucket, so every monster is looked at once every
+buckets / tickRate seconds and only a slice of them is handled in any frame. On each visit a
+monster moves as often as its species' moveRate (from data/species.json) allows for the time
+since its last visit. Monsters further than wakeRadius cells from the player sleep and are
+skipped. A frame stops working on monsters once it has used budget seconds, and a tick that did
+not fit carries on where it stopped in the next frame. When the monsters need more time than
+the budget allows, whole ticks are dropped: monsters keep their speed but move in bigger steps.
+
+Classes:
+    - AIScheduler: Spreads monster moves over frames on a fixed timestep.
+
+Typical usage example:
+    scheduler = AIScheduler(tickRate=10, buckets=4, budget=0.002)
+    while running:
+        scheduler.update(monsters, playerPosition, renderer.move_monster)
+    print(scheduler.stats()['mean'])
+"""
+import collections
+import time
+
+import gameProfile
+import gameSpecies
+
+class AIScheduler:
+    """
+    Spreads monster moves over frames on a fixed timestep.
+
+    Attributes:
+        tickRate (int): AI ticks a second.
+        buckets (int): How many groups the monsters are split into; one group is visited per tick.
+        budget (float): The most seconds a frame spends on monsters, or None for no limit.
+        wakeRadius (int): Monsters further than this many cells from the player sleep, or None to keep every monster awake.
+        maxTicksBehind (int): Ticks that fall further behind than this are dropped instead of run late.
+        clock (function): Returns the current time in seconds.
+        ticks (int): The number of ticks finished.
+        droppedTicks (int): The number of ticks skipped because the scheduler fell too far behind.
+        frameUpdates (collections.deque): How many monster moves each of the recent frames made.
+        sleeping (int): How many monsters were asleep on their last visit.
+    """
+    # At most this many moves per visit, so a fast monster does not jump across the map after a long pause
+    MAX_MOVES_PER_VISIT = 3
+
+    def __init__(self, tickRate=10, buckets=4, budget=0.002, wakeRadius=20, maxTicksBehind=5, clock=time.perf_counter, history=300):
+        self.tickRate = tickRate
+        self.interval = 1 / tickRate
+        self.buckets = buckets
+        self.budget = budget
+        self.wakeRadius = wakeRadius
+        self.maxTicksBehind = maxTicksBehind
+        self.clock = clock
+        self.ticks = 0
+        self.droppedTicks = 0
+        self.frameUpdates = collections.deque(maxlen=history)
+        self.sleeping = 0
+        self.time = 0.0
+        self._last = None
+        self._backlog = 0.0
+        self._cursor = None
+        self._state = {}
+        self._species = None
+        self._rates = {}
+
+    def restart(self):
+        """
+        Forgets the time that passed since the last update, for when the map was paused. Monsters do not catch up on the pause.
+        """
+        self._last = None
+        self._backlog = 0.0
+
+    def update(self, monsters, player, move):
+        """
+        Runs the ticks that are due, within the frame's budget.
+
+        Arguments:
+            monsters (list): The monsters on the map. The list may change between calls.
+            player (list): The player's position [x, y], for putting far monsters to sleep.
+            move (function): Called with a monster to move it one step.
+
+        Returns:
+            updates (int): The number of moves made in this frame.
+        """
+        if gameSpecies.SPECIES is not self._species:
+            # First update, or the species table was reloaded: monsters pick up their new rates on their next visit
+            self._species = gameSpecies.SPECIES
+            self._rates = {species.name: species.moveRate for species in self._species}
+            self._state.clear()
+        now = self.clock()
+        if self._last is None:
+            self._last = now
+        self._backlog += now - self._last
+        self._last = now
+        limit = self.interval * self.maxTicksBehind
+        while self._backlog > limit:
+            # Too far behind to catch up: skip the tick. The monsters' clock still moves on, so they
+            # keep their speed and only move in bigger steps.
+            self._backlog -= self.interval
+            self.time += self.interval
+            self.droppedTicks += 1
+        deadline = None if self.budget is None else time.perf_counter() + self.budget
+        updates = 0
+        with gameProfile.span('ai'):
+            while self._cursor is not None or self._backlog >= self.interval:
+                if self._cursor is None:
+                    # Start the next tick on the next bucket
+                    self._backlog -= self.interval
+                    self.time += self.interval
+                    self._cursor = self.ticks % self.buckets
+                finished, updates = self._run_bucket(monsters, player, move, deadline, updates)
+                if not finished:
+                    break
+                self._cursor = None
+                self.ticks += 1
+                if self.ticks % self.buckets == 0:
+                    self._prune(monsters)
+        self.frameUpdates.append(updates)
+        gameProfile.count('ai_updates', updates)
+        return updates
+
+    def _run_bucket(self, monsters, player, move, deadline, updates):
+        # Visits the current bucket from the cursor on; returns whether it got to the end, and the moves so far
+        states = self._state
+        rates = self._rates
+        now = self.time
+        radius = self.wakeRadius
+        playerX, playerY = player
+        maxMoves = self.MAX_MOVES_PER_VISIT
+        clock = time.perf_counter
+        count = len(monsters)
+        step = self.buckets
+        index = self._cursor
+        checkAt = index + 32 * step
+        while index < count:
+            if deadline is not None and index >= checkAt:
+                if clock() > deadline:
+                    self._cursor = index
+                    return False, updates
+                checkAt = index + 32 * step
+            monster = monsters[index]
+            index += step
+            state = states.get(monster)
+            if state is None:
+                # [credit, time of the last visit, moves a second, asleep]
+                state = states[monster] = [0.0, now, rates.get(monster.data['name'], 1.0), False]
+            x, y = monster.position
+            if radius is not None and (abs(x - playerX) > radius or abs(y - playerY) > radius):
+                # Asleep: no moves are owed for the time spent asleep
+                state[1] = now
+                if not state[3]:
+                    state[3] = True
+                    self.sleeping += 1
+                continue
+            if state[3]:
+                state[3] = False
+                self.sleeping -= 1
+            credit = state[0] + state[2] * (now - state[1])
+            state[1] = now
+            moves = 0
+            while credit >= 1 and moves < maxMoves:
+                move(monster)
+                credit -= 1
+                moves += 1
+            state[0] = min(credit, 1.0)
+            updates += moves
+        return True, updates
+
+    def _prune(self, monsters):
+        # Forget monsters that left the map (killed, or their chunk was dropped)
+        if len(self._state) > 2 * len(monsters) + 64:
+            present = set(monsters)
+            self._state = {monster: state for monster, state in self._state.items() if monster in present}
+            self.sleeping = sum(state[3] for state in self._state.values())
+
+    def stats(self):
+        """
+        Summarizes the recent frames.
+
+        Returns:
+            stats (dict): The mean and max moves per frame over the recent frames, the moves in the last frame,
+            the ticks finished and dropped, and the number of sleeping monsters.
+        """
+        recent = self.frameUpdates
+        return {'mean': sum(recent) / len(recent) if recent else 0.0, 'max': max(recent, default=0),
+                'last': recent[-1] if recent else 0, 'ticks': self.ticks, 'dropped': self.droppedTicks, 'sleeping': self.sleeping}
@@ -0,0 +1,128 @@
+"""
+Sprite loading and caching for the game graphics
+
+This module keeps every sprite the game draws in memory so the render loop never has to
+touch the disk. Each sprite is loaded, scaled to the cell size and converted to the pixel
+format of the current display exactly once. If the display mode changes, the cache is
+rebuilt on the next lookup.
+
+Classes:
+    - AssetCache: Loads, scales, converts and caches the sprites used by draw_square.
+
+Typical usage example:
+    assets = AssetCache(cellSize)
+    screen.blit(assets.get_sprite('player'), (x, y))
+    print(assets.hits, assets.misses)
+"""
+import gameStartup
+
+# Imported when the first sprite is loaded (see gameStartup)
+pygame = gameStartup.lazy_import('pygame')
+
+# Image used for each kind of square, relative to the game folder
+SPRITE_PATHS = {
+    'player': 'assets/player.png',
+    'monster': 'assets/monster.png',
+}
+
+# Colors used when the image for a kind of square can not be found
+FALLBACK_COLORS = {
+    'player': (0, 0, 0),
+    'monster': (255, 0, 0),
+    'rock': (128, 128, 128),
+}
+
+class AssetCache:
+    """
+    Caches the scaled and converted sprites for each kind of square.
+
+    Attributes:
+        cellSize (int): The width and height every sprite is scaled to.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to load or build a sprite.
+    """
+    def __init__(self, cellSize, paths=None, colors=None):
+        self.cellSize = cellSize
+        self.paths = dict(SPRITE_PATHS if paths is None else paths)
+        self.colors = dict(FALLBACK_COLORS if colors is None else colors)
+        self.hits = 0
+        self.misses = 0
+        self._sprites = {}
+        self._displayMode = None
+
+    def get_sprite(self, type):
+        """
+        Returns the sprite for the given kind of square, loading it the first time it is needed.
+
+        Arguments:
+            type (str): The kind of square ('player' or 'monster').
+
+        Returns:
+            sprite (pygame.Surface): A cellSize x cellSize surface ready to be blitted.
+        """
+        displayMode = self._current_display_mode()
+        if displayMode != self._displayMode:
+            self._sprites.clear()
+            self._displayMode = displayMode
+        sprite = self._sprites.get(type)
+        if sprite is not None:
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        try:
+            sprite = self._load_image(self.paths[type])
+        except (KeyError, FileNotFoundError):
+            sprite = self._fallback_surface(type)
+        self._sprites[type] = sprite
+        return sprite
+
+    def clear(self):
+        """
+        Forgets every cached sprite and resets the hit and miss counters.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self._sprites.clear()
+        self._displayMode = None
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict): The hits, misses and number of cached sprites.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'cached': len(self._sprites)}
+
+    def _current_display_mode(self):
+        display = pygame.display.get_surface() if pygame.display.get_init() else None
+        if display is None:
+            return None
+        return display.get_size(), display.get_bitsize()
+
+    def _load_image(self, path):
+        image = pygame.image.load(path)
+        image = pygame.transform.scale(image, (self.cellSize, self.cellSize))
+        return self._convert(image)
+
+    def _fallback_surface(self, type):
+        surface = pygame.Surface((self.cellSize, self.cellSize))
+        surface.fill(self.colors.get(type, (255, 0, 255)))
+        return self._convert(surface)
+
+    def _convert(self, surface):
+        # convert() needs a display mode, so leave the surface as it is until one exists
+        if self._displayMode is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA or surface.get_alpha() is not None:
+            return surface.convert_alpha()
+        return surface.convert()
@@ -0,0 +1,107 @@
+"""
+Line protocol client for gameServer
+
+Stands in for the console when the game runs on a gameServer: it sends what the player types
+one line at a time and prints the text of each answer. GameClient is also what scripts and
+the load generator (benchmarks/server_load.py) use to play sessions.
+
+Classes:
+    - GameClient: One connection to a gameServer.
+
+Functions:
+    - main: Command line entry point that plays a game on a server from the console.
+
+Typical usage example:
+    client = await GameClient.connect('127.0.0.1', 8765)
+    response = await client.send('new Cameron')
+    print(response['mode'], response['text'])
+    await client.close()
+"""
+import argparse
+import asyncio
+import json
+
+class GameClient:
+    """
+    One connection to a gameServer.
+
+    Attributes:
+        greeting (dict): The response the server sent when the connection opened.
+        mode (str): The session's mode after the last response.
+    """
+    def __init__(self, reader, writer, greeting):
+        self.reader = reader
+        self.writer = writer
+        self.greeting = greeting
+        self.mode = greeting['mode']
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765):
+        """
+        Opens a connection and reads the server's greeting.
+
+        Arguments:
+            host (str, optional): The server's address. Default is 127.0.0.1.
+            port (int, optional): The server's port. Default is 8765.
+
+        Returns:
+            client (GameClient): The connected client.
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        greeting = json.loads(await reader.readline())
+        return cls(reader, writer, greeting)
+
+    async def send(self, line):
+        """
+        Sends one command line and waits for the answer.
+
+        Arguments:
+            line (str): The command, such as 'move left'.
+
+        Returns:
+            response (dict): ok, mode and text, as described in gameServer.
+
+        Raises:
+            ConnectionError: If the server closed the connection.
+        """
+        self.writer.write(line.encode() + b'\n')
+        await self.writer.drain()
+        answer = await self.reader.readline()
+        if not answer:
+            raise ConnectionError('the server closed the connection')
+        response = json.loads(answer)
+        self.mode = response['mode']
+        return response
+
+    async def close(self):
+        """
+        Closes the connection.
+        """
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def _console(host, port):
+    client = await GameClient.connect(host, port)
+    print('\n'.join(client.greeting['text']))
+    try:
+        while client.mode != 'over':
+            line = await asyncio.to_thread(input, f'[{client.mode}] > ')
+            response = await client.send(line)
+            print('\n'.join(response['text']))
+    except (EOFError, ConnectionError):
+        pass
+    finally:
+        await client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(_console(args.host, args.port))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+"""
+Combat rules for the game, without any input, output or waiting
+
+This module resolves fights between the player and an enemy monster. It holds the same rules as
+fight_monster, but it never prints, asks for input or sleeps. Each move returns a list of
+events describing what happened, which fight_monster turns into text and simulations can
+count or ignore.
+
+Classes:
+    - CombatEngine: Applies moves to a fight between a player and an enemy.
+
+Functions:
+    - simulate_fight: Resolves a whole fight with a strategy and a seeded random number generator.
+
+Strategies:
+    - 'attack': Always attack.
+    - 'weapon': Wield a weapon before every attack while one is left.
+    - 'potion': Use a Potion if there is one, otherwise attack.
+    - 'run': Run away straight away.
+
+Typical usage example:
+    result = simulate_fight(player, enemy, 'weapon', random.Random(42))
+    print(result['outcome'], result['turns'])
+"""
+import math
+import random
+
+# Outcomes of a fight
+WON = 'won'
+LOST = 'lost'
+RAN = 'ran'
+
+class CombatEngine:
+    """
+    Applies moves to a fight between a player and an enemy, changing both dictionaries in place.
+
+    Attributes:
+        player (dict): The player's monster dictionary.
+        enemy (dict): The enemy monster dictionary.
+        rng (random.Random): Where every random number in the fight comes from.
+        weaponUsed (bool): Whether the next attack gets the weapon bonus.
+        turns (int): The number of moves applied so far.
+        outcome (str): WON, LOST or RAN once the fight is over, otherwise None.
+        record (bool): Whether events are built and returned. Simulations can turn this off.
+    """
+    def __init__(self, player, enemy, rng=None, record=True):
+        self.player = player
+        self.enemy = enemy
+        self.rng = random if rng is None else rng
+        self.record = record
+        self.weaponUsed = False
+        self.turns = 0
+        self.outcome = None
+
+    @property
+    def finished(self):
+        return self.outcome is not None
+
+    def weapons(self):
+        """
+        Returns the weapons in the player's inventory, one per stack for a gameEntities.Inventory.
+        """
+        inventory = self.player["inventory"]
+        if hasattr(inventory, 'weapons'):
+            return inventory.weapons()
+        return [item for item in inventory if item["type"] == "weapon"]
+
+    def consumables(self):
+        """
+        Returns the consumables in the player's inventory, one per stack for a gameEntities.Inventory.
+        """
+        inventory = self.player["inventory"]
+        if hasattr(inventory, 'consumables'):
+            return inventory.consumables()
+        return [item for item in inventory if item["type"] == "consumable"]
+
+    def attack(self):
+        """
+        The player attacks, then the enemy strikes back if it is still standing.
+
+        Arguments:
+            None
+
+        Returns:
+            events (list): 'attack' and, if the enemy survived, 'enemy_attack' events, plus the end of fight event if there is one.
+        """
+        events = []
+        self.turns += 1
+        player = self.player
+        enemy = self.enemy
+        rng = self.rng
+        base_damage = player["power"]
+        boosted = self.weaponUsed
+        if boosted:
+            base_damage += 20
+            self.weaponUsed = False
+            damage_enemy = math.floor(base_damage * rng.uniform(0.8, 1.2))
+        else:
+            damage_enemy = math.floor(base_damage * rng.uniform(0.3, 0.8))
+        enemy["health"] -= damage_enemy
+        if enemy["health"] <= 0:
+            enemy["health"] = 0
+        if self.record:
+            events.append({'type': 'attack', 'damage': damage_enemy, 'boosted': boosted, 'enemyHealth': enemy["health"]})
+        if enemy["health"] > 0:
+            damage = math.floor(enemy["power"] * rng.random())
+            player["health"] -= damage
+            if player["health"] <= 0:
+                player["health"] = 0
+            if self.record:
+                events.append({'type': 'enemy_attack', 'damage': damage, 'playerHealth': player["health"], 'enemyHealth': enemy["health"]})
+        self.check_end(events)
+        return events
+
+    def run(self):
+        """
+        The player runs away and drops some gold.
+
+        Arguments:
+            None
+
+        Returns:
+            events (list): A single 'ran' event.
+        """
+        self.turns += 1
+        dropped = self.rng.randint(1, 10)
+        self.player["money"] -= dropped
+        if self.player["money"] < 0:
+            self.player["money"] = 0
+        self.outcome = RAN
+        return [{'type': 'ran', 'dropped': dropped}] if self.record else []
+
+    def use_weapon(self, weapon):
+        """
+        The player wields a weapon so the next attack does more damage. The weapon loses 10 durability and is removed once it reaches 0.
+
+        Arguments:
+            weapon (dict): A weapon from the player's inventory.
+
+        Returns:
+            events (list): A 'weapon' event, with broken set if the weapon was removed.
+        """
+        self.turns += 1
+        self.weaponUsed = True
+        inventory = self.player["inventory"]
+        if hasattr(inventory, 'wear'):
+            # Stacked weapons are shared, so the inventory splits off the one being worn
+            weapon = inventory.wear(weapon, 10)
+            broken = weapon['currentDurability'] <= 0
+        else:
+            weapon['currentDurability'] -= 10
+            broken = weapon['currentDurability'] <= 0
+            if broken:
+                inventory.remove(weapon)
+        if not self.record:
+            return []
+        return [{'type': 'weapon', 'weapon': weapon, 'broken': broken}]
+
+    def use_consumable(self, consumable):
+        """
+        The player uses a consumable. A Potion defeats the enemy in one strike; other consumables do nothing yet.
+
+        Arguments:
+            consumable (dict): A consumable from the player's inventory.
+
+        Returns:
+            events (list): A 'potion' or 'unusable' event, plus the end of fight event if there is one.
+        """
+        self.turns += 1
+        if consumable["name"] != "Potion":
+            # TODO: Implement other consumables as needed in future
+            return [{'type': 'unusable', 'item': consumable}] if self.record else []
+        events = [{'type': 'potion', 'item': consumable}] if self.record else []
+        self.enemy["health"] = 0
+        self.player["inventory"].remove(consumable)
+        self.check_end(events)
+        return events
+
+    def check_end(self, events=None):
+        """
+        Ends the fight if the player or the enemy is down. A defeated player loses half their gold; a victorious one takes the enemy's gold.
+
+        Arguments:
+            events (list, optional): The list to add the 'defeat' or 'victory' event to.
+
+        Returns:
+            events (list): The events list, with the end of fight event added if the fight is over.
+        """
+        if events is None:
+            events = []
+        if self.player["health"] <= 0:
+            self.player["money"] = self.player["money"] // 2
+            self.outcome = LOST
+            if self.record:
+                events.append({'type': 'defeat'})
+        elif self.enemy["health"] <= 0:
+            self.player["money"] += self.enemy["money"]
+            self.outcome = WON
+            if self.record:
+                events.append({'type': 'victory', 'enemy': self.enemy["name"], 'gold': self.enemy["money"]})
+        return events
+
+def _attack_strategy(engine):
+    return engine.attack()
+
+def _weapon_strategy(engine):
+    if not engine.weaponUsed:
+        weapons = engine.weapons()
+        if weapons:
+            return engine.use_weapon(weapons[0])
+    return engine.attack()
+
+def _potion_strategy(engine):
+    for item in engine.player["inventory"]:
+        if item["type"] == "consumable" and item["name"] == "Potion":
+            return engine.use_consumable(item)
+    return engine.attack()
+
+def _run_strategy(engine):
+    return engine.run()
+
+STRATEGIES = {
+    'attack': _attack_strategy,
+    'weapon': _weapon_strategy,
+    'potion': _potion_strategy,
+    'run': _run_strategy,
+}
+
+def simulate_fight(player, enemy, strategy='attack', rng=None, record=True, maxTurns=1000):
+    """
+    Resolves a whole fight with no input, output or waiting. The dictionaries are changed in place, so pass copies to keep the originals.
+
+    Parameters:
+    player (dict): The player's monster dictionary.
+    enemy (dict): The enemy monster dictionary.
+    strategy (str or callable, optional): A name from STRATEGIES, or a function that makes one move on the engine and returns its events. Default is 'attack'.
+    rng (random.Random, optional): Seeded random number generator for a repeatable fight. Defaults to the random module.
+    record (bool, optional): Whether to keep the event log. Default is True.
+    maxTurns (int, optional): Moves after which the fight is stopped with no outcome. Default is 1000.
+
+    Returns:
+    A dictionary with the outcome (WON, LOST, RAN or None), the number of turns, the gold the player gained or lost, and the list of events.
+
+    Example:
+    result = simulate_fight(player.copy(), enemy.copy(), 'potion', random.Random(1))
+    """
+    move = STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+    engine = CombatEngine(player, enemy, rng, record)
+    startMoney = player["money"]
+    events = []
+    while engine.outcome is None and engine.turns < maxTurns:
+        turnEvents = move(engine)
+        if record:
+            events.extend(turnEvents)
+    return {
+        'outcome': engine.outcome,
+        'turns': engine.turns,
+        'gold': player["money"] - startMoney,
+        'events': events,
+    }
@@ -0,0 +1,444 @@
+"""
+Compiled, read-only pack of the game's data tables
+
+The species and item tables are kept in JSON files under data/ so they are easy to edit. They
+are compiled into one binary file, data/game.pack. Every process maps that file read-only
+instead of reading the JSON into objects of its own. Server and simulator workers then share
+the operating system's single copy of its pages, and a record is only turned into a Python
+object when it is looked up:
+
+    header    magic b'AGDP', format version, number of sections
+    sections  one (tag, offset, length) entry per section
+    META      JSON with the SHA-1 of every source file the pack was compiled from
+    STRS      every distinct string, stored once
+    SPEC      one fixed-size record per species, pointing into STRS
+    SIDX      a hash table from species name to record number
+    ITEM      one fixed-size record per kind of item, pointing into STRS
+    IIDX      a hash table from item name to record number
+
+Decoding is the price of sharing: the mapped pages are one copy for every process, but a
+decoded record is a Python object private to the process that looked it up. Each Table keeps
+the CACHE_SIZE most recently used records (and names) decoded, so the hot species and items
+cost one dictionary lookup after their first use, while a process's own memory for records
+stays bounded however large the tables grow. A bigger cache trades that per-process memory
+for fewer decodes of cold records.
+
+The pack is compiled again when it is missing or a source file has changed. A running game
+picks up edits through GameData.reload_if_changed, which maps the new pack in and tells the
+modules that keep tables (gameSpecies, gameEntities) through on_reload.
+
+Classes:
+    - Species: One row of the species table.
+    - ItemKind: One row of the item table.
+    - Table: The records of one table, indexed by number and by name.
+    - NameIndex: A read-only mapping from name to record over a Table.
+    - GameData: An open pack.
+    - DataPackError: Raised for files that are not packs or are damaged.
+
+Functions:
+    - read_species: Read a species JSON file into Species records.
+    - read_items: Read an item JSON file into ItemKind records.
+    - compile_pack: Compile the source files into a pack file.
+
+Typical usage example:
+    goblin = gameData.pack.speciesByName['Goblin']
+    for kind in gameData.pack.catalog():
+        print(kind.name, kind.price)
+    gameData.pack.reload_if_changed()
+"""
+import collections
+import collections.abc
+import hashlib
+import json
+import mmap
+import operator
+import os
+import struct
+import zlib
+
+import gameFiles
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SPECIES_FILE = os.path.join(DATA_DIR, 'species.json')
+ITEMS_FILE = os.path.join(DATA_DIR, 'items.json')
+PACK_FILE = os.path.join(DATA_DIR, 'game.pack')
+
+# The source file of each table
+SOURCES = {'species': SPECIES_FILE, 'items': ITEMS_FILE}
+
+MAGIC = b'AGDP'
+VERSION = 1
+
+# Decoded records kept per table, and names per table; beyond this the least recently used are dropped
+CACHE_SIZE = 4096
+
+_HEADER = struct.Struct('<4sHH')
+_SECTION = struct.Struct('<4sQQ')
+_STRING = struct.Struct('<II')
+_NUMBER = struct.Struct('<I')
+# name and description strings, the low and high of health, power and money, moveRate, hostile
+_SPECIES = struct.Struct('<IIIIqqqqqqd?')
+# name, type and description strings, flags, price, power, maxDurability, shop durability low and high
+_ITEM = struct.Struct('<IIIIIIBdqqqq')
+
+_NO_STRING = 0xFFFFFFFF
+
+# Item record flags
+_FLOAT_PRICE = 1
+_HAS_POWER = 2
+_HAS_MAX_DURABILITY = 4
+_STOCKED = 8
+_HAS_DURABILITY_RANGE = 16
+
+# Each stat range is an inclusive (low, high) pair, like the arguments to random.randint. moveRate is in moves a second.
+# Hostile species chase the player when they are close enough (see gamePath).
+Species = collections.namedtuple('Species', ['name', 'description', 'health', 'power', 'money', 'moveRate', 'hostile'], defaults=(1.0, False))
+
+# stocked kinds are sold in the shop; durability is the inclusive range the shop draws a new weapon's current durability from
+ItemKind = collections.namedtuple('ItemKind', ['name', 'type', 'price', 'power', 'maxDurability', 'description', 'stocked', 'durability'],
+                                  defaults=(None, None, None, False, None))
+
+class DataPackError(ValueError):
+    """
+    Raised when a file is not a game data pack, is damaged or was written by a newer version of the game.
+    """
+
+def read_species(path=SPECIES_FILE):
+    """
+    Reads a species definition file.
+
+    Arguments:
+        path (str, optional): The JSON file to read. Defaults to data/species.json.
+
+    Returns:
+        species (tuple): A Species record for each entry, in file order.
+    """
+    with open(path, 'r') as file:
+        entries = json.load(file)
+    return tuple(Species(entry['name'], entry['description'], tuple(entry['health']), tuple(entry['power']), tuple(entry['money']),
+                         entry.get('moveRate', 1.0), entry.get('hostile', False)) for entry in entries)
+
+def read_items(path=ITEMS_FILE):
+    """
+    Reads an item definition file. Entries with a "shop" object are sold in the shop.
+
+    Arguments:
+        path (str, optional): The JSON file to read. Defaults to data/items.json.
+
+    Returns:
+        items (tuple): An ItemKind record for each entry, in file order.
+    """
+    with open(path, 'r') as file:
+        entries = json.load(file)
+    items = []
+    for entry in entries:
+        shop = entry.get('shop')
+        durability = None if shop is None or 'durability' not in shop else tuple(shop['durability'])
+        items.append(ItemKind(entry['name'], entry['type'], entry['price'], entry.get('power'), entry.get('maxDurability'),
+                              entry.get('description'), shop is not None, durability))
+    return tuple(items)
+
+def compile_pack(path=PACK_FILE, sources=SOURCES):
+    """
+    Compiles the source files into a pack. The pack is replaced atomically, so processes that have the old one open keep working.
+
+    Arguments:
+        path (str, optional): The pack file to write. Defaults to data/game.pack.
+        sources (dict, optional): The 'species' and 'items' JSON files. Defaults to the files in data/.
+
+    Returns:
+        None
+
+    Raises:
+        DataPackError: If two species or two items have the same name.
+    """
+    digests = {table: _digest(source) for table, source in sources.items()}
+    gameFiles.atomic_write(path, _encode(read_species(sources['species']), read_items(sources['items']), digests))
+
+def _digest(path):
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def _encode(species, items, digests):
+    strings = bytearray()
+    offsets = {}
+
+    def string(text):
+        if text is None:
+            return (_NO_STRING, 0)
+        reference = offsets.get(text)
+        if reference is None:
+            encoded = text.encode('utf-8')
+            reference = offsets[text] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return reference
+
+    speciesRecords = b''.join(_SPECIES.pack(*string(entry.name), *string(entry.description), *entry.health, *entry.power, *entry.money,
+                                            float(entry.moveRate), bool(entry.hostile)) for entry in species)
+    itemRecords = []
+    for kind in items:
+        flags = ((_FLOAT_PRICE if isinstance(kind.price, float) else 0) | (_HAS_POWER if kind.power is not None else 0) |
+                 (_HAS_MAX_DURABILITY if kind.maxDurability is not None else 0) | (_STOCKED if kind.stocked else 0) |
+                 (_HAS_DURABILITY_RANGE if kind.durability is not None else 0))
+        itemRecords.append(_ITEM.pack(*string(kind.name), *string(kind.type), *string(kind.description), flags, float(kind.price),
+                                      kind.power or 0, kind.maxDurability or 0, *(kind.durability or (0, 0))))
+    sections = [
+        (b'META', json.dumps({'version': VERSION, 'sources': digests}, sort_keys=True).encode()),
+        (b'STRS', bytes(strings)),
+        (b'SPEC', speciesRecords),
+        (b'SIDX', _name_index('species', [entry.name for entry in species])),
+        (b'ITEM', b''.join(itemRecords)),
+        (b'IIDX', _name_index('item', [kind.name for kind in items])),
+    ]
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for tag, body in sections:
+        table.append(_SECTION.pack(tag, offset, len(body)))
+        offset += len(body)
+    return b''.join([_HEADER.pack(MAGIC, VERSION, len(sections))] + table + [body for tag, body in sections])
+
+def _name_index(kind, names):
+    # An open-addressing hash table at most half full: slot crc32(name) & mask holds the record number plus one, or 0 when empty
+    size = 1
+    while size < 2 * len(names):
+        size *= 2
+    slots = [0] * size
+    seen = set()
+    for number, name in enumerate(names):
+        if name in seen:
+            raise DataPackError(f'there is more than one {kind} called {name!r}')
+        seen.add(name)
+        slot = zlib.crc32(name.encode('utf-8')) & (size - 1)
+        while slots[slot]:
+            slot = (slot + 1) & (size - 1)
+        slots[slot] = number + 1
+    return struct.pack(f'<{size}I', *slots)
+
+def _read_sections(view):
+    # Returns {tag: (offset, length)} from a mapped pack
+    if len(view) < _HEADER.size:
+        raise DataPackError('the file is too short to be a game data pack')
+    magic, version, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise DataPackError('the file is not a game data pack')
+    if version > VERSION:
+        raise DataPackError(f'the pack was written by a newer version of the game (format {version})')
+    sections = {}
+    for number in range(count):
+        tag, offset, length = _SECTION.unpack_from(view, _HEADER.size + number * _SECTION.size)
+        if offset + length > len(view):
+            raise DataPackError(f'the {tag.decode()} section runs past the end of the pack')
+        sections[tag] = (offset, length)
+    return sections
+
+def _pack_digests(path):
+    # The source digests a pack file on disk was compiled from, or None if there is no usable pack
+    try:
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            offset, length = _read_sections(view)[b'META']
+            return json.loads(view[offset:offset + length])['sources']
+    except (OSError, ValueError, KeyError):
+        return None
+
+class Table(collections.abc.Sequence):
+    """
+    The records of one table in a pack, decoded when they are looked up.
+
+    Works like a tuple of records (len, indexing and iteration, so random.choice can pick from
+    it); find looks a record up by name in the table's hash index.
+    The most recently used CACHE_SIZE decoded records, and as many names, are cached; the least
+    recently used one is dropped to make room for a new one.
+    """
+    def __init__(self, view, records, index, strings, record, decode):
+        self._view = view
+        self._start = records[0]
+        self._count = records[1] // record.size
+        self._index = index[0]
+        self._slots = index[1] // _NUMBER.size
+        self._strings = strings[0]
+        self._record = record
+        self._decode = decode
+        self._cache = collections.OrderedDict()
+        self._byName = collections.OrderedDict()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, number):
+        record = self._cache.get(number)
+        if record is not None:
+            self._cache.move_to_end(number)
+            return record
+        position = operator.index(number)
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError('table index out of range')
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.popitem(last=False)
+        record = self._cache[number] = self._decode(self, self._record.unpack_from(self._view, self._start + position * self._record.size))
+        return record
+
+    def find(self, name):
+        """
+        Returns the record with the given name, or None if there is none.
+        """
+        record = self._byName.get(name)
+        if record is not None:
+            self._byName.move_to_end(name)
+            return record
+        key = name.encode('utf-8')
+        view = self._view
+        mask = self._slots - 1
+        slot = zlib.crc32(key) & mask
+        while True:
+            number = _NUMBER.unpack_from(view, self._index + slot * _NUMBER.size)[0] - 1
+            if number < 0:
+                return None
+            offset, length = _STRING.unpack_from(view, self._start + number * self._record.size)
+            if length == len(key) and view[self._strings + offset:self._strings + offset + length] == key:
+                break
+            slot = (slot + 1) & mask
+        if len(self._byName) >= CACHE_SIZE:
+            self._byName.popitem(last=False)
+        record = self._byName[name] = self[number]
+        return record
+
+    def string(self, offset, length):
+        """
+        Returns a string from the pack's string section, or None for a missing one.
+        """
+        if offset == _NO_STRING:
+            return None
+        start = self._strings + offset
+        return self._view[start:start + length].decode('utf-8')
+
+class NameIndex(collections.abc.Mapping):
+    """
+    A read-only mapping from name to record over a Table, in the table's order.
+    """
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, name):
+        record = self._table.find(name)
+        if record is None:
+            raise KeyError(name)
+        return record
+
+    def __iter__(self):
+        return (record.name for record in self._table)
+
+    def __len__(self):
+        return len(self._table)
+
+def _decode_species(table, fields):
+    # tuple.__new__ skips the namedtuple's argument handling, which is most of the cost of a decode
+    string = table.string
+    return tuple.__new__(Species, (string(fields[0], fields[1]), string(fields[2], fields[3]), (fields[4], fields[5]), (fields[6], fields[7]),
+                                   (fields[8], fields[9]), fields[10], fields[11]))
+
+def _decode_item(table, fields):
+    string = table.string
+    flags = fields[6]
+    return tuple.__new__(ItemKind, (string(fields[0], fields[1]), string(fields[2], fields[3]),
+                                    fields[7] if flags & _FLOAT_PRICE else int(fields[7]),
+                                    fields[8] if flags & _HAS_POWER else None,
+                                    fields[9] if flags & _HAS_MAX_DURABILITY else None,
+                                    string(fields[4], fields[5]),
+                                    bool(flags & _STOCKED),
+                                    (fields[10], fields[11]) if flags & _HAS_DURABILITY_RANGE else None))
+
+class GameData:
+    """
+    An open pack, mapped read-only.
+
+    Attributes:
+        path (str): The pack file.
+        sources (dict): The source file of each table, or None to use the pack as it is and never compile it.
+        species (Table): The Species records, in file order.
+        speciesByName (NameIndex): The Species records by name.
+        items (Table): The ItemKind records, in file order.
+        itemsByName (NameIndex): The ItemKind records by name.
+        digests (dict): The SHA-1 of each source file the open pack was compiled from.
+        generation (int): Goes up every time a changed pack is mapped in.
+    """
+    def __init__(self, path=PACK_FILE, sources=SOURCES):
+        self.path = path
+        self.sources = sources
+        self.generation = 0
+        self._listeners = []
+        self._sourceStamps = None
+        if sources is not None and self._sources_changed():
+            compile_pack(path, sources)
+        self._open()
+
+    def catalog(self):
+        """
+        Returns the ItemKind records the shop sells, in file order.
+        """
+        if self._catalog is None:
+            self._catalog = tuple(kind for kind in self.items if kind.stocked)
+        return self._catalog
+
+    def on_reload(self, listener):
+        """
+        Calls listener with this GameData every time reload_if_changed maps in a changed pack.
+        """
+        self._listeners.append(listener)
+
+    def reload_if_changed(self):
+        """
+        Compiles the pack again if a source file changed, and maps it in if the pack file changed, for example because another process compiled it.
+
+        Records already looked up keep their old values; look them up again after a reload.
+
+        Returns:
+            reloaded (bool): Whether a changed pack was mapped in.
+        """
+        if self.sources is not None and self._sources_changed():
+            compile_pack(self.path, self.sources)
+        try:
+            status = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        if (status.st_ino, status.st_mtime_ns, status.st_size) == self._stamp:
+            return False
+        self._open()
+        self.generation += 1
+        for listener in self._listeners:
+            listener(self)
+        return True
+
+    def _sources_changed(self):
+        # Whether the sources differ from what the pack on disk was compiled from. Files are only hashed when their size or time changed.
+        stamps = {}
+        for table, source in self.sources.items():
+            status = os.stat(source)
+            stamps[table] = (status.st_mtime_ns, status.st_size)
+        if stamps == self._sourceStamps:
+            return False
+        self._sourceStamps = stamps
+        return {table: _digest(source) for table, source in self.sources.items()} != _pack_digests(self.path)
+
+    def _open(self):
+        with open(self.path, 'rb') as file:
+            view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            status = os.fstat(file.fileno())
+        sections = _read_sections(view)
+        try:
+            offset, length = sections[b'META']
+            self.digests = json.loads(view[offset:offset + length])['sources']
+            strings = sections[b'STRS']
+            self.species = Table(view, sections[b'SPEC'], sections[b'SIDX'], strings, _SPECIES, _decode_species)
+            self.items = Table(view, sections[b'ITEM'], sections[b'IIDX'], strings, _ITEM, _decode_item)
+        except KeyError as error:
+            raise DataPackError(f'the pack has no {error.args[0]!r} section') from None
+        self.speciesByName = NameIndex(self.species)
+        self.itemsByName = NameIndex(self.items)
+        self._catalog = None
+        # The old map, if any, stays open until nothing uses its tables any more
+        self._stamp = (status.st_ino, status.st_mtime_ns, status.st_size)
+
+# The game's own data, compiled from data/ first if needed
+pack = GameData()
@@ -0,0 +1,547 @@
+"""
+Compact entity types for the player, monsters and items
+
+This module replaces the plain dictionaries used for monsters and items with small classes that
+use __slots__. Everything that is the same for every copy of an item (name, type, price, power,
+maximum durability) lives in one shared ItemDefinition; an Item only points at its definition,
+and a Weapon adds its own current durability.
+
+All the classes can still be read and written like the dictionaries they replace
+(monster["health"], weapon['currentDurability'] -= 10), and to_dict/from_dict convert to and from
+the dictionaries stored in save files.
+
+Classes:
+    - ItemDefinition: The shared, read-only description of a kind of item.
+    - Item: One item in an inventory.
+    - Weapon: An item that wears out as it is used.
+    - Inventory: A monster's items, with identical items stacked as counts.
+    - Monster: The player or an enemy monster.
+
+Functions:
+    - make_item: Creates an item of a kind listed in ITEMS.
+    - shop_stock: Creates one of every item the shop sells.
+    - item_from_dict: Creates an item from a dictionary in the save file format.
+
+Typical usage example:
+    sword = make_item('Sword', currentDurability=80)
+    monster = Monster('Goblin', 'A goblin.', 20, 10, 30)
+    monster["inventory"].append(sword)
+    json.dumps(monster.to_dict())
+"""
+import random
+import types
+
+import gameData
+
+class ItemDefinition:
+    """
+    The shared, read-only description of a kind of item.
+
+    Definitions are interned: asking for the same fields twice returns the same object, so every
+    Sword in every inventory shares one definition.
+
+    Attributes:
+        name (str): The name shown to the player.
+        type (str): 'weapon' or 'consumable'.
+        price (int): The shop price.
+        power (int): The extra damage of a weapon, or None.
+        maxDurability (int): The durability of a new weapon, or None.
+        description (str): A short description, or None.
+    """
+    __slots__ = ('name', 'type', 'price', 'power', 'maxDurability', 'description')
+
+    _interned = {}
+
+    def __new__(cls, name, type, price, power=None, maxDurability=None, description=None):
+        key = (name, type, price, power, maxDurability, description)
+        definition = cls._interned.get(key)
+        if definition is None:
+            definition = super().__new__(cls)
+            for field, value in zip(cls.__slots__, key):
+                object.__setattr__(definition, field, value)
+            cls._interned[key] = definition
+        return definition
+
+    def __setattr__(self, name, value):
+        raise AttributeError('item definitions are shared and can not be changed')
+
+    def __repr__(self):
+        return f'ItemDefinition({self.name!r}, {self.type!r}, {self.price!r})'
+
+    def __reduce__(self):
+        return (ItemDefinition, tuple(getattr(self, field) for field in self.__slots__))
+
+def _item_definitions(data):
+    return {kind.name: ItemDefinition(kind.name, kind.type, kind.price, kind.power, kind.maxDurability, kind.description) for kind in data.items}
+
+# Every kind of item, by name, from the item table in gameData (data/items.json). Follows the pack when it is reloaded.
+ITEMS = _item_definitions(gameData.pack)
+
+def _reload_items(data):
+    global ITEMS
+    ITEMS = _item_definitions(data)
+
+gameData.pack.on_reload(_reload_items)
+
+class Item:
+    """
+    One item in an inventory. Everything about it comes from its shared definition.
+
+    Attributes:
+        definition (ItemDefinition): What kind of item this is.
+    """
+    __slots__ = ('definition',)
+
+    # Keys the item has when read like a dictionary, in save file order
+    _keys = ('name', 'type', 'price')
+
+    def __init__(self, definition):
+        self.definition = definition
+
+    name = property(lambda self: self.definition.name)
+    type = property(lambda self: self.definition.type)
+    price = property(lambda self: self.definition.price)
+    description = property(lambda self: self.definition.description)
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        raise KeyError(f'{key} is shared by every {self.definition.name} and can not be changed')
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+    def keys(self):
+        return self._keys
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def copy(self):
+        """
+        Returns a new item of the same kind. Plain items have no state of their own, so this is cheap.
+        """
+        return Item(self.definition)
+
+    def stack_key(self):
+        """
+        Returns the key items are stacked by in an Inventory. Items with equal keys are interchangeable.
+        """
+        return self.definition
+
+    def to_dict(self):
+        """
+        Returns the item as a dictionary in the save file format.
+        """
+        return {key: self[key] for key in self._keys}
+
+class Weapon(Item):
+    """
+    An item that loses durability each time it is used.
+
+    Attributes:
+        definition (ItemDefinition): What kind of weapon this is.
+        currentDurability (int): How much use is left in this weapon.
+    """
+    __slots__ = ('currentDurability',)
+
+    _keys = ('name', 'type', 'price', 'power', 'maxDurability', 'currentDurability')
+
+    def __init__(self, definition, currentDurability=None):
+        self.definition = definition
+        self.currentDurability = definition.maxDurability if currentDurability is None else currentDurability
+
+    power = property(lambda self: self.definition.power)
+    maxDurability = property(lambda self: self.definition.maxDurability)
+
+    def __setitem__(self, key, value):
+        if key != 'currentDurability':
+            super().__setitem__(key, value)
+        self.currentDurability = value
+
+    def copy(self):
+        return Weapon(self.definition, self.currentDurability)
+
+    def stack_key(self):
+        # Interned, so every inventory holding a stack of this weapon shares one key tuple
+        key = (self.definition, self.currentDurability)
+        return _WEAPON_KEYS.setdefault(key, key)
+
+# (definition, durability) -> the same tuple; there are only as many as kinds of weapon times durabilities
+_WEAPON_KEYS = {}
+
+def make_item(name, **state):
+    """
+    Creates an item of a kind listed in ITEMS.
+
+    Arguments:
+        name (str): The kind of item, such as 'Sword' or 'Potion'.
+        state: Per-item values, such as currentDurability for weapons.
+
+    Returns:
+        item (Item): A new Item, or a Weapon for weapons.
+    """
+    definition = ITEMS[name]
+    if definition.type == 'weapon':
+        return Weapon(definition, **state)
+    return Item(definition)
+
+def shop_stock(rng=random):
+    """
+    Creates one of every item the shop sells, in the order of the item table. Weapons get a current durability drawn from the table's range.
+
+    Arguments:
+        rng (random.Random, optional): The generator to draw durabilities from. Defaults to the random module.
+
+    Returns:
+        items (list): The items for sale.
+    """
+    items = []
+    for kind in gameData.pack.catalog():
+        if kind.durability is not None:
+            items.append(make_item(kind.name, currentDurability=rng.randint(*kind.durability)))
+        else:
+            items.append(make_item(kind.name))
+    return items
+
+def item_from_dict(data):
+    """
+    Creates an item from a dictionary in the save file format. Items that match a kind in ITEMS share its definition.
+
+    Arguments:
+        data (dict or Item): The item as stored in the save file. Items are returned unchanged.
+
+    Returns:
+        item (Item): A new Item, or a Weapon for weapons.
+    """
+    if isinstance(data, Item):
+        return data
+    definition = ItemDefinition(data['name'], data['type'], data.get('price'), data.get('power'), data.get('maxDurability'), data.get('description'))
+    if definition.type == 'weapon':
+        return Weapon(definition, data.get('currentDurability'))
+    return Item(definition)
+
+# The stacks of every inventory that has never held anything. Read-only, and swapped for a dict of the inventory's own on its first add
+_NO_STACKS = types.MappingProxyType({})
+
+def _stack_item(key):
+    # The item a stack stands for, made from its stack_key: a definition for plain items, (definition, durability) for weapons
+    if type(key) is tuple:
+        return Weapon(key[0], key[1])
+    return Item(key)
+
+class Inventory:
+    """
+    A monster's items, with identical items stacked as counts.
+
+    Items with the same stack_key (every Potion, or every Sword with the same durability) are kept
+    as one stack: a single dictionary entry from the key to a count, so buying a thousand potions
+    adds one entry, not a thousand items. Adding, using or removing an item is O(1). An inventory
+    that has never held anything shares one empty mapping, so the many enemies that carry nothing
+    cost no more than the inventory object itself. Listing the stacks of one type looks through
+    the stacks, of which there are only ever a few.
+
+    The items returned by stacks, weapons and consumables are made from the stack keys. Change a
+    weapon's durability with wear rather than by writing to it. For older code the inventory still
+    behaves like a list of items: len, in, append, remove and iterating (which repeats each
+    stack's item count times) all work.
+    """
+    __slots__ = ('_stacks', '_size')
+
+    def __init__(self, items=()):
+        # stack_key -> count, in the order the stacks were added
+        self._stacks = _NO_STACKS
+        self._size = 0
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __iter__(self):
+        for key, count in list(self._stacks.items()):
+            item = _stack_item(key)
+            for unit in range(count):
+                yield item
+
+    def __contains__(self, item):
+        return isinstance(item, Item) and item.stack_key() in self._stacks
+
+    def __repr__(self):
+        return f'Inventory({self.to_list()!r})'
+
+    def add(self, item, count=1):
+        """
+        Adds count items of the same kind as the given one.
+
+        Arguments:
+            item (Item or dict): The item to add. Dictionaries in the save file format are converted.
+            count (int, optional): How many to add. Default is 1.
+
+        Returns:
+            None
+        """
+        if count <= 0:
+            return
+        key = item_from_dict(item).stack_key()
+        stacks = self._stacks
+        if stacks is _NO_STACKS:
+            stacks = self._stacks = {}
+        stacks[key] = stacks.get(key, 0) + count
+        self._size += count
+
+    # List name used by add_item_to_inventory and older code
+    append = add
+
+    def remove(self, item, count=1):
+        """
+        Removes count items of the same kind as the given one.
+
+        Arguments:
+            item (Item): An item of the kind to remove.
+            count (int, optional): How many to remove. Default is 1.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the inventory holds fewer than count such items.
+        """
+        key = item.stack_key()
+        held = self._stacks.get(key, 0)
+        if held < count or held == 0:
+            raise ValueError(f'{item.name} is not in the inventory')
+        if held == count:
+            del self._stacks[key]
+        else:
+            self._stacks[key] = held - count
+        self._size -= count
+
+    def count(self, item):
+        """
+        Returns how many items of the same kind as the given one are in the inventory.
+        """
+        return self._stacks.get(item.stack_key(), 0)
+
+    def use(self, name):
+        """
+        Uses up one consumable with the given name.
+
+        Arguments:
+            name (str): The name of the consumable, such as 'Potion'.
+
+        Returns:
+            item (Item): The item that was used, or None if there was none.
+        """
+        definition = ITEMS.get(name)
+        if definition is not None and definition in self._stacks:
+            item = Item(definition)
+        else:
+            item = next((item for item in self.stacks('consumable') if item.name == name), None)
+            if item is None:
+                return None
+        self.remove(item)
+        return item
+
+    def wear(self, weapon, amount):
+        """
+        Takes one weapon from its stack and lowers its durability. A weapon that reaches 0 durability is removed.
+        The worn weapon takes its stack's place in the order, as it would in a list of items.
+
+        Arguments:
+            weapon (Weapon): A weapon in the inventory.
+            amount (int): How much durability the weapon loses.
+
+        Returns:
+            worn (Weapon): The weapon with its new durability. It is only back in the inventory if its durability is above 0.
+        """
+        worn = Weapon(weapon.definition, weapon.currentDurability - amount)
+        key = weapon.stack_key()
+        wornKey = worn.stack_key()
+        if worn.currentDurability <= 0 or wornKey in self._stacks or key not in self._stacks:
+            self.remove(weapon)
+            if worn.currentDurability > 0:
+                self.add(worn)
+            return worn
+        # Put the worn weapon where its stack was, ahead of the rest of that stack
+        stacks = {}
+        for other, count in self._stacks.items():
+            if other == key:
+                stacks[wornKey] = 1
+                if count > 1:
+                    stacks[key] = count - 1
+            else:
+                stacks[other] = count
+        self._stacks = stacks
+        return worn
+
+    def stacks(self, type=None):
+        """
+        Returns one item per stack, optionally only stacks of one type.
+
+        Arguments:
+            type (str, optional): 'weapon' or 'consumable'. Defaults to every type.
+
+        Returns:
+            items (list): The item of each stack, in the order the stacks were added.
+        """
+        if type is None:
+            return [_stack_item(key) for key in self._stacks]
+        items = []
+        for key in self._stacks:
+            if key.__class__ is tuple:
+                if key[0].type == type:
+                    items.append(Weapon(key[0], key[1]))
+            elif key.type == type:
+                items.append(Item(key))
+        return items
+
+    def weapons(self):
+        """
+        Returns one weapon per stack of weapons.
+        """
+        return self.stacks('weapon')
+
+    def consumables(self):
+        """
+        Returns one consumable per stack of consumables.
+        """
+        return self.stacks('consumable')
+
+    def copy(self):
+        """
+        Returns a new inventory with the same stacks.
+        """
+        inventory = Inventory()
+        if self._stacks:
+            inventory._stacks = dict(self._stacks)
+            inventory._size = self._size
+        return inventory
+
+    def to_list(self):
+        """
+        Returns the inventory in the save file format: one dictionary per stack, with a count when there is more than one item.
+        """
+        items = []
+        for key, count in self._stacks.items():
+            data = _stack_item(key).to_dict()
+            if count > 1:
+                data['count'] = count
+            items.append(data)
+        return items
+
+    @classmethod
+    def from_list(cls, items):
+        """
+        Creates an inventory from the save file format. Older saves with one dictionary per item are stacked as they are read.
+
+        Arguments:
+            items (list): Item dictionaries, each with an optional count.
+
+        Returns:
+            inventory (Inventory): The new inventory.
+        """
+        inventory = cls()
+        for data in items:
+            inventory.add(item_from_dict(data), data.get('count', 1) if isinstance(data, dict) else 1)
+        return inventory
+
+class Monster:
+    """
+    The player or an enemy monster.
+
+    Attributes:
+        name (str): The species of the monster.
+        description (str): What the player sees when the monster appears.
+        health (int): The monster's hit points.
+        power (int): How hard the monster hits.
+        money (int): The gold the monster carries.
+        inventory (Inventory): The monster's items.
+    """
+    __slots__ = ('name', 'description', 'health', 'power', 'money', 'inventory')
+
+    def __init__(self, name, description, health, power, money, inventory=None):
+        self.name = name
+        self.description = description
+        self.health = health
+        self.power = power
+        self.money = money
+        self.inventory = _as_inventory(inventory)
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        if key == 'inventory':
+            value = _as_inventory(value)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __repr__(self):
+        return f'Monster({self.name!r}, health={self.health}, power={self.power}, money={self.money})'
+
+    def keys(self):
+        return self.__slots__
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def copy(self):
+        """
+        Returns a copy of the monster with its own copy of the inventory.
+        """
+        return Monster(self.name, self.description, self.health, self.power, self.money, self.inventory.copy())
+
+    def to_dict(self):
+        """
+        Returns the monster as a dictionary in the save file format.
+        """
+        return {
+            'name': self.name,
+            'description': self.description,
+            'health': self.health,
+            'power': self.power,
+            'money': self.money,
+            'inventory': self.inventory.to_list(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a monster from a dictionary in the save file format.
+
+        Arguments:
+            data (dict): The monster as stored in the save file.
+
+        Returns:
+            monster (Monster): The new monster.
+        """
+        return cls(data['name'], data['description'], data['health'], data['power'], data['money'], Inventory.from_list(data.get('inventory', [])))
+
+def _as_inventory(items):
+    if isinstance(items, Inventory):
+        return items
+    if not items:
+        return Inventory()
+    return Inventory.from_list(items)
@@ -0,0 +1,54 @@
+"""
+Writing files so a crash never leaves a partly written one behind
+
+Save snapshots and the compiled data pack are both replaced while other readers (or other
+processes) may have the old file open. Writing to a temporary file in the same folder, flushing
+it to disk and renaming it over the old one means readers see either the old file or the new
+one, never a mix.
+
+Functions:
+    - atomic_write: Replace a file's contents so readers see either the old or the new file.
+
+Typical usage example:
+    atomic_write('saves/Cameron.sav', data)
+"""
+import os
+import tempfile
+
+def atomic_write(path, data):
+    """
+    Replaces a file's contents so that readers see either the old file or the new one, never a partial write.
+
+    Arguments:
+        path (str): The file to write.
+        data (bytes): The new contents.
+
+    Returns:
+        None
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    _fsync_directory(directory)
+
+def _fsync_directory(directory):
+    # Makes the rename itself durable; not every platform can open a folder
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
@@ -8,6 +8,18 @@ Functions:
     - draw_grid: Draws a grid on the given screen.
     - draw_square: Draws a square on the given screen at the specified position.
     - handlemovement: Handles the movement of the player based on the key pressed.
+    - window_events: Returns the window's pending events.
+
+Classes:
+    - GameRenderer: Keeps the window, clock and sprites open across calls to main.
+
+Monsters move on their own clock (see gameAI) rather than on every second arrow key press,
+and hostile ones near the player chase them along a shared distance field (see gamePath).
+
+Sprites are loaded once and kept in the module level `sprites` cache (see gameAssets).
+
+pygame is imported lazily (see gameStartup), when the window is first opened, so importing this
+module for WanderingMonster or the board settings does not start SDL.
 
 Typical usage example:
     screen, clock, position = initwindow()
@@ -16,32 +28,80 @@ Typical usage example:
         draw_square(screen, position)
         pygame.display.flip()
 """
-import pygame
 import random
 import sys
 
+import gameAI
+import gameAssets
 import gamefunctions
+import gamePacing
+import gamePath
+import gameProfile
+import gameSpatial
+import gameSpecies
+import gameStartup
+
+pygame = gameStartup.lazy_import('pygame')
 
 # Define constants
 gridSize = 10
 cellSize = 32
 windowSize = gridSize * cellSize
 
+# Only redraw the cells that changed each frame. Set to False to redraw the whole window every frame.
+useDirtyRects = True
+
+# Keep monsters from stepping onto a cell another monster is standing on
+blockOccupiedCells = False
+
+# Hostile monsters within this many cells of the player chase them. Set to 0 to let every monster wander.
+chaseRadius = 4
+
+# Move monsters with a gameAI.AIScheduler. Set to False to move them all on every second arrow key press instead.
+useAIScheduler = True
+
+# Sprites shared by every call to draw_square
+sprites = gameAssets.AssetCache(cellSize)
+
 class WanderingMonster:
-    def __init__(self):
-        self.position = [random.randint(0, gridSize - 1), random.randint(0, gridSize - 1)]
-        self.data = gamefunctions.random_monster()
-
-    def move(self):
-        direction = random.choice(['left', 'right', 'up', 'down'])
-        if direction == 'left' and self.position[0] > 0:
-            self.position[0] -= 1
-        elif direction == 'right' and self.position[0] < gridSize - 1:
-            self.position[0] += 1
-        elif direction == 'up' and self.position[1] > 0:
-            self.position[1] -= 1
-        elif direction == 'down' and self.position[1] < gridSize - 1:
-            self.position[1] += 1
+    def __init__(self, rng=None):
+        # rng is a random.Random for a repeatable monster; by default the random module is used
+        if rng is None:
+            rng = random
+        self.position = [rng.randint(0, gridSize - 1), rng.randint(0, gridSize - 1)]
+        self.data = gamefunctions.random_monster(rng)
+
+    def move(self, occupancy=None, blocking=False, paths=None):
+        """
+        Moves the monster one cell in a random direction, staying on the board. Hostile monsters close to the player step towards them instead.
+
+        Arguments:
+            occupancy (gameSpatial.OccupancyGrid, optional): The occupancy grid to keep up to date.
+            blocking (bool, optional): If True, the monster stays put instead of stepping onto a cell another monster is on.
+            paths (gamePath.DistanceField, optional): Distances to the player, for hostile monsters to follow.
+
+        Returns:
+            None
+        """
+        step = None
+        if paths is not None and gameSpecies.SPECIES_BY_NAME[self.data['name']].hostile:
+            step = paths.next_step(self.position)
+        target = list(self.position if step is None else step)
+        if step is None:
+            direction = random.choice(['left', 'right', 'up', 'down'])
+            if direction == 'left' and self.position[0] > 0:
+                target[0] -= 1
+            elif direction == 'right' and self.position[0] < gridSize - 1:
+                target[0] += 1
+            elif direction == 'up' and self.position[1] > 0:
+                target[1] -= 1
+            elif direction == 'down' and self.position[1] < gridSize - 1:
+                target[1] += 1
+        if occupancy is not None:
+            if blocking and occupancy.is_occupied(target, ignore=(self, gameSpatial.PLAYER)):
+                return
+            occupancy.move(self, target)
+        self.position[0], self.position[1] = target
 
 def init_window():
     """
@@ -76,12 +136,13 @@ def draw_grid(screen):
     Returns:
         None
     """
-    for x in range(0, windowSize, cellSize):
-        pygame.draw.line(screen, (0,0,0), (x, 0), (x, windowSize))
-    for y in range(0, windowSize, cellSize):
-        pygame.draw.line(screen, (0,0,0), (0, y), (windowSize, y))
+    with gameProfile.span('draw_grid'):
+        for x in range(0, windowSize, cellSize):
+            pygame.draw.line(screen, (0,0,0), (x, 0), (x, windowSize))
+        for y in range(0, windowSize, cellSize):
+            pygame.draw.line(screen, (0,0,0), (0, y), (windowSize, y))
 
-def draw_square(screen, position, type):
+def draw_square(screen, position, type, assets=None):
     """
     Draws a square on the given screen at the specified position.
 
@@ -89,35 +150,27 @@ def draw_square(screen, position, type):
         screen (pygame.Surface): The game screen where the square will be drawn.
         position (list): The position [x, y] where the square will be drawn.
         type (str): The type of square to be drawn ('player' or 'monster'). This is used to determine what asset is used.
+        assets (gameAssets.AssetCache, optional): The sprite cache to draw from. Defaults to the module cache.
 
     Returns:
         None
     """
-    try:
-        image = None
-        if type == 'player':
-            image = pygame.image.load('assets/player.png')
-        elif type == 'monster':
-            image = pygame.image.load('assets/monster.png')
-        pygame.transform.scale(image, (cellSize, cellSize))
-        screen.blit(image, (position[0] * cellSize, position[1] * cellSize))
-    except FileNotFoundError:
-        if type == 'player':
-            color = (0,0,0)
-        elif type == 'monster':
-            color = (255,0,0)
-        rect = pygame.Rect(position[0] * cellSize, position[1] * cellSize, cellSize, cellSize)
-        pygame.draw.rect(screen, color, rect)
-    except Exception as e:
-        print('You find yourself in a weird place. Here\'s the error we got', e)
-
-def handle_movement(key, position):
+    if assets is None:
+        assets = sprites
+    with gameProfile.span('draw_square'):
+        try:
+            screen.blit(assets.get_sprite(type), (position[0] * cellSize, position[1] * cellSize))
+        except Exception as e:
+            print('You find yourself in a weird place. Here\'s the error we got', e)
+
+def handle_movement(key, position, occupancy=None):
     """
     Handles the movement of the player based on the key pressed.
 
     Arguments:
         key (int): The key pressed by the user.
         position (list): The current position of the player [x, y].
+        occupancy (gameSpatial.OccupancyGrid, optional): The occupancy grid to keep up to date.
 
     Returns:
         None
@@ -134,51 +187,428 @@ def handle_movement(key, position):
     elif key == pygame.K_DOWN:
         if position[1] < gridSize - 1:
             position[1] += 1
-running = True
-def main(monsters):
+    if occupancy is not None:
+        occupancy.move(gameSpatial.PLAYER, position)
+def window_events():
     """
-    Main function to run the game.
+    Returns the window's pending events, like pygame.event.get. The default event source of a GameRenderer.
+    """
+    return pygame.event.get()
 
-    Parameters:
-        monsters: list of WanderingMonster objects to be displayed on the screen
+class GameRenderer:
+    """
+    Owns the game window, clock and sprites for the whole session.
 
-    Returns:
-        A tuple containing a flag ('f' or 'm' for example) and the monster object if it is needed.
+    The window is opened on the first call to run and kept open afterwards, so returning to the
+    map after a fight or the menu does not pay for pygame.init and set_mode again. The player's
+    position and the move counter are kept between calls, so the map resumes where it was left.
+
+    With dirtyRects on, the empty grid is drawn once into a background surface and each frame only
+    the cells whose contents changed are redrawn and pushed to the window. Frames where nothing
+    changed are not presented at all.
+
+    F3 turns the gameProfile overlay on and off.
+
+    With an AI scheduler, the monsters move a few at a time every frame at their species' own
+    rate. Without one, they all move together on every second arrow key press. Hostile monsters
+    within chaseRadius of the player follow a shared gamePath.DistanceField towards them.
+
+    Attributes:
+        screen (pygame.Surface): The game screen, or None until the window is opened.
+        clock (pygame.time.Clock): The clock used to limit the frame rate.
+        position (list): The current position of the player [x, y].
+        assets (gameAssets.AssetCache): The sprites drawn on the screen.
+        occupancy (gameSpatial.OccupancyGrid): Which cell the player and every monster is on.
+        dirtyRects (bool): Whether only the changed cells are redrawn each frame.
+        presented (int): The number of frames pushed to the window.
+        eventSource (function): Returns the window events for a frame. Scripted replays swap in their own.
+        overlay (gameProfile.Overlay): The profiler overlay drawn over the map, or None.
+        ai (gameAI.AIScheduler): Moves the monsters each frame, or None to move them on the player's key presses.
+        paths (gamePath.DistanceField): Distances to the player for hostile monsters to chase along, or None when chaseRadius is 0.
     """
-    screen, clock, position = init_window()
+    def __init__(self, assets=None, fps=30, dirtyRects=None, eventSource=None, ai=None):
+        self.screen = None
+        self.clock = None
+        self.position = None
+        self.assets = sprites if assets is None else assets
+        self.fps = fps
+        self.move_counter = 0
+        self.suspended = False
+        self.dirtyRects = useDirtyRects if dirtyRects is None else dirtyRects
+        self.presented = 0
+        self.eventSource = window_events if eventSource is None else eventSource
+        self.overlay = None
+        self._overlayVersion = None
+        self._overlayRect = None
+        if ai is None and useAIScheduler:
+            ai = gameAI.AIScheduler()
+        self.ai = ai
+        self.paths = gamePath.DistanceField(gridSize, gridSize, radius=chaseRadius) if chaseRadius > 0 else None
+        self.occupancy = gameSpatial.OccupancyGrid()
+        self._engaged = (None, set())
+        self._background = None
+        self._drawnCells = None
 
-    move_counter = 0
-    global running
-    while running:
-        clock.tick(30)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+    def open(self):
+        """
+        Opens the game window if it is not already open.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.screen is None or pygame.display.get_surface() is None:
+            self.screen, self.clock, position = init_window()
+            if self.position is None:
+                self.position = position
+            self._background = None
+            self._drawnCells = None
+            # Keep the window answering the OS while the console flow pauses
+            gamePacing.pacer.add_hook(pygame.event.pump)
+
+    def suspend(self):
+        """
+        Marks the map as paused while the console menus or a fight are running. The window stays open.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.suspended = True
+        if self.screen is not None:
+            pygame.display.set_caption('Adventure Game (paused)')
+
+    def resume(self):
+        """
+        Brings the map back after a suspend, opening the window if needed.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self.open()
+        if self.suspended:
+            pygame.display.set_caption('Adventure Game')
+            # Drop the key presses made in the console while the map was paused
+            pygame.event.clear(pygame.KEYDOWN)
+            self.suspended = False
+        if self.ai is not None:
+            # Monsters do not catch up on the time the map was paused
+            self.ai.restart()
+        # Other windows may have covered ours while it was paused
+        self._drawnCells = None
+
+    def close(self):
+        """
+        Closes the game window and shuts down pygame.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.screen is not None:
+            gamePacing.pacer.remove_hook(pygame.event.pump)
+            pygame.quit()
+        self.screen = None
+        self.clock = None
+
+    def run(self, monsters):
+        """
+        Runs the map until the player opens the menu, runs into a monster or quits.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects to be displayed on the screen.
+
+        Returns:
+            A tuple containing a flag ('f' or 'm') and the monster object if it is needed, or ('q', None) when the player quits.
+        """
+        global running
+        self.resume()
+        monsters = self.enter_map(monsters)
+        while running:
+            self.clock.tick(self.fps)
+            option = self.handle_events(monsters)
+            if option == 'q':
                 running = False
-            elif event.type == pygame.KEYDOWN:
+            elif option == 'm':
+                running = False
+                self.suspend()
+                return 'm', None
+            self.update_monsters(monsters)
+            encounter = self.find_encounter(monsters)
+            if encounter is not None:
+                self.suspend()
+                return 'f', encounter
+
+            self.draw(monsters)
+            gameProfile.frame()
+        return 'q', None
+
+    def enter_map(self, monsters):
+        """
+        Gets the map ready for a visit: brings the occupancy grid up to date with the monsters and the player.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects on the map.
+
+        Returns:
+            monsters (list): The monsters to play the visit with.
+        """
+        # The list of monsters changes between calls when enemies die or new ones spawn
+        self.occupancy.sync(monsters)
+        self.occupancy.move(gameSpatial.PLAYER, self.position)
+        if self.paths is not None:
+            self.paths.set_target(self.position)
+        return monsters
+
+    def move_player(self, key):
+        """
+        Moves the player one cell for an arrow key press.
+        """
+        handle_movement(key, self.position, self.occupancy)
+        if self.paths is not None:
+            self.paths.set_target(self.position)
+
+    def handle_events(self, monsters, onMonsterTurn=None):
+        """
+        Handles the window events queued since the last frame. Key presses are ignored while the map is suspended.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects on the map.
+            onMonsterTurn (function, optional): Called instead of move_monsters when it is the monsters' turn to move. Only used without an AI scheduler.
+
+        Returns:
+            'q' if the player quit, 'm' if the player opened the menu, otherwise None.
+        """
+        option = None
+        with gameProfile.span('events'):
+            events = self.eventSource()
+        for event in events:
+            if event.type == pygame.QUIT:
+                option = 'q'
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self._drawnCells = None
+            elif event.type == pygame.KEYDOWN and not self.suspended:
                 if event.key == pygame.K_q:
-                    running = False
+                    option = 'q'
+                elif event.key == pygame.K_F3:
+                    self.toggle_overlay()
                 elif event.key == pygame.K_m:
-                    running = False
-                    return 'm', None
+                    return 'm'
                 elif event.key in [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN]:
-                    handle_movement(event.key, position)
-                    move_counter += 1
-                    if move_counter % 2 == 0:
-                        for monster in monsters:
-                            monster.move()
-        for monster in monsters:
-            if position == monster.position:
-                return 'f', monster
+                    self.move_player(event.key)
+                    self.move_counter += 1
+                    if self.ai is None and self.move_counter % 2 == 0:
+                        if onMonsterTurn is None:
+                            self.move_monsters(monsters)
+                        else:
+                            onMonsterTurn()
+        return option
 
-        screen.fill((255,255,255))
-        draw_grid(screen)
-        draw_square(screen, position, 'player')
+    def move_monsters(self, monsters):
+        """
+        Moves every monster one step and keeps the occupancy grid up to date.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects on the map.
+
+        Returns:
+            None
+        """
+        with gameProfile.span('monster.move'):
+            for monster in monsters:
+                self.move_monster(monster)
+        gameProfile.count('monster_moves', len(monsters))
+
+    def move_monster(self, monster):
+        """
+        Moves one monster one step and keeps the occupancy grid up to date.
+        """
+        monster.move(self.occupancy, blockOccupiedCells, self.paths)
+
+    def update_monsters(self, monsters):
+        """
+        Gives the AI scheduler its time for this frame. Does nothing without an AI scheduler.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects on the map.
+
+        Returns:
+            updates (int): The number of monster moves made.
+        """
+        if self.ai is None:
+            return 0
+        return self.ai.update(monsters, self.position, self.move_monster)
+
+    def toggle_overlay(self):
+        """
+        Shows or hides the profiler overlay, turning the profiler on the first time it is shown.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        if self.overlay is None:
+            gameProfile.profiler.enable()
+            self.overlay = gameProfile.Overlay()
+        else:
+            self.overlay = None
+        self._overlayVersion = None
+        self._overlayRect = None
+        self._drawnCells = None
+
+    def find_encounter(self, monsters):
+        """
+        Finds a monster on the player's cell using the occupancy grid. Monsters the player already fought on this cell are ignored until the player or the monster moves away.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects on the map.
+
+        Returns:
+            The monster the player ran into, or None.
+        """
+        with gameProfile.span('collision'):
+            return self._find_encounter()
+
+    def _find_encounter(self):
+        cell = tuple(self.position)
+        occupants = self.occupancy.at(cell) - {gameSpatial.PLAYER}
+        engagedCell, engaged = self._engaged
+        if engagedCell != cell:
+            engaged = set()
+        engaged &= occupants
+        self._engaged = (cell, engaged)
+        for monster in occupants - engaged:
+            engaged.add(monster)
+            return monster
+        return None
+
+    def draw(self, monsters):
+        """
+        Draws one frame of the map and shows it.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects to be displayed on the screen.
+
+        Returns:
+            None
+        """
+        with gameProfile.span('draw'):
+            if self.dirtyRects:
+                self.draw_dirty(monsters)
+                return
+            self.screen.fill((255,255,255))
+            draw_grid(self.screen)
+            draw_square(self.screen, self.position, 'player', self.assets)
+            for monster in monsters:
+                draw_square(self.screen, monster.position, 'monster', self.assets)
+            if self.overlay is not None:
+                self.screen.blit(self.overlay.surface(), (0, 0))
+            with gameProfile.span('flip'):
+                pygame.display.flip()
+            self.presented += 1
+
+    def draw_dirty(self, monsters):
+        """
+        Redraws only the cells whose contents changed since the last frame and pushes just those to the window.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects to be displayed on the screen.
+
+        Returns:
+            None
+        """
+        if self._background is None:
+            self._background = pygame.Surface(self.screen.get_size()).convert()
+            self._background.fill((255,255,255))
+            draw_grid(self._background)
+        cells = self.cell_contents(monsters)
+        full = self._drawnCells is None
+        if full:
+            self.screen.blit(self._background, (0, 0))
+            changed = set(cells.keys())
+        else:
+            changed = {cell for cell in cells.keys() | self._drawnCells.keys() if cells.get(cell) != self._drawnCells.get(cell)}
+        overlayImage = None
+        if self.overlay is not None:
+            overlayImage = self.overlay.surface()
+            if self.overlay.version != self._overlayVersion:
+                # The text changed size or content, so the cells under the old and new overlay are redrawn
+                area = overlayImage.get_rect()
+                if self._overlayRect is not None:
+                    area = area.union(self._overlayRect)
+                changed.update((x, y) for x in range(min(gridSize, area.right // cellSize + 1))
+                               for y in range(min(gridSize, area.bottom // cellSize + 1)))
+        if not full and not changed:
+            return
+        rects = []
+        for cell in changed:
+            rect = pygame.Rect(cell[0] * cellSize, cell[1] * cellSize, cellSize, cellSize)
+            self.screen.blit(self._background, rect, rect)
+            for type in cells.get(cell, ()):
+                draw_square(self.screen, cell, type, self.assets)
+            rects.append(rect)
+        if overlayImage is not None:
+            overlayRect = overlayImage.get_rect()
+            if full or overlayRect.collidelist(rects) != -1:
+                self.screen.blit(overlayImage, (0, 0))
+                rects.append(overlayRect)
+                self._overlayVersion = self.overlay.version
+                self._overlayRect = overlayRect
+        with gameProfile.span('flip'):
+            if full:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+        self._drawnCells = cells
+        self.presented += 1
+
+    def cell_contents(self, monsters):
+        """
+        Lists what is drawn in every occupied cell, in drawing order.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects to be displayed on the screen.
+
+        Returns:
+            cells (dict): Maps each occupied (x, y) cell to a tuple of square types.
+        """
+        cells = {tuple(self.position): ('player',)}
         for monster in monsters:
-            draw_square(screen, monster.position, 'monster')
-        pygame.display.flip()
+            cell = tuple(monster.position)
+            cells[cell] = cells.get(cell, ()) + ('monster',)
+        return cells
+
+running = True
+renderer = GameRenderer()
+def main(monsters):
+    """
+    Main function to run the game.
+
+    The window, clock and sprites live in the module level renderer, so calling main again after a
+    fight or the menu resumes the map instead of opening a new window.
 
-    pygame.quit()
-    sys.exit()
+    Parameters:
+        monsters: list of WanderingMonster objects to be displayed on the screen
+
+    Returns:
+        A tuple containing a flag ('f' or 'm' for example) and the monster object if it is needed.
+    """
+    option, monster = renderer.run(monsters)
+    if option == 'q':
+        renderer.close()
+        sys.exit()
+    return option, monster
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
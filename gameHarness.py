@@ -0,0 +1,519 @@
+"""
+Harness for driving whole game sessions from a script at instant speed
+
+A session script lists what the player types at the console and what happens on the map. The
+harness answers every input() prompt from the script, turns all pauses off through gamePacing,
+and keeps saves in a temporary folder. It returns everything the game printed and how long the
+session took, so sessions can be checked and timed without a person at the keyboard.
+
+The map can be scripted in two ways. Map events ('m' or 'f') skip the game window entirely.
+Key scripts list the keys pressed on each visit to the map; they are replayed one key per frame
+into the real gameGraphics.main, with SDL's dummy video driver so no window is opened. Key
+scripts can be recorded from a real game with --record and saved as JSON.
+
+Classes:
+    - ScriptedConsole: Answers input() prompts from a list and records the transcript.
+    - ScriptedMap: Stands in for gameGraphics.main, returning map events from a list.
+    - KeyReplay: Feeds scripted key presses to the game window, one per frame.
+    - KeyRecorder: Records the key presses made on each visit to the map.
+    - KeyClock: Measures the monsters' time in key presses, so scripts replay the same at any speed.
+    - PhaseTimer: Times the render, ai, collision and combat phases of a session.
+    - SessionResult: The transcript and timing of a session.
+
+Functions:
+    - run_session: Play game.game() from a script.
+    - record_session: Play the game normally and save what the player did as a script.
+    - load_script: Read a script saved by record_session.
+    - main: Command line entry point that plays a sample or saved session.
+
+Typical usage example:
+    result = run_session(answers=['1', 'Cameron', '2', '1', '2', '0', '1', '5', 'n'], mapEvents=['m', 'f'], seed=1)
+    print(result.transcript)
+    script = load_script('benchmarks/sample_session.json')
+    result = run_session(script['answers'], keys=script['keys'], seed=script['seed'], timer=PhaseTimer())
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import gamePacing
+import gameSave
+import gamefunctions
+
+class ScriptEnded(Exception):
+    """
+    Raised when the game asks for more input or map events than the script has.
+    """
+
+class _Transcript(io.StringIO):
+    # Keeps the text after the last newline as it is written, so finding the prompt on screen
+    # does not copy the whole transcript every time the game asks for input
+    def __init__(self):
+        super().__init__()
+        self.lastLine = ''
+
+    def write(self, text):
+        newline = text.rfind('\n')
+        if newline < 0:
+            self.lastLine += text
+        else:
+            self.lastLine = text[newline + 1:]
+        return super().write(text)
+
+class ScriptedConsole:
+    """
+    Answers input() prompts from a list and records the prompts and answers.
+
+    Attributes:
+        answers (list): The answers left to give.
+        prompts (list): Every prompt the game showed.
+    """
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.prompts = []
+        self.output = _Transcript()
+
+    def input(self, prompt=''):
+        # gameScreen writes its prompts to the output before asking, so the shown prompt ends the output so far
+        shown = prompt or self.output.lastLine
+        self.prompts.append(shown)
+        if not self.answers:
+            raise ScriptEnded(f'no answer left for the prompt {shown!r}')
+        answer = self.answers.pop(0)
+        self.output.write(f'{prompt}{answer}\n')
+        return answer
+
+class ScriptedMap:
+    """
+    Stands in for gameGraphics.main and returns map events from a list.
+
+    Events are 'm' (the player opened the menu) or 'f' (the player ran into the first monster).
+
+    Attributes:
+        events (list): The events left to play.
+        played (int): The number of events played so far.
+    """
+    def __init__(self, events):
+        self.events = list(events)
+        self.played = 0
+
+    def __call__(self, monsters):
+        if not self.events:
+            raise ScriptEnded('no map event left')
+        event = self.events.pop(0)
+        self.played += 1
+        if event == 'f':
+            return 'f', monsters[0]
+        return event, None
+
+# The key names used in key scripts and the pygame constants they stand for
+KEY_NAMES = {'left': 'K_LEFT', 'right': 'K_RIGHT', 'up': 'K_UP', 'down': 'K_DOWN', 'm': 'K_m', 'q': 'K_q', 'f3': 'K_F3'}
+
+# Seconds of monster time per key press in key scripts. A species with a moveRate of 1 moves on every second key, as monsters did before gameAI.
+KEY_TIME = 0.5
+
+class KeyReplay:
+    """
+    Feeds scripted key presses to a GameRenderer in place of pygame.event.get, one key per frame.
+
+    The script has one list of key names per visit to the map. Keys left over when a visit ends
+    early (for example because a monster walked onto the player) are dropped.
+
+    Attributes:
+        visits (list): The key lists for the visits left to play.
+        frames (int): The number of frames played so far.
+        pressed (int): The number of keys pressed so far.
+    """
+    def __init__(self, visits):
+        import pygame
+        self._pygame = pygame
+        self._codes = {name: getattr(pygame, code) for name, code in KEY_NAMES.items()}
+        self.visits = [list(keys) for keys in visits]
+        self.keys = []
+        self.frames = 0
+        self.pressed = 0
+
+    def start_visit(self):
+        """
+        Moves on to the keys for the next visit to the map.
+        """
+        if not self.visits:
+            raise ScriptEnded('no map visit left')
+        self.keys = self.visits.pop(0)
+
+    def __call__(self):
+        pygame = self._pygame
+        # Keep the dummy driver's own window events, then add this frame's key
+        events = pygame.event.get()
+        self.frames += 1
+        if not self.keys:
+            raise ScriptEnded('no key left for this map visit')
+        events.append(pygame.event.Event(pygame.KEYDOWN, key=self._codes[self.keys.pop(0)]))
+        self.pressed += 1
+        return events
+
+class KeyRecorder:
+    """
+    Wraps an event source and records the key presses made on each visit to the map.
+
+    Attributes:
+        visits (list): One list of key names per visit, in the format KeyReplay plays.
+        pressed (int): The number of keys recorded so far.
+    """
+    def __init__(self, source):
+        import pygame
+        self._pygame = pygame
+        self._names = {getattr(pygame, code): name for name, code in KEY_NAMES.items()}
+        self.source = source
+        self.visits = []
+        self.pressed = 0
+
+    def start_visit(self):
+        """
+        Starts a new list of keys for the next visit to the map.
+        """
+        self.visits.append([])
+
+    def __call__(self):
+        events = self.source()
+        for event in events:
+            if event.type == self._pygame.KEYDOWN and event.key in self._names and self.visits:
+                self.visits[-1].append(self._names[event.key])
+                self.pressed += 1
+        return events
+
+class KeyClock:
+    """
+    A clock for gameAI.AIScheduler that counts the key presses of a KeyReplay or KeyRecorder instead of real time.
+
+    Key scripts keep the keys but not when they were pressed, so monsters driven by this clock
+    move the same way when a script is recorded and every time it is replayed.
+    """
+    def __init__(self, keys, step=KEY_TIME):
+        self.keys = keys
+        self.step = step
+
+    def __call__(self):
+        return self.keys.pressed * self.step
+
+class KeyedMap:
+    """
+    Plays the real gameGraphics.main for each visit to the map, starting the next visit of a KeyReplay or KeyRecorder first.
+    """
+    def __init__(self, keys):
+        self.keys = keys
+        self.played = 0
+
+    def __call__(self, monsters):
+        import gameGraphics
+        self.keys.start_visit()
+        self.played += 1
+        gameGraphics.running = True
+        return gameGraphics.main(monsters)
+
+class PhaseTimer:
+    """
+    Times the render, ai, collision and combat phases of the sessions it watches.
+
+    Attributes:
+        times (dict): Maps each phase to the duration in seconds of every call made in it.
+    """
+    PHASES = ('render', 'ai', 'collision', 'combat')
+
+    def __init__(self):
+        self.times = {phase: [] for phase in self.PHASES}
+
+    @contextlib.contextmanager
+    def watch(self, renderer):
+        """
+        Times the renderer's drawing, monster moves and encounter checks, and gamefunctions.fight_monster, for the duration of the with block.
+        """
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(self._timed(renderer, 'draw', 'render'))
+            stack.enter_context(self._timed(renderer, 'move_monsters' if renderer.ai is None else 'update_monsters', 'ai'))
+            stack.enter_context(self._timed(renderer, 'find_encounter', 'collision'))
+            stack.enter_context(self._timed(gamefunctions, 'fight_monster', 'combat'))
+            yield self
+
+    @contextlib.contextmanager
+    def _timed(self, owner, name, phase):
+        original = getattr(owner, name)
+        shadowed = name in vars(owner)
+        times = self.times[phase]
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                times.append(clock() - start)
+
+        setattr(owner, name, timed)
+        try:
+            yield
+        finally:
+            if shadowed:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+
+    def summary(self):
+        """
+        Summarizes every phase.
+
+        Returns:
+            summary (dict): For each phase, the number of calls and the total, p50 and p99 time in milliseconds.
+        """
+        summary = {}
+        for phase, times in self.times.items():
+            ordered = sorted(times)
+            def rank(fraction):
+                return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000 if ordered else 0.0
+            summary[phase] = {'calls': len(times), 'total': sum(times) * 1000, 'p50': rank(0.5), 'p99': rank(0.99)}
+        return summary
+
+class SessionResult:
+    """
+    The outcome of a scripted session.
+
+    Attributes:
+        transcript (str): Everything the game printed, with the scripted answers in place.
+        completed (bool): False if the script ran out before the game ended.
+        error (str): Why the script ended early, or None.
+        seconds (float): The wall clock time the session took.
+        pausedSeconds (float): The pauses the game asked for, which instant pacing skipped.
+        prompts (int): The number of input prompts answered.
+        mapEvents (int): The number of map events or map visits played.
+        frames (int): The number of map frames played from a key script.
+    """
+    def __init__(self, transcript, completed, error, seconds, pausedSeconds, prompts, mapEvents, frames=0):
+        self.transcript = transcript
+        self.completed = completed
+        self.error = error
+        self.seconds = seconds
+        self.pausedSeconds = pausedSeconds
+        self.prompts = prompts
+        self.mapEvents = mapEvents
+        self.frames = frames
+
+@contextlib.contextmanager
+def instant_pacing():
+    """
+    Turns every pause off for the duration of the with block.
+    """
+    pacer = gamePacing.pacer
+    mode, scale = pacer.mode, pacer.scale
+    pacer.set_mode(gamePacing.INSTANT)
+    try:
+        yield pacer
+    finally:
+        pacer.set_mode(mode, scale)
+
+@contextlib.contextmanager
+def temporary_saves():
+    """
+    Points gamefunctions at an empty save folder for the duration of the with block.
+    """
+    directory = tempfile.mkdtemp(prefix='game-harness-')
+    saves = gamefunctions.saves
+    gamefunctions.saves = gameSave.SaveManager(directory)
+    try:
+        yield gamefunctions.saves
+    finally:
+        gamefunctions.saves = saves
+        shutil.rmtree(directory, ignore_errors=True)
+
+def key_scheduler(keys):
+    """
+    Returns a gameAI.AIScheduler that runs on the key presses of a KeyReplay or KeyRecorder, or None when gameGraphics.useAIScheduler is off.
+    """
+    import gameAI
+    import gameGraphics
+    if not gameGraphics.useAIScheduler:
+        return None
+    return gameAI.AIScheduler(budget=None, clock=KeyClock(keys))
+
+@contextlib.contextmanager
+def headless_renderer(eventSource, fps=0):
+    """
+    Swaps a fresh gameGraphics renderer using SDL's dummy video driver in for the duration of the with block.
+
+    Arguments:
+        eventSource (function): Where the renderer gets its window events, such as a KeyReplay.
+        fps (int, optional): The frame rate limit. Default is 0, which plays frames as fast as possible.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import gameGraphics
+    previous = gameGraphics.renderer
+    gameGraphics.renderer = gameGraphics.GameRenderer(fps=fps, eventSource=eventSource, ai=key_scheduler(eventSource))
+    try:
+        yield gameGraphics.renderer
+    finally:
+        gameGraphics.renderer = previous
+
+def run_session(answers, mapEvents=None, seed=None, keys=None, timer=None, fps=0):
+    """
+    Plays game.game() from a script at instant speed.
+
+    Parameters:
+    answers (list): What the player types at each console prompt, in order.
+    mapEvents (list, optional): What happens each time the game goes back to the map: 'm' or 'f'.
+    seed (int, optional): Seed for the random module, for a repeatable session.
+    keys (list, optional): One list of key names per visit to the map. When given, the real map is played headless with these keys instead of mapEvents.
+    timer (PhaseTimer, optional): Collects how long the render, ai, collision and combat phases took.
+    fps (int, optional): The frame rate limit for key scripts. Default is 0, which plays frames as fast as possible.
+
+    Returns:
+    A SessionResult.
+    """
+    # game imports the graphics module, so only load it when a session is played
+    import game
+
+    console = ScriptedConsole(answers)
+    replay = None
+    if keys is not None:
+        replay = KeyReplay(keys)
+        scriptedMap = KeyedMap(replay)
+    else:
+        scriptedMap = ScriptedMap(mapEvents or [])
+    if seed is not None:
+        random.seed(seed)
+    error = None
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        pacer = stack.enter_context(instant_pacing())
+        stack.enter_context(temporary_saves())
+        if replay is not None:
+            renderer = stack.enter_context(headless_renderer(replay, fps))
+            if timer is not None:
+                stack.enter_context(timer.watch(renderer))
+        requested = pacer.requested
+        realInput = builtins.input
+        builtins.input = console.input
+        try:
+            with contextlib.redirect_stdout(console.output):
+                game.game(scriptedMap)
+        except ScriptEnded as e:
+            error = str(e)
+        except SystemExit:
+            # The player quit from the map
+            pass
+        finally:
+            builtins.input = realInput
+        pausedSeconds = pacer.requested - requested
+    return SessionResult(console.output.getvalue(), error is None, error, time.perf_counter() - start,
+                         pausedSeconds, len(console.prompts), scriptedMap.played, replay.frames if replay else 0)
+
+def record_session(path, seed=None):
+    """
+    Plays the game normally, in a real window with real input, and saves what the player did as a key script.
+
+    Parameters:
+    path (str): Where to write the script as JSON.
+    seed (int, optional): Seed for the random module, so replaying the script meets the same monsters.
+
+    Returns:
+    script (dict): The seed, console answers and keys pressed on each visit to the map.
+    """
+    import game
+    import gameGraphics
+
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    random.seed(seed)
+    answers = []
+    realInput = builtins.input
+
+    def recordingInput(prompt=''):
+        answer = realInput(prompt)
+        answers.append(answer)
+        return answer
+
+    recorder = KeyRecorder(gameGraphics.renderer.eventSource)
+    gameGraphics.renderer.eventSource = recorder
+    realScheduler = gameGraphics.renderer.ai
+    gameGraphics.renderer.ai = key_scheduler(recorder)
+    builtins.input = recordingInput
+    try:
+        game.game(KeyedMap(recorder))
+    except SystemExit:
+        pass
+    finally:
+        builtins.input = realInput
+        gameGraphics.renderer.eventSource = recorder.source
+        gameGraphics.renderer.ai = realScheduler
+    script = {'seed': seed, 'answers': answers, 'keys': recorder.visits}
+    with open(path, 'w') as file:
+        json.dump(script, file, indent=1)
+    return script
+
+def load_script(path):
+    """
+    Reads a script saved by record_session.
+
+    Parameters:
+    path (str): The JSON script file.
+
+    Returns:
+    script (dict): The seed, console answers and keys pressed on each visit to the map.
+    """
+    with open(path) as file:
+        return json.load(file)
+
+# A short session: start a game, sleep, try to buy a sword, look at the inventory, run from a fight, save and quit
+SAMPLE_ANSWERS = ['1', 'Cameron', '1', '2', '1', '1', '3', '', '0', '2', '4', '5', 'n']
+SAMPLE_MAP = ['m', 'f', 'm']
+
+def main(argv=None):
+    """
+    Plays the sample session, or a saved key script, a number of times and prints how long it took.
+    """
+    parser = argparse.ArgumentParser(description='Play scripted game sessions at instant speed.')
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--script', help='play a key script saved with --record instead of the sample session')
+    parser.add_argument('--record', metavar='PATH', help='play the game normally and save what you do as a key script')
+    parser.add_argument('--show', action='store_true', help='print the transcript of the first session')
+    args = parser.parse_args(argv)
+
+    if args.record:
+        script = record_session(args.record, args.seed)
+        print(f'Saved {len(script["answers"])} answers and {len(script["keys"])} map visits to {args.record}', file=sys.stderr)
+        return
+
+    script = load_script(args.script) if args.script else None
+    total = 0.0
+    paused = 0.0
+    failed = 0
+    frames = 0
+    for session in range(args.sessions):
+        if script is not None:
+            # A recorded script only matches the monsters of the seed it was recorded with
+            result = run_session(script['answers'], seed=script['seed'], keys=script['keys'])
+        else:
+            result = run_session(SAMPLE_ANSWERS, SAMPLE_MAP, args.seed + session)
+        if args.show and session == 0:
+            print(result.transcript)
+            if result.error:
+                print(f'[script ended early: {result.error}]')
+        total += result.seconds
+        paused += result.pausedSeconds
+        failed += not result.completed
+        frames += result.frames
+    print(f'{args.sessions} sessions in {total:.2f}s ({args.sessions / total:.0f} sessions/s), skipping {paused:.0f}s of pauses', file=sys.stderr)
+    if frames:
+        print(f'{frames} map frames ({frames / total:.0f} frames/s)', file=sys.stderr)
+    if failed:
+        print(f'{failed} sessions ran out of script before the game ended', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
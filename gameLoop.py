@@ -0,0 +1,217 @@
+"""
+One asyncio loop for the game window and the console
+
+gameGraphics.main runs the map until the player opens the menu or meets a monster, and then
+the console menus block on input() while the window sits frozen. GameLoop keeps the window
+alive the whole time instead. Drawing and the monsters' turns are asyncio tasks on the main
+thread, and the console flow (game.game) runs on its own thread, where input() and the pauses
+can block without stopping the frames. When the console flow goes back to the map it hands
+over to the loop and waits until the player opens the menu, meets a monster or quits.
+
+Every frame's time is recorded by phase ('map' or 'menu'), so frame pacing while a menu or a
+fight is open can be checked with frame_stats.
+
+Classes:
+    - GameLoop: Runs the window tasks and the console flow together.
+
+Functions:
+    - percentile: The value below which the given fraction of samples fall.
+
+Typical usage example:
+    loop = GameLoop(fps=30)
+    asyncio.run(loop.run(game.game))
+    print(loop.frame_stats()['menu']['p99'])
+"""
+import asyncio
+import collections
+import threading
+import time
+
+import gameGraphics
+import gamePacing
+import gameProfile
+import gameStartup
+
+pygame = gameStartup.lazy_import('pygame')
+
+MAP = 'map'
+MENU = 'menu'
+
+def percentile(values, fraction):
+    """
+    Returns the value below which the given fraction of the values fall, using the nearest rank.
+
+    Arguments:
+        values (list): The samples.
+        fraction (float): Between 0 and 1, for example 0.99.
+
+    Returns:
+        The sample at that rank, or 0.0 if there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+class GameLoop:
+    """
+    Runs drawing and the monsters' turns as asyncio tasks and the console flow on a separate thread.
+
+    While the console has control the map stays suspended: frames keep coming at the same rate
+    and window events are still handled, but key presses are ignored. Closing the window while a
+    menu is open ends the game the next time the console flow goes back to the map.
+
+    Attributes:
+        renderer (gameGraphics.GameRenderer): The window the map is drawn in.
+        fps (int): The target number of frames per second.
+        frameTimes (dict): The time between frames in milliseconds, for the 'map' and 'menu' phases.
+        monsterTurns (int): The number of times the monsters all moved together. Stays 0 when the renderer has an AI scheduler, which moves them a few at a time each frame instead.
+    """
+    def __init__(self, renderer=None, fps=30, history=10000):
+        self.renderer = gameGraphics.renderer if renderer is None else renderer
+        self.fps = fps
+        self.frameTimes = {MAP: collections.deque(maxlen=history), MENU: collections.deque(maxlen=history)}
+        self.monsterTurns = 0
+        self.monsters = []
+        self._loop = None
+        self._active = None
+        self._monsterTurn = None
+        self._quitRequested = False
+        self._finished = False
+
+    def play_map(self, monsters):
+        """
+        Hands control to the map until the player opens the menu or meets a monster. Called from the console thread in place of gameGraphics.main.
+
+        Arguments:
+            monsters (list): The WanderingMonster objects on the map.
+
+        Returns:
+            A tuple containing a flag ('f' or 'm') and the monster object if it is needed.
+
+        Raises:
+            SystemExit: If the player quit, like gameGraphics.main.
+        """
+        if self._quitRequested:
+            raise SystemExit()
+        option, monster = asyncio.run_coroutine_threadsafe(self._play(monsters), self._loop).result()
+        if option == 'q':
+            raise SystemExit()
+        return option, monster
+
+    async def _play(self, monsters):
+        renderer = self.renderer
+        renderer.resume()
+        self.monsters = renderer.enter_map(monsters)
+        self._active = self._loop.create_future()
+        return await self._active
+
+    async def run(self, flow):
+        """
+        Runs the console flow on its own thread while the window tasks run here, until the flow ends.
+
+        Arguments:
+            flow (function): Called with play_map on the console thread, usually game.game.
+
+        Returns:
+            None
+        """
+        self._loop = asyncio.get_running_loop()
+        self._monsterTurn = asyncio.Event()
+        self._finished = False
+        renderer = self.renderer
+        renderer.open()
+        renderer.suspend()
+        # The frames keep the window answering the OS, so pauses on the console thread must not touch pygame
+        gamePacing.pacer.remove_hook(pygame.event.pump)
+        done = self._loop.create_future()
+
+        def console():
+            try:
+                flow(self.play_map)
+            except BaseException as e:
+                self._loop.call_soon_threadsafe(self._settle, done, e)
+            else:
+                self._loop.call_soon_threadsafe(self._settle, done, None)
+
+        # A daemon thread, so a console stuck in input() does not keep the program alive after the window closes
+        threading.Thread(target=console, name='console', daemon=True).start()
+        tasks = [asyncio.create_task(self._draw_frames()), asyncio.create_task(self._move_monsters())]
+        try:
+            error = await done
+        finally:
+            self._finished = True
+            self._monsterTurn.set()
+            await asyncio.gather(*tasks)
+            renderer.close()
+        if error is not None and not isinstance(error, SystemExit):
+            raise error
+
+    @staticmethod
+    def _settle(future, error):
+        if not future.done():
+            future.set_result(error)
+
+    async def _draw_frames(self):
+        renderer = self.renderer
+        interval = 1 / self.fps
+        nextFrame = time.perf_counter()
+        lastFrame = None
+        while not self._finished:
+            start = time.perf_counter()
+            if lastFrame is not None:
+                self.frameTimes[MENU if renderer.suspended else MAP].append((start - lastFrame) * 1000)
+            lastFrame = start
+            self._frame()
+            nextFrame += interval
+            now = time.perf_counter()
+            if nextFrame < now:
+                # Running late: start counting again from now instead of rushing frames to catch up
+                nextFrame = now
+            await asyncio.sleep(nextFrame - now)
+
+    def _frame(self):
+        renderer = self.renderer
+        option = renderer.handle_events(self.monsters, self._monsterTurn.set)
+        if option == 'q' and (self._active is None or self._active.done()):
+            self._quitRequested = True
+        elif option is not None:
+            self._finish_map(option, None)
+        elif self._active is not None and not self._active.done():
+            renderer.update_monsters(self.monsters)
+            encounter = renderer.find_encounter(self.monsters)
+            if encounter is not None:
+                self._finish_map('f', encounter)
+        renderer.draw(self.monsters)
+        gameProfile.frame()
+
+    def _finish_map(self, option, monster):
+        if option != 'q':
+            self.renderer.suspend()
+        self._active.set_result((option, monster))
+
+    async def _move_monsters(self):
+        while True:
+            await self._monsterTurn.wait()
+            self._monsterTurn.clear()
+            if self._finished:
+                return
+            self.renderer.move_monsters(self.monsters)
+            self.monsterTurns += 1
+
+    def frame_stats(self):
+        """
+        Summarizes the time between frames for each phase.
+
+        Arguments:
+            None
+
+        Returns:
+            stats (dict): For 'map' and 'menu', the number of frames and the p50, p95, p99 and max frame time in milliseconds.
+        """
+        stats = {}
+        for phase, times in self.frameTimes.items():
+            values = list(times)
+            stats[phase] = {'frames': len(values), 'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95),
+                            'p99': percentile(values, 0.99), 'max': max(values, default=0.0)}
+        return stats
@@ -0,0 +1,208 @@
+"""
+Pacing for the console parts of the game
+
+The shop, fights, sleeping and loading pause for a second or two between messages so the player
+can follow along. Those pauses go through the Pacer in this module instead of time.sleep, so
+they can be played at normal speed, skipped entirely (for tests and bots) or scaled.
+
+Modes:
+    - 'realtime': Pauses take as long as asked, like time.sleep.
+    - 'instant': Pauses return straight away. The time they would have taken is still counted.
+    - 'scaled': Pauses take the asked time multiplied by scale.
+
+While a pause is waiting, the pacer calls its wait hooks every few milliseconds. The game
+window registers pygame.event.pump as a hook, so it keeps answering the OS during a pause.
+Pauses can also be scheduled as non-blocking timers with after and run later by poll.
+
+Classes:
+    - Pacer: Waits according to its mode and runs scheduled timers.
+
+Functions:
+    - pause: Pause with the module level pacer.
+    - configure: Change the module level pacer's mode.
+
+Typical usage example:
+    configure('instant')
+    pause(1)
+    pacer.after(2, lambda: print('Two seconds later'))
+    pacer.poll()
+"""
+import heapq
+import itertools
+import os
+import sys
+import time
+
+REALTIME = 'realtime'
+INSTANT = 'instant'
+SCALED = 'scaled'
+
+MODES = (REALTIME, INSTANT, SCALED)
+
+# How often the wait hooks run while a pause is waiting, in seconds
+HOOK_INTERVAL = 0.02
+
+class Pacer:
+    """
+    Waits according to its mode and runs scheduled timers.
+
+    Attributes:
+        mode (str): 'realtime', 'instant' or 'scaled'.
+        scale (float): How much longer (or shorter) a scaled pause takes.
+        requested (float): The total seconds of pauses asked for so far.
+        waited (float): The total seconds actually spent waiting so far.
+    """
+    def __init__(self, mode=REALTIME, scale=1.0):
+        self.hooks = []
+        self.requested = 0.0
+        self.waited = 0.0
+        self._timers = []
+        self._order = itertools.count()
+        self.set_mode(mode, scale)
+
+    def set_mode(self, mode, scale=1.0):
+        """
+        Changes how pauses are played.
+
+        Arguments:
+            mode (str): 'realtime', 'instant' or 'scaled'.
+            scale (float, optional): The multiplier for 'scaled' mode. Default is 1.0.
+
+        Returns:
+            None
+        """
+        if mode not in MODES:
+            raise ValueError(f'unknown pacing mode {mode!r}; expected one of {", ".join(MODES)}')
+        self.mode = mode
+        self.scale = scale
+
+    def duration(self, seconds):
+        """
+        Returns how long a pause of the given length really takes in the current mode.
+        """
+        if self.mode == INSTANT:
+            return 0.0
+        if self.mode == SCALED:
+            return seconds * self.scale
+        return seconds
+
+    def pause(self, seconds):
+        """
+        Waits for a pause of the given length, running the wait hooks while waiting.
+
+        Arguments:
+            seconds (float): How long the pause is at normal speed.
+
+        Returns:
+            None
+        """
+        self.requested += seconds
+        remaining = self.duration(seconds)
+        if remaining <= 0:
+            self.poll()
+            return
+        start = time.perf_counter()
+        deadline = start + remaining
+        while True:
+            self._run_hooks()
+            self.poll()
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                break
+            time.sleep(min(left, HOOK_INTERVAL) if self.hooks else left)
+        self.waited += time.perf_counter() - start
+
+    def add_hook(self, hook):
+        """
+        Adds a function to call every few milliseconds while a pause is waiting, such as pygame.event.pump.
+        """
+        if hook not in self.hooks:
+            self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """
+        Stops calling a function added with add_hook.
+        """
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    def after(self, seconds, callback):
+        """
+        Schedules a callback to run once a pause of the given length has passed, without waiting for it.
+
+        Arguments:
+            seconds (float): How long to wait at normal speed.
+            callback (function): What to call, with no arguments.
+
+        Returns:
+            None
+        """
+        due = time.perf_counter() + self.duration(seconds)
+        heapq.heappush(self._timers, (due, next(self._order), callback))
+
+    def poll(self):
+        """
+        Runs every scheduled callback that is due.
+
+        Arguments:
+            None
+
+        Returns:
+            ran (int): The number of callbacks run.
+        """
+        ran = 0
+        now = time.perf_counter()
+        while self._timers and self._timers[0][0] <= now:
+            due, order, callback = heapq.heappop(self._timers)
+            callback()
+            ran += 1
+        return ran
+
+    def pending(self):
+        """
+        Returns the number of scheduled callbacks that have not run yet.
+        """
+        return len(self._timers)
+
+    def _run_hooks(self):
+        for hook in list(self.hooks):
+            hook()
+
+def _from_environment():
+    # GAME_PACING can be 'realtime', 'instant' or 'scaled:0.25'. This runs when gamefunctions is
+    # imported, so a bad value falls back to realtime with a warning instead of stopping every entry point
+    setting = os.environ.get('GAME_PACING') or REALTIME
+    mode, separator, scale = setting.partition(':')
+    try:
+        return Pacer(mode, float(scale) if scale else 1.0)
+    except ValueError:
+        print(f'Ignoring GAME_PACING={setting!r}: expected realtime, instant or scaled:NUMBER. Using realtime.', file=sys.stderr)
+        return Pacer(REALTIME)
+
+# The pacer used by gamefunctions
+pacer = _from_environment()
+
+def pause(seconds):
+    """
+    Pause with the module level pacer.
+
+    Arguments:
+        seconds (float): How long the pause is at normal speed.
+
+    Returns:
+        None
+    """
+    pacer.pause(seconds)
+
+def configure(mode, scale=1.0):
+    """
+    Change the module level pacer's mode.
+
+    Arguments:
+        mode (str): 'realtime', 'instant' or 'scaled'.
+        scale (float, optional): The multiplier for 'scaled' mode. Default is 1.0.
+
+    Returns:
+        None
+    """
+    pacer.set_mode(mode, scale)
@@ -0,0 +1,247 @@
+"""
+Shared distance fields for monsters that chase the player
+
+Instead of searching for a path from every monster to the player, a DistanceField runs one
+breadth-first search outwards from the player's cell and stores how many steps every cell is
+from the player. A monster then finds its next step by looking at its four neighbours and
+taking one that is a step closer, which costs the same however many monsters there are.
+
+The field is only worked out again when it is needed: moving the player or adding an obstacle
+marks it stale, and it is rebuilt the next time a monster asks for a step, so several player
+moves between monster moves cost one search. Removing an obstacle only lowers distances, so
+that is fixed up from the freed cell alone. With a radius, the search stays inside the square
+of cells within that many cells of the player, so the cost does not grow with the map.
+
+Classes:
+    - DistanceField: Steps to a target cell for every cell around it.
+
+Typical usage example:
+    field = DistanceField(gridSize, gridSize, radius=5)
+    field.set_target(player.position)
+    step = field.next_step(monster.position)
+    if step is not None:
+        monster.position[:] = step
+"""
+import collections
+
+import gameProfile
+
+# Distance of a cell the search did not reach
+UNREACHED = -1
+
+class DistanceField:
+    """
+    Steps to a target cell from every cell within reach of it, on a grid with blocked cells.
+
+    Attributes:
+        width, height (int): The size of the grid in cells.
+        radius (int): How far from the target the field reaches, or None for the whole grid.
+        target (tuple): The cell the distances are measured to, or None before set_target.
+        blocked (set): The cells nothing can walk through.
+        obstacles (function): Called with (left, top, width, height) to get the blocked cells in that rectangle, for maps with their own terrain. May be None.
+        builds (int): The number of times the field was worked out from scratch.
+        version (int): Goes up every time any distance changes.
+    """
+    def __init__(self, width, height, radius=None, blocked=(), obstacles=None):
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.target = None
+        self.blocked = set(blocked)
+        self.obstacles = obstacles
+        self.builds = 0
+        self.version = 0
+        self._stale = True
+        self._window = (0, 0, 0, 0)
+        self._distances = []
+        self._terrain = self.blocked
+
+    def set_target(self, cell):
+        """
+        Measures distances to a new cell, usually the player's. The field is rebuilt the next time it is used, not now.
+        """
+        cell = (cell[0], cell[1])
+        if cell != self.target:
+            self.target = cell
+            self._stale = True
+
+    def add_obstacle(self, cell):
+        """
+        Blocks a cell. Paths may get longer, so the field is rebuilt the next time it is used.
+        """
+        cell = (cell[0], cell[1])
+        if cell not in self.blocked:
+            self.blocked.add(cell)
+            self._terrain.add(cell)
+            index = self._index(cell)
+            if index is not None and self._distances[index] != UNREACHED:
+                self._stale = True
+
+    def remove_obstacle(self, cell):
+        """
+        Unblocks a cell. Distances can only get shorter, so only the cells that now have a shorter way through it are updated.
+        """
+        cell = (cell[0], cell[1])
+        if cell not in self.blocked:
+            return
+        self.blocked.discard(cell)
+        self._terrain.discard(cell)
+        if cell == self.target:
+            self._stale = True
+        if self._stale or self.target is None:
+            return
+        index = self._index(cell)
+        if index is None:
+            return
+        left, top, width, height = self._window
+        distances = self._distances
+        best = UNREACHED
+        for x, y in self._neighbours(cell):
+            near = distances[(y - top) * width + x - left]
+            if near != UNREACHED and (best == UNREACHED or near + 1 < best):
+                best = near + 1
+        if best == UNREACHED:
+            return
+        distances[index] = best
+        self._spread(collections.deque([cell]))
+        self.version += 1
+
+    def invalidate(self):
+        """
+        Rebuilds the field the next time it is used, for when the map changed in a way the field was not told about.
+        """
+        self._stale = True
+
+    def distance(self, cell):
+        """
+        Returns how many steps a cell is from the target, or UNREACHED if it cannot reach it within the radius.
+        """
+        self._refresh()
+        index = self._index(cell)
+        if index is None:
+            return UNREACHED
+        return self._distances[index]
+
+    def next_step(self, position):
+        """
+        Returns the neighbouring cell one step closer to the target.
+
+        Arguments:
+            position (list): The cell [x, y] to step from.
+
+        Returns:
+            step (tuple): The (x, y) to move to, or None when the position is on the target or cannot reach it.
+        """
+        if self._stale:
+            self._refresh()
+        left, top, width, height = self._window
+        x = position[0] - left
+        y = position[1] - top
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+        distances = self._distances
+        index = y * width + x
+        here = distances[index]
+        if here <= 0:
+            return None
+        closer = here - 1
+        if x > 0 and distances[index - 1] == closer:
+            return (position[0] - 1, position[1])
+        if x < width - 1 and distances[index + 1] == closer:
+            return (position[0] + 1, position[1])
+        if y > 0 and distances[index - width] == closer:
+            return (position[0], position[1] - 1)
+        return (position[0], position[1] + 1)
+
+    def _refresh(self):
+        if not self._stale or self.target is None:
+            return
+        with gameProfile.span('path.build'):
+            self._build()
+        self._stale = False
+        self.builds += 1
+        self.version += 1
+
+    def _build(self):
+        targetX, targetY = self.target
+        if self.radius is None:
+            left, top, right, bottom = 0, 0, self.width, self.height
+        else:
+            left = max(0, targetX - self.radius)
+            top = max(0, targetY - self.radius)
+            right = min(self.width, targetX + self.radius + 1)
+            bottom = min(self.height, targetY + self.radius + 1)
+        width = right - left
+        height = bottom - top
+        self._window = (left, top, width, height)
+        self._distances = [UNREACHED] * (width * height)
+        blocked = self.blocked
+        if self.obstacles is not None:
+            blocked = blocked | set(self.obstacles(left, top, width, height))
+        # Mark blocked cells as reached, so the search never enters them, then clear them afterwards
+        walls = [(y - top) * width + x - left for x, y in blocked if left <= x < right and top <= y < bottom]
+        distances = self._distances
+        for index in walls:
+            distances[index] = 0
+        start = (targetY - top) * width + targetX - left
+        if 0 <= targetX - left < width and 0 <= targetY - top < height and distances[start] == UNREACHED:
+            distances[start] = 0
+            frontier = [start]
+            depth = 0
+            while frontier:
+                depth += 1
+                found = []
+                for index in frontier:
+                    x = index % width
+                    if x > 0 and distances[index - 1] == UNREACHED:
+                        distances[index - 1] = depth
+                        found.append(index - 1)
+                    if x < width - 1 and distances[index + 1] == UNREACHED:
+                        distances[index + 1] = depth
+                        found.append(index + 1)
+                    if index >= width and distances[index - width] == UNREACHED:
+                        distances[index - width] = depth
+                        found.append(index - width)
+                    if index + width < len(distances) and distances[index + width] == UNREACHED:
+                        distances[index + width] = depth
+                        found.append(index + width)
+                frontier = found
+        for index in walls:
+            distances[index] = UNREACHED
+        # Every blocked cell in the window, the map's own terrain included, for remove_obstacle
+        self._terrain = blocked
+
+    def _spread(self, queue):
+        # Lowers the distances around the cells in the queue until nothing changes
+        left, top, width, height = self._window
+        distances = self._distances
+        while queue:
+            cell = queue.popleft()
+            reach = distances[(cell[1] - top) * width + cell[0] - left] + 1
+            for neighbour in self._neighbours(cell):
+                if neighbour in self._terrain:
+                    continue
+                index = (neighbour[1] - top) * width + neighbour[0] - left
+                if distances[index] == UNREACHED or reach < distances[index]:
+                    distances[index] = reach
+                    queue.append(neighbour)
+
+    def _neighbours(self, cell):
+        left, top, width, height = self._window
+        x, y = cell
+        if x > left:
+            yield (x - 1, y)
+        if x < left + width - 1:
+            yield (x + 1, y)
+        if y > top:
+            yield (x, y - 1)
+        if y < top + height - 1:
+            yield (x, y + 1)
+
+    def _index(self, cell):
+        left, top, width, height = self._window
+        x = cell[0] - left
+        y = cell[1] - top
+        if 0 <= x < width and 0 <= y < height:
+            return y * width + x
+        return None
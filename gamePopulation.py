@@ -0,0 +1,253 @@
+"""
+Wandering monsters stored as NumPy arrays
+
+This module holds a whole population of wandering monsters in a handful of NumPy arrays
+instead of one WanderingMonster object per monster, so moving every monster and checking
+which ones the player ran into are single array operations.
+
+Classes:
+    - MonsterPopulation: Positions and stats of many monsters, moved and searched together.
+    - MonsterView: A dictionary-like view of one monster in a population, for fight_monster.
+
+Typical usage example:
+    population = MonsterPopulation.spawn(10000, gridSize=100, seed=1)
+    population.step()
+    for enemy in population.collisions([3, 4]):
+        player, enemy.data = gamefunctions.fight_monster(player, enemy.data)
+    population.remove_dead()
+"""
+import numpy as np
+
+import gameSpecies
+
+# Moves for the four directions WanderingMonster can pick: left, right, up, down
+STEPS_X = np.array([-1, 1, 0, 0], dtype=np.int32)
+STEPS_Y = np.array([0, 0, -1, 1], dtype=np.int32)
+
+class MonsterPopulation:
+    """
+    Positions and stats of many monsters, kept in parallel NumPy arrays.
+
+    Names and descriptions are stored once per species; each monster only keeps the index of
+    its species.
+
+    Attributes:
+        gridSize (int): The width and height of the board the monsters wander on.
+        x, y (numpy.ndarray): The cell of every monster.
+        health, power, money (numpy.ndarray): The stats of every monster.
+        species (numpy.ndarray): The index of every monster's name in speciesNames.
+        alive (numpy.ndarray): False for monsters that were killed but not yet removed.
+    """
+    def __init__(self, gridSize=10, rng=None):
+        self.gridSize = gridSize
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.speciesNames = []
+        self.speciesDescriptions = []
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0, dtype=np.int32)
+        self.health = np.zeros(0, dtype=np.int32)
+        self.power = np.zeros(0, dtype=np.int32)
+        self.money = np.zeros(0, dtype=np.int32)
+        self.species = np.zeros(0, dtype=np.int16)
+        self.alive = np.zeros(0, dtype=bool)
+        self._inventories = {}
+
+    def __len__(self):
+        return len(self.x)
+
+    @classmethod
+    def spawn(cls, count, gridSize=10, seed=None):
+        """
+        Creates a population of random monsters placed at random cells.
+
+        Arguments:
+            count (int): The number of monsters to create.
+            gridSize (int, optional): The width and height of the board. Default is 10.
+            seed (int, optional): Seed for the stats, positions and moves of the population.
+
+        Returns:
+            population (MonsterPopulation): The new population.
+        """
+        population = cls(gridSize, np.random.default_rng(seed))
+        population.add_batch(gameSpecies.random_monsters(count, population.rng), population.rng.integers(0, gridSize, size=(count, 2)))
+        return population
+
+    def add_batch(self, batch, positions):
+        """
+        Adds monsters drawn by gameSpecies.random_monsters to the population.
+
+        Arguments:
+            batch (gameSpecies.MonsterBatch): The monsters to add.
+            positions (numpy.ndarray): The [x, y] cell of each monster.
+
+        Returns:
+            None
+        """
+        positions = np.asarray(positions, dtype=np.int32).reshape(-1, 2)
+        lookup = np.array([self._species_index(species._asdict()) for species in batch.table], dtype=np.int16)
+        self.x = np.concatenate([self.x, positions[:, 0]])
+        self.y = np.concatenate([self.y, positions[:, 1]])
+        self.health = np.concatenate([self.health, batch.health])
+        self.power = np.concatenate([self.power, batch.power])
+        self.money = np.concatenate([self.money, batch.money])
+        self.species = np.concatenate([self.species, lookup[batch.species]])
+        self.alive = np.concatenate([self.alive, np.ones(len(batch), dtype=bool)])
+
+    def add(self, monsters, positions):
+        """
+        Adds monsters to the population.
+
+        Arguments:
+            monsters (list): Monster dictionaries as returned by random_monster.
+            positions (list): The [x, y] cell of each monster.
+
+        Returns:
+            None
+        """
+        positions = np.asarray(positions, dtype=np.int32).reshape(-1, 2)
+        species = np.array([self._species_index(monster) for monster in monsters], dtype=np.int16)
+        self.x = np.concatenate([self.x, positions[:, 0]])
+        self.y = np.concatenate([self.y, positions[:, 1]])
+        self.health = np.concatenate([self.health, np.array([monster['health'] for monster in monsters], dtype=np.int32)])
+        self.power = np.concatenate([self.power, np.array([monster['power'] for monster in monsters], dtype=np.int32)])
+        self.money = np.concatenate([self.money, np.array([monster['money'] for monster in monsters], dtype=np.int32)])
+        self.species = np.concatenate([self.species, species])
+        self.alive = np.concatenate([self.alive, np.ones(len(monsters), dtype=bool)])
+
+    def step(self):
+        """
+        Moves every living monster one cell in a random direction, staying on the board.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        directions = self.rng.integers(0, 4, size=len(self.x))
+        alive = self.alive
+        self.x += STEPS_X[directions] * alive
+        self.y += STEPS_Y[directions] * alive
+        np.clip(self.x, 0, self.gridSize - 1, out=self.x)
+        np.clip(self.y, 0, self.gridSize - 1, out=self.y)
+
+    def collisions(self, position):
+        """
+        Finds the living monsters standing on the given cell.
+
+        Arguments:
+            position (list): The cell [x, y] to check, usually the player's position.
+
+        Returns:
+            enemies (list): A MonsterView for each monster on the cell.
+        """
+        hits = np.flatnonzero((self.x == position[0]) & (self.y == position[1]) & self.alive)
+        return [MonsterView(self, int(index)) for index in hits]
+
+    def kill(self, index):
+        """
+        Marks a monster as dead. It stops moving and colliding until remove_dead drops it.
+        """
+        self.alive[index] = False
+
+    def remove_dead(self):
+        """
+        Drops dead monsters from the arrays. Views made before this call point at the wrong monsters afterwards.
+
+        Arguments:
+            None
+
+        Returns:
+            removed (int): The number of monsters dropped.
+        """
+        keep = self.alive & (self.health > 0)
+        removed = len(keep) - int(keep.sum())
+        if removed:
+            newIndex = np.cumsum(keep) - 1
+            self._inventories = {int(newIndex[index]): items for index, items in self._inventories.items() if keep[index]}
+            for name in ('x', 'y', 'health', 'power', 'money', 'species', 'alive'):
+                setattr(self, name, getattr(self, name)[keep])
+        return removed
+
+    def view(self, index):
+        """
+        Returns a dictionary-like view of one monster.
+        """
+        return MonsterView(self, index)
+
+    def _species_index(self, monster):
+        if monster['name'] not in self.speciesNames:
+            self.speciesNames.append(monster['name'])
+            self.speciesDescriptions.append(monster['description'])
+        return self.speciesNames.index(monster['name'])
+
+class MonsterView:
+    """
+    A dictionary-like view of one monster in a MonsterPopulation.
+
+    Reading and writing 'health', 'power' and 'money' go straight to the population's arrays, so
+    the view can be handed to gamefunctions.fight_monster like a monster dictionary. The view
+    also has the position and data attributes of a WanderingMonster.
+    """
+    __slots__ = ('population', 'index')
+
+    _arrays = ('health', 'power', 'money')
+
+    def __init__(self, population, index):
+        self.population = population
+        self.index = index
+
+    def __getitem__(self, key):
+        population = self.population
+        if key in self._arrays:
+            return int(getattr(population, key)[self.index])
+        if key == 'name':
+            return population.speciesNames[population.species[self.index]]
+        if key == 'description':
+            return population.speciesDescriptions[population.species[self.index]]
+        if key == 'inventory':
+            return population._inventories.setdefault(self.index, [])
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._arrays:
+            getattr(self.population, key)[self.index] = value
+            if key == 'health' and value <= 0:
+                self.population.kill(self.index)
+        elif key == 'inventory':
+            self.population._inventories[self.index] = value
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def keys(self):
+        return ('name', 'description', 'health', 'power', 'money', 'inventory')
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        """
+        Returns a plain monster dictionary with the monster's current values.
+        """
+        return {key: self[key] for key in self.keys()}
+
+    @property
+    def position(self):
+        return [int(self.population.x[self.index]), int(self.population.y[self.index])]
+
+    @property
+    def data(self):
+        return self
+
+    @data.setter
+    def data(self, monster):
+        # fight_monster hands back the same view it was given; copy anything else into the arrays
+        if monster is not self:
+            for key in self._arrays:
+                self[key] = monster[key]
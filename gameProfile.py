@@ -0,0 +1,340 @@
+"""
+Lightweight profiling for the game loop
+
+Code reports into the module level profiler with named spans (how long something took) and
+counters (how many times something happened). The renderer marks the end of every frame, so
+the profiler knows the frame times and how much of each frame every span took. While the
+profiler is off, span returns a shared do-nothing context manager and count returns straight
+away, so the instrumented code costs one function call per span.
+
+The profiler can also draw an overlay in the game window with the FPS, the p50/p99 frame time
+and the spans that took most of the frame (F3 toggles it while playing), and export everything
+it recorded as a JSON trace file that chrome://tracing or ui.perfetto.dev can open.
+
+Set GAME_PROFILE=on to turn the profiler on at start, or GAME_PROFILE=trace.json to also write
+a trace to that file when the game exits.
+
+Classes:
+    - Profiler: Collects spans, counters and frame times.
+    - Overlay: Draws the profiler's numbers in a corner of the game window.
+
+Functions:
+    - span: Time a block of code with the module level profiler.
+    - profiled: Decorator that times every call of a function.
+    - count: Add to a counter of the module level profiler.
+    - frame: Mark the end of a frame.
+
+Typical usage example:
+    profiler.enable()
+    with span('draw'):
+        renderer.draw(monsters)
+    frame()
+    print(profiler.summary()['spans']['draw']['p99'])
+    profiler.export_trace('trace.json')
+"""
+import atexit
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+# The do-nothing span handed out while the profiler is off
+_NO_SPAN = contextlib.nullcontext()
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+class Profiler:
+    """
+    Collects spans, counters and frame times.
+
+    Attributes:
+        enabled (bool): Whether spans and counters are recorded.
+        tracing (bool): Whether every span is also kept for export_trace.
+        counters (dict): The total of every counter.
+        frameTimes (collections.deque): The time between the most recent frames in milliseconds.
+        maxEvents (int): The most trace events kept; later events are dropped and counted in droppedEvents.
+    """
+    def __init__(self, history=300, maxEvents=200000):
+        self.enabled = False
+        self.tracing = False
+        self.maxEvents = maxEvents
+        self.history = history
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets everything recorded so far.
+        """
+        self.counters = collections.Counter()
+        self.frameTimes = collections.deque(maxlen=self.history)
+        self.droppedEvents = 0
+        self._spans = {}
+        self._frameSpans = collections.Counter()
+        self._recentFrames = collections.deque(maxlen=self.history)
+        self._events = []
+        self._lastFrame = None
+        self._origin = time.perf_counter_ns()
+
+    def enable(self, tracing=False):
+        """
+        Starts recording.
+
+        Arguments:
+            tracing (bool, optional): Also keep every span for export_trace. Default is False.
+
+        Returns:
+            None
+        """
+        self.enabled = True
+        self.tracing = tracing or self.tracing
+
+    def disable(self):
+        """
+        Stops recording. What was recorded so far is kept.
+        """
+        self.enabled = False
+
+    def span(self, name):
+        """
+        Returns a context manager that times the code inside it under the given name.
+        """
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, end):
+        """
+        Records a span that ran from start to end, both from time.perf_counter_ns.
+        """
+        duration = end - start
+        stats = self._spans.get(name)
+        if stats is None:
+            stats = self._spans[name] = [0, 0, collections.deque(maxlen=self.history)]
+        stats[0] += 1
+        stats[1] += duration
+        stats[2].append(duration)
+        self._frameSpans[name] += duration
+        if self.tracing:
+            self._trace({'name': name, 'ph': 'X', 'ts': (start - self._origin) / 1000, 'dur': duration / 1000,
+                         'pid': os.getpid(), 'tid': threading.get_ident()})
+
+    def count(self, name, amount=1):
+        """
+        Adds to the named counter.
+        """
+        if self.enabled:
+            self.counters[name] += amount
+
+    def frame(self):
+        """
+        Marks the end of a frame: records the frame time and starts a new per-frame breakdown.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self._lastFrame is not None:
+            self.frameTimes.append((now - self._lastFrame) / 1e6)
+            if self.tracing:
+                self._trace({'name': 'frame', 'ph': 'X', 'ts': (self._lastFrame - self._origin) / 1000,
+                             'dur': (now - self._lastFrame) / 1000, 'pid': os.getpid(), 'tid': threading.get_ident()})
+        self._lastFrame = now
+        self._recentFrames.append(self._frameSpans)
+        self._frameSpans = collections.Counter()
+
+    def _trace(self, event):
+        if len(self._events) < self.maxEvents:
+            self._events.append(event)
+        else:
+            self.droppedEvents += 1
+
+    def fps(self):
+        """
+        Returns the frames per second over the recent frames, or 0.0 before the second frame.
+        """
+        if not self.frameTimes:
+            return 0.0
+        return 1000 * len(self.frameTimes) / sum(self.frameTimes)
+
+    def breakdown(self):
+        """
+        Returns the average milliseconds per frame spent in each span over the recent frames, largest first.
+        """
+        frames = len(self._recentFrames)
+        if not frames:
+            return []
+        totals = collections.Counter()
+        for spans in self._recentFrames:
+            totals.update(spans)
+        return [(name, total / frames / 1e6) for name, total in totals.most_common()]
+
+    def summary(self):
+        """
+        Summarizes everything recorded.
+
+        Arguments:
+            None
+
+        Returns:
+            summary (dict): 'fps', 'frame' with the p50/p99 frame time, 'spans' with the calls,
+            total, mean, p50 and p99 milliseconds of every span, and 'counters'.
+        """
+        frames = sorted(self.frameTimes)
+        spans = {}
+        for name, (calls, total, recent) in self._spans.items():
+            ordered = sorted(recent)
+            spans[name] = {'calls': calls, 'total': total / 1e6, 'mean': total / calls / 1e6,
+                           'p50': _percentile(ordered, 0.5) / 1e6, 'p99': _percentile(ordered, 0.99) / 1e6}
+        return {'fps': self.fps(), 'frame': {'p50': _percentile(frames, 0.5), 'p99': _percentile(frames, 0.99)},
+                'spans': spans, 'counters': dict(self.counters)}
+
+    def export_trace(self, path):
+        """
+        Writes the recorded spans, frames and counters as a JSON trace file for chrome://tracing or ui.perfetto.dev.
+
+        Arguments:
+            path (str): The file to write.
+
+        Returns:
+            events (int): The number of events written.
+        """
+        events = list(self._events)
+        if self.counters:
+            end = (time.perf_counter_ns() - self._origin) / 1000
+            events.append({'name': 'counters', 'ph': 'C', 'ts': end, 'pid': os.getpid(), 'args': dict(self.counters)})
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+        return len(events)
+
+class Overlay:
+    """
+    Draws the profiler's FPS, frame times and biggest spans in the top left corner of the game window.
+
+    The text is rendered again at most every refresh seconds, so the overlay itself stays cheap.
+
+    Attributes:
+        profiler (Profiler): Where the numbers come from. Defaults to the module level profiler.
+        rows (int): How many spans are listed.
+        version (int): Goes up every time the text changes, so the renderer knows to redraw under it.
+    """
+    def __init__(self, source=None, rows=5, refresh=0.5):
+        self.profiler = profiler if source is None else source
+        self.rows = rows
+        self.refresh = refresh
+        self.version = 0
+        self._surface = None
+        self._renderedAt = 0.0
+        self._font = None
+
+    def lines(self):
+        """
+        Returns the lines of text the overlay shows.
+        """
+        source = self.profiler
+        frames = sorted(source.frameTimes)
+        lines = [f'{source.fps():.0f} FPS  p50 {_percentile(frames, 0.5):.1f}ms  p99 {_percentile(frames, 0.99):.1f}ms']
+        for name, milliseconds in source.breakdown()[:self.rows]:
+            lines.append(f'{name} {milliseconds:.2f}ms')
+        return lines
+
+    def surface(self):
+        """
+        Returns the overlay as a pygame surface, rendering it again if it is older than the refresh interval.
+        """
+        import pygame
+        now = time.perf_counter()
+        if self._surface is None or now - self._renderedAt >= self.refresh:
+            if self._font is None:
+                pygame.font.init()
+                self._font = pygame.font.Font(None, 16)
+            rendered = [self._font.render(line, True, (255, 255, 255)) for line in self.lines()]
+            width = max(text.get_width() for text in rendered) + 6
+            height = sum(text.get_height() for text in rendered) + 6
+            surface = pygame.Surface((width, height))
+            surface.set_alpha(200)
+            y = 3
+            for text in rendered:
+                surface.blit(text, (3, y))
+                y += text.get_height()
+            self._surface = surface
+            self._renderedAt = now
+            self.version += 1
+        return self._surface
+
+# The profiler the game's modules report into
+profiler = Profiler()
+
+def span(name):
+    """
+    Times a block of code with the module level profiler.
+
+    Arguments:
+        name (str): The span's name, such as 'draw'.
+
+    Returns:
+        A context manager.
+    """
+    if not profiler.enabled:
+        return _NO_SPAN
+    return _Span(profiler, name)
+
+def profiled(name):
+    """
+    Decorator that times every call of a function as a span with the given name.
+    """
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            with _Span(profiler, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, amount=1):
+    """
+    Adds to a counter of the module level profiler.
+    """
+    if profiler.enabled:
+        profiler.counters[name] += amount
+
+def frame():
+    """
+    Marks the end of a frame for the module level profiler.
+    """
+    if profiler.enabled:
+        profiler.frame()
+
+def _from_environment():
+    # GAME_PROFILE can be 'on', or a file name to write a trace to when the game exits
+    setting = os.environ.get('GAME_PROFILE')
+    if not setting or setting in ('0', 'off'):
+        return
+    if setting in ('1', 'on'):
+        profiler.enable()
+        return
+    profiler.enable(tracing=True)
+    atexit.register(profiler.export_trace, setting)
+
+_from_environment()
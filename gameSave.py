@@ -0,0 +1,464 @@
+"""
+Save slots with atomic snapshots, a change journal and background autosaving
+
+Each named slot is stored as a binary snapshot file (see gameSaveFormat) with the whole game state and a journal file
+holding only what changed (money, health, inventory stacks) since the snapshot. Saving usually
+appends one small journal line. Once the journal gets long it is folded into a new snapshot.
+Snapshots are written to a temporary file, flushed to disk and renamed over the old one (see
+gameFiles), so a crash mid-save leaves the previous save readable. A torn last journal line is ignored when
+loading and cut off before the next append, so later saves never land behind it.
+
+Classes:
+    - SaveManager: Reads and writes the save slots in a folder.
+    - Autosaver: Saves a slot from a background thread so the game never waits for the disk.
+
+Typical usage example:
+    saves = SaveManager('saves')
+    saves.save('Cameron', monster, 'Cameron')
+    monster, username = saves.load('Cameron')
+"""
+import json
+import os
+import queue
+import threading
+
+import gameFiles
+import gameSaveFormat
+
+DEFAULT_SAVE_DIR = 'saves'
+# Save file used before save slots existed
+LEGACY_SAVE_FILE = 'game_save_data.json'
+
+SNAPSHOT_SUFFIX = '.sav'
+JOURNAL_SUFFIX = '.journal'
+# Snapshots were JSON before the binary format; they are converted the first time they are read
+JSON_SNAPSHOT_SUFFIX = '.json'
+# Marks a slot that a game is playing, so two games (even in different processes) never write the same slot
+LOCK_SUFFIX = '.lock'
+# Appended to a player's slot name to get the slot the game autosaves to, so autosaves never replace a save the player made
+AUTOSAVE_SUFFIX = '-autosave'
+
+# Scalar monster fields tracked in the journal
+TRACKED_FIELDS = ('name', 'description', 'health', 'power', 'money')
+
+def _state(monster, username):
+    data = monster.to_dict() if hasattr(monster, 'to_dict') else dict(monster)
+    inventory = data.get('inventory', [])
+    data['inventory'] = [item.to_dict() if hasattr(item, 'to_dict') else dict(item) for item in inventory]
+    return {'username': username, 'monster': data}
+
+def _stack_key(item):
+    fields = {key: value for key, value in item.items() if key != 'count'}
+    return json.dumps(fields, sort_keys=True)
+
+def _stacks(inventory):
+    stacks = {}
+    for item in inventory:
+        key = _stack_key(item)
+        if key in stacks:
+            # Older inventories list every unit separately
+            stacks[key] = dict(stacks[key], count=stacks[key].get('count', 1) + item.get('count', 1))
+        else:
+            stacks[key] = item
+    return stacks
+
+def diff_states(old, new):
+    """
+    Works out what changed between two saved states.
+
+    Arguments:
+        old (dict): The previous state, as {'username': ..., 'monster': {...}}.
+        new (dict): The current state.
+
+    Returns:
+        delta (dict): The changed fields under 'set' and the changed inventory stacks under 'inventory', or None if nothing changed.
+    """
+    delta = {}
+    changed = {field: new['monster'].get(field) for field in TRACKED_FIELDS if old['monster'].get(field) != new['monster'].get(field)}
+    if old['username'] != new['username']:
+        changed['username'] = new['username']
+    if changed:
+        delta['set'] = changed
+    oldStacks = _stacks(old['monster'].get('inventory', []))
+    newStacks = _stacks(new['monster'].get('inventory', []))
+    stacks = [[key, item] for key, item in newStacks.items() if oldStacks.get(key) != item]
+    stacks.extend([key, None] for key in oldStacks if key not in newStacks)
+    if stacks:
+        delta['inventory'] = stacks
+    return delta or None
+
+def apply_delta(state, delta):
+    """
+    Applies a journal entry made by diff_states to a saved state, in place.
+
+    Arguments:
+        state (dict): The state to update.
+        delta (dict): The journal entry.
+
+    Returns:
+        state (dict): The updated state.
+    """
+    for field, value in delta.get('set', {}).items():
+        if field == 'username':
+            state['username'] = value
+        else:
+            state['monster'][field] = value
+    if 'inventory' in delta:
+        stacks = _stacks(state['monster'].get('inventory', []))
+        for key, item in delta['inventory']:
+            if item is None:
+                stacks.pop(key, None)
+            else:
+                stacks[key] = item
+        state['monster']['inventory'] = list(stacks.values())
+    return state
+
+class SaveManager:
+    """
+    Reads and writes the named save slots in a folder.
+
+    Attributes:
+        directory (str): The folder holding the slot files.
+        compactEvery (int): The number of journal entries after which the journal is folded into a new snapshot.
+    """
+    def __init__(self, directory=DEFAULT_SAVE_DIR, compactEvery=20):
+        self.directory = directory
+        self.compactEvery = compactEvery
+        self._lock = threading.RLock()
+        # slot -> [state as last written, sequence number, journal entries since the snapshot]
+        self._known = {}
+
+    def slots(self):
+        """
+        Lists the saved slots.
+
+        Arguments:
+            None
+
+        Returns:
+            slots (list): The slot names, sorted.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        names = set()
+        for filename in os.listdir(self.directory):
+            for suffix in (SNAPSHOT_SUFFIX, JSON_SNAPSHOT_SUFFIX, JOURNAL_SUFFIX):
+                if filename.endswith(suffix) and not filename.startswith('.'):
+                    names.add(filename[:-len(suffix)])
+        return sorted(names)
+
+    def exists(self, slot):
+        return os.path.exists(self._path(slot, SNAPSHOT_SUFFIX)) or os.path.exists(self._path(slot, JSON_SNAPSHOT_SUFFIX))
+
+    def save(self, slot, monster, username):
+        """
+        Saves the game to a slot. Usually this only appends the changes since the last save to the slot's journal.
+
+        Arguments:
+            slot (str): The name of the slot.
+            monster (gameEntities.Monster or dict): The player's monster.
+            username (str): The name of the player.
+
+        Returns:
+            None
+        """
+        self.save_state(slot, _state(monster, username))
+
+    def save_state(self, slot, state):
+        """
+        Saves a state made by the same rules as save, for callers that captured it earlier (like Autosaver).
+        """
+        with self._lock:
+            known = self._known.get(slot)
+            if known is None and self.exists(slot):
+                self.load_state(slot)
+                known = self._known.get(slot)
+            if known is None:
+                self._write_snapshot(slot, state, 0)
+                return
+            delta = diff_states(known[0], state)
+            if delta is None:
+                return
+            if known[2] + 1 >= self.compactEvery:
+                self._write_snapshot(slot, state, known[1] + 1)
+                return
+            delta['seq'] = known[1] + 1
+            self._append_journal(slot, delta)
+            self._known[slot] = [state, delta['seq'], known[2] + 1]
+
+    def load(self, slot):
+        """
+        Loads a slot.
+
+        Arguments:
+            slot (str): The name of the slot.
+
+        Returns:
+            The saved gameEntities.Monster and username, or None, None if the slot does not exist.
+        """
+        # Imported here so the save format does not depend on the entity classes at import time
+        import gameEntities
+
+        state = self.load_state(slot)
+        if state is None:
+            return None, None
+        return gameEntities.Monster.from_dict(state['monster']), state['username']
+
+    def load_state(self, slot):
+        """
+        Loads a slot's snapshot and replays its journal.
+
+        Arguments:
+            slot (str): The name of the slot.
+
+        Returns:
+            state (dict): The saved state as {'username': ..., 'monster': {...}}, or None if the slot does not exist.
+        """
+        with self._lock:
+            try:
+                with open(self._path(slot, SNAPSHOT_SUFFIX), 'rb') as file:
+                    state, sequence = gameSaveFormat.decode_state(file.read())
+            except FileNotFoundError:
+                if not os.path.exists(self._path(slot, JSON_SNAPSHOT_SUFFIX)):
+                    return None
+                state, sequence = self._migrate_json_snapshot(slot)
+            entries = 0
+            for delta in self._read_journal(slot):
+                if delta.get('seq', 0) <= sequence:
+                    # Already part of the snapshot; the journal was not cleared before a crash
+                    continue
+                apply_delta(state, delta)
+                sequence = delta['seq']
+                entries += 1
+            self._known[slot] = [json.loads(json.dumps(state)), sequence, entries]
+            return state
+
+    def summary(self, slot):
+        """
+        Reads a slot's player summary without loading the inventory.
+
+        Arguments:
+            slot (str): The name of the slot.
+
+        Returns:
+            summary (dict): The username, name, description, health, power and money, or None if the slot does not exist.
+        """
+        with self._lock:
+            if not os.path.exists(self._path(slot, SNAPSHOT_SUFFIX)):
+                if not self.exists(slot):
+                    return None
+                self.load_state(slot)
+            summary = gameSaveFormat.read_summary(self._path(slot, SNAPSHOT_SUFFIX))
+            sequence = summary.pop('seq')
+            # Journal entries only hold what changed, so the newest values are cheap to apply
+            for delta in self._read_journal(slot):
+                if delta.get('seq', 0) > sequence:
+                    summary.update(delta.get('set', {}))
+            return summary
+
+    def compact(self, slot):
+        """
+        Folds a slot's journal into a new snapshot.
+
+        Arguments:
+            slot (str): The name of the slot.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            state = self.load_state(slot)
+            if state is not None:
+                self._write_snapshot(slot, state, self._known[slot][1])
+
+    def delete(self, slot):
+        """
+        Deletes a slot's files.
+        """
+        with self._lock:
+            for suffix in (SNAPSHOT_SUFFIX, JSON_SNAPSHOT_SUFFIX, JOURNAL_SUFFIX):
+                if os.path.exists(self._path(slot, suffix)):
+                    os.remove(self._path(slot, suffix))
+            self._known.pop(slot, None)
+
+    def claim(self, slot):
+        """
+        Marks a slot as being played, so no other game can claim it until it is released. Works across processes.
+
+        Arguments:
+            slot (str): The name of the slot.
+
+        Returns:
+            claimed (bool): True if the slot was free and is now claimed, False if another game has it.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            descriptor = os.open(self._path(slot, LOCK_SUFFIX), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.write(descriptor, str(os.getpid()).encode())
+        os.close(descriptor)
+        # Another process may have saved the slot since this one last did, so read it from disk again
+        with self._lock:
+            self._known.pop(slot, None)
+        return True
+
+    def release(self, slot):
+        """
+        Frees a slot claimed with claim.
+        """
+        with self._lock:
+            self._known.pop(slot, None)
+        try:
+            os.remove(self._path(slot, LOCK_SUFFIX))
+        except FileNotFoundError:
+            pass
+
+    def release_all(self):
+        """
+        Frees every claimed slot, for a server starting up after a crash left claims behind.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            if filename.endswith(LOCK_SUFFIX):
+                os.remove(os.path.join(self.directory, filename))
+
+    def import_legacy(self, slot=None, path=LEGACY_SAVE_FILE):
+        """
+        Copies a save made before save slots existed into a slot. The old file is left in place.
+
+        Arguments:
+            slot (str, optional): The slot to save into. Defaults to the saved username.
+            path (str, optional): The old save file. Defaults to game_save_data.json.
+
+        Returns:
+            slot (str): The slot the old save was copied into, or None if there was no old save.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as file:
+            data = json.load(file)
+        if slot is None:
+            slot = data['username']
+        self.save_state(slot, _state(data['monster'], data['username']))
+        return slot
+
+    def _path(self, slot, suffix):
+        # Slots are named after players, so keep the name from reaching outside the folder
+        filename = ''.join(character if character.isalnum() or character in ' _-' else '_' for character in slot)
+        return os.path.join(self.directory, filename + suffix)
+
+    def _write_snapshot(self, slot, state, sequence):
+        os.makedirs(self.directory, exist_ok=True)
+        gameFiles.atomic_write(self._path(slot, SNAPSHOT_SUFFIX), gameSaveFormat.encode_state(state, sequence))
+        # The snapshot holds every entry up to sequence, so the journal can go
+        if os.path.exists(self._path(slot, JOURNAL_SUFFIX)):
+            os.remove(self._path(slot, JOURNAL_SUFFIX))
+        self._known[slot] = [json.loads(json.dumps(state)), sequence, 0]
+
+    def _migrate_json_snapshot(self, slot):
+        path = self._path(slot, JSON_SNAPSHOT_SUFFIX)
+        with open(path, 'r') as file:
+            snapshot = json.load(file)
+        sequence = snapshot.pop('seq', 0)
+        os.makedirs(self.directory, exist_ok=True)
+        gameFiles.atomic_write(self._path(slot, SNAPSHOT_SUFFIX), gameSaveFormat.encode_state(snapshot, sequence))
+        os.remove(path)
+        return snapshot, sequence
+
+    def _append_journal(self, slot, delta):
+        with open(self._path(slot, JOURNAL_SUFFIX), 'a+b') as file:
+            size = file.seek(0, os.SEEK_END)
+            if size:
+                file.seek(size - 1)
+                if file.read(1) != b'\n':
+                    # A crash tore the last line; cut it off so this entry is not glued onto it
+                    file.seek(0)
+                    file.truncate(file.read().rfind(b'\n') + 1)
+            file.write(json.dumps(delta, separators=(',', ':')).encode('utf-8') + b'\n')
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _read_journal(self, slot):
+        try:
+            with open(self._path(slot, JOURNAL_SUFFIX), 'rb') as file:
+                lines = file.read().split(b'\n')
+        except FileNotFoundError:
+            return
+        for line in lines:
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A line torn by a crash; everything after it was never confirmed
+                return
+
+class Autosaver:
+    """
+    Saves a slot from a background thread.
+
+    request only captures the state and hands it to the thread, so the game loop never waits for
+    the disk. If several requests pile up, only the newest is written.
+
+    Attributes:
+        manager (SaveManager): Where the slot is saved.
+        slot (str): The slot to save to.
+        saves (int): The number of saves written so far.
+        error (Exception): The last error the thread hit while saving, or None.
+    """
+    def __init__(self, manager, slot):
+        self.manager = manager
+        self.slot = slot
+        self.saves = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+    def request(self, monster, username):
+        """
+        Asks for the game to be saved. Returns straight away.
+
+        Arguments:
+            monster (gameEntities.Monster or dict): The player's monster.
+            username (str): The name of the player.
+
+        Returns:
+            None
+        """
+        self._queue.put(_state(monster, username))
+
+    def stop(self):
+        """
+        Writes any pending save and stops the thread.
+
+        Arguments:
+            None
+
+        Returns:
+            None
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            state = self._queue.get()
+            stopping = state is None
+            # Skip to the newest request waiting in the queue
+            while not self._queue.empty():
+                newer = self._queue.get()
+                if newer is None:
+                    stopping = True
+                else:
+                    state = newer
+            if state is not None:
+                try:
+                    self.manager.save_state(self.slot, state)
+                    self.saves += 1
+                except Exception as e:
+                    self.error = e
+            if stopping:
+                return
@@ -0,0 +1,310 @@
+"""
+Compact binary format for save snapshots
+
+A save snapshot is written as a small fixed header, a table of sections and the sections
+themselves:
+
+    header    magic b'AGSV', format version, number of sections
+    sections  one (tag, offset, length) entry per section
+    SUMM      save sequence number, health, power and money (each an int or a float), username,
+              monster name and description
+    STRS      every distinct string used by the inventory, stored once
+    INVT      one fixed-size record per inventory stack, pointing into STRS
+
+Because the section table says where everything is, the player summary shown when picking a
+save can be read without touching the inventory. Files written by an older version of the
+format are upgraded through MIGRATIONS when they are read.
+
+Classes:
+    - SaveFile: Reads a snapshot file lazily, one section at a time.
+    - SaveFormatError: Raised for files that are not snapshots or are damaged.
+
+Functions:
+    - encode_state: Turn a saved state into snapshot bytes.
+    - decode_state: Turn snapshot bytes back into a saved state.
+    - read_summary: Read just the player summary from a snapshot file.
+
+Typical usage example:
+    data = encode_state({'username': 'Cameron', 'monster': monster.to_dict()}, 0)
+    state, sequence = decode_state(data)
+    print(read_summary('saves/Cameron.sav')['money'])
+"""
+import struct
+
+MAGIC = b'AGSV'
+VERSION = 2
+
+_HEADER = struct.Struct('<4sHH')
+_SECTION = struct.Struct('<4sQQ')
+# sequence, flags, health, power, money; a float is stored as the bits of a double, and flagged
+_SUMMARY = struct.Struct('<qBqqq')
+# Version 1 summaries only held integers
+_SUMMARY_V1 = struct.Struct('<qqqq')
+_DOUBLE = struct.Struct('<d')
+_INT64 = struct.Struct('<q')
+_LENGTH = struct.Struct('<I')
+# name, type and description string numbers, flags, price, power, maxDurability, currentDurability, count
+_ITEM = struct.Struct('<IIIBdqqqq')
+
+_NO_STRING = 0xFFFFFFFF
+
+# Item record flags: which optional fields are present, and whether the price is a float
+_HAS_PRICE = 1
+_FLOAT_PRICE = 2
+_HAS_POWER = 4
+_HAS_MAX_DURABILITY = 8
+_HAS_CURRENT_DURABILITY = 16
+
+# The summary's numbers, and the flag that marks each one as a float
+_SUMMARY_FIELDS = ('health', 'power', 'money')
+_FLOAT_SUMMARY = (1, 2, 4)
+
+def _upgrade_1(state):
+    # Version 2 only changed how the summary numbers are stored, and _decode_summary reads both
+    return state
+
+# Functions that upgrade a decoded state from the version in the key to the next version
+MIGRATIONS = {1: _upgrade_1}
+
+class SaveFormatError(ValueError):
+    """
+    Raised when a file is not a save snapshot, is damaged or was written by a newer version of the game.
+    """
+
+def _pack_string(text):
+    data = text.encode('utf-8')
+    return _LENGTH.pack(len(data)) + data
+
+def _unpack_strings(data, offset, count):
+    strings = []
+    for index in range(count):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        strings.append(bytes(data[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return strings, offset
+
+def _encode_summary(state, sequence):
+    monster = state['monster']
+    flags = 0
+    numbers = []
+    for field, flag in zip(_SUMMARY_FIELDS, _FLOAT_SUMMARY):
+        value = monster[field]
+        if isinstance(value, float):
+            flags |= flag
+            value = _INT64.unpack(_DOUBLE.pack(value))[0]
+        elif not isinstance(value, int):
+            raise TypeError(f'{field} must be an int or a float to be saved, not {type(value).__name__}')
+        numbers.append(value)
+    return b''.join([
+        _SUMMARY.pack(sequence, flags, *numbers),
+        _pack_string(state['username']),
+        _pack_string(monster['name']),
+        _pack_string(monster['description']),
+    ])
+
+def _decode_summary(data, version):
+    if version < 2:
+        sequence, health, power, money = _SUMMARY_V1.unpack_from(data, 0)
+        size = _SUMMARY_V1.size
+    else:
+        sequence, flags, health, power, money = _SUMMARY.unpack_from(data, 0)
+        size = _SUMMARY.size
+        if flags:
+            numbers = [health, power, money]
+            for index, flag in enumerate(_FLOAT_SUMMARY):
+                if flags & flag:
+                    numbers[index] = _DOUBLE.unpack(_INT64.pack(numbers[index]))[0]
+            health, power, money = numbers
+    (username, name, description), offset = _unpack_strings(data, size, 3)
+    return {'seq': sequence, 'username': username, 'name': name, 'description': description, 'health': health, 'power': power, 'money': money}
+
+def _encode_inventory(inventory):
+    strings = {}
+
+    def number(text):
+        if text is None:
+            return _NO_STRING
+        found = strings.get(text)
+        if found is None:
+            found = strings[text] = len(strings)
+        return found
+
+    pack = _ITEM.pack
+    records = []
+    for item in inventory:
+        flags = 0
+        price = item.get('price')
+        if price is not None:
+            flags |= _HAS_PRICE
+            if isinstance(price, float):
+                flags |= _FLOAT_PRICE
+        power = item.get('power')
+        maxDurability = item.get('maxDurability')
+        currentDurability = item.get('currentDurability')
+        if power is not None:
+            flags |= _HAS_POWER
+        if maxDurability is not None:
+            flags |= _HAS_MAX_DURABILITY
+        if currentDurability is not None:
+            flags |= _HAS_CURRENT_DURABILITY
+        records.append(pack(number(item['name']), number(item['type']), number(item.get('description')), flags,
+                            price or 0, power or 0, maxDurability or 0, currentDurability or 0, item.get('count', 1)))
+    stringTable = _LENGTH.pack(len(strings)) + b''.join(_pack_string(text) for text in strings)
+    return stringTable, _LENGTH.pack(len(records)) + b''.join(records)
+
+def _decode_inventory(stringData, itemData):
+    (count,) = _LENGTH.unpack_from(stringData, 0)
+    strings, offset = _unpack_strings(stringData, _LENGTH.size, count)
+    (count,) = _LENGTH.unpack_from(itemData, 0)
+    end = _LENGTH.size + count * _ITEM.size
+    inventory = []
+    for nameNumber, typeNumber, descriptionNumber, flags, price, power, maxDurability, currentDurability, stackCount in _ITEM.iter_unpack(itemData[_LENGTH.size:end]):
+        item = {'name': strings[nameNumber], 'type': strings[typeNumber]}
+        if flags & _HAS_PRICE:
+            item['price'] = price if flags & _FLOAT_PRICE else int(price)
+        if flags & _HAS_POWER:
+            item['power'] = power
+        if flags & _HAS_MAX_DURABILITY:
+            item['maxDurability'] = maxDurability
+        if flags & _HAS_CURRENT_DURABILITY:
+            item['currentDurability'] = currentDurability
+        if descriptionNumber != _NO_STRING:
+            item['description'] = strings[descriptionNumber]
+        if stackCount != 1:
+            item['count'] = stackCount
+        inventory.append(item)
+    return inventory
+
+def encode_state(state, sequence=0):
+    """
+    Turns a saved state into snapshot bytes.
+
+    Arguments:
+        state (dict): The state as {'username': ..., 'monster': {...}} with inventory items as dictionaries.
+        sequence (int, optional): The number of the last journal entry included in the snapshot. Default is 0.
+
+    Returns:
+        data (bytes): The snapshot.
+    """
+    stringTable, items = _encode_inventory(state['monster'].get('inventory', []))
+    sections = [(b'SUMM', _encode_summary(state, sequence)), (b'STRS', stringTable), (b'INVT', items)]
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for tag, data in sections:
+        table.append(_SECTION.pack(tag, offset, len(data)))
+        offset += len(data)
+    return b''.join([_HEADER.pack(MAGIC, VERSION, len(sections))] + table + [data for tag, data in sections])
+
+def _read_table(read):
+    header = read(0, _HEADER.size)
+    if len(header) < _HEADER.size:
+        raise SaveFormatError('the file is too short to be a save')
+    magic, version, count = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise SaveFormatError('the file is not a save')
+    if version > VERSION:
+        raise SaveFormatError(f'the save was made by a newer version of the game (format {version})')
+    table = {}
+    data = read(_HEADER.size, _SECTION.size * count)
+    for tag, offset, length in _SECTION.iter_unpack(data):
+        table[tag] = (offset, length)
+    return version, table
+
+def _build_state(version, summary, inventory):
+    sequence = summary.pop('seq')
+    username = summary.pop('username')
+    summary['inventory'] = inventory
+    state = {'username': username, 'monster': summary}
+    while version < VERSION:
+        state = MIGRATIONS[version](state)
+        version += 1
+    return state, sequence
+
+def decode_state(data):
+    """
+    Turns snapshot bytes back into a saved state.
+
+    Arguments:
+        data (bytes): A snapshot made by encode_state.
+
+    Returns:
+        The state as {'username': ..., 'monster': {...}} and the sequence number stored with it.
+
+    Raises:
+        SaveFormatError: If the data is not a snapshot or is damaged.
+    """
+    view = memoryview(data)
+
+    def read(offset, length):
+        return view[offset:offset + length]
+
+    try:
+        version, table = _read_table(read)
+        summary = _decode_summary(read(*table[b'SUMM']), version)
+        inventory = _decode_inventory(read(*table[b'STRS']), read(*table[b'INVT']))
+    except (struct.error, KeyError, UnicodeDecodeError) as e:
+        raise SaveFormatError(f'the save is damaged ({e})')
+    return _build_state(version, summary, inventory)
+
+class SaveFile:
+    """
+    Reads a snapshot file lazily. Opening it only reads the header; each section is read the first time it is needed.
+
+    Attributes:
+        path (str): The snapshot file.
+        version (int): The format version the file was written with.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._summary = None
+        try:
+            self.version, self._table = _read_table(self._read)
+        except struct.error as e:
+            raise SaveFormatError(f'the save is damaged ({e})')
+
+    def _read(self, offset, length):
+        with open(self.path, 'rb') as file:
+            file.seek(offset)
+            return file.read(length)
+
+    def summary(self):
+        """
+        Returns the player summary without reading the inventory.
+
+        Arguments:
+            None
+
+        Returns:
+            summary (dict): The seq, username, name, description, health, power and money.
+        """
+        if self._summary is None:
+            self._summary = _decode_summary(self._read(*self._table[b'SUMM']), self.version)
+        return dict(self._summary)
+
+    def inventory(self):
+        """
+        Reads and returns the inventory items as dictionaries.
+        """
+        return _decode_inventory(self._read(*self._table[b'STRS']), self._read(*self._table[b'INVT']))
+
+    def state(self):
+        """
+        Reads the whole snapshot.
+
+        Returns:
+            The state as {'username': ..., 'monster': {...}} and the sequence number stored with it.
+        """
+        return _build_state(self.version, self.summary(), self.inventory())
+
+def read_summary(path):
+    """
+    Reads just the player summary from a snapshot file.
+
+    Arguments:
+        path (str): The snapshot file.
+
+    Returns:
+        summary (dict): The seq, username, name, description, health, power and money.
+    """
+    return SaveFile(path).summary()
@@ -0,0 +1,240 @@
+"""
+Buffered screens for the console menus and fights
+
+A menu printed with one print call per line makes one write to the terminal per line, which
+over SSH or a socket becomes hundreds of tiny writes. A Screen builds a whole screen in a
+buffer instead and writes it to a sink in one go: when the game is about to ask the player for
+input, before a pause that really waits, and when the screen is closed. A pause that does not
+wait (instant pacing) leaves the buffer alone, so a whole fight can go out as one write. The
+prompt of a question goes out in the same write, so it reaches the same place as the screen.
+
+Menus that never change are rendered once with frame and kept as one string; menus that only
+depend on a few values can be cached the same way with functools.lru_cache. Templates are
+ordinary format strings.
+
+Where the text goes is up to the module level sink:
+
+    TerminalSink  sys.stdout, looked up at every write so redirect_stdout still works
+    SocketSink    a connected socket, one sendall per write
+    MemorySink    a list in memory, for tests and benchmarks
+
+Classes:
+    - Screen: One screen of text, buffered and written to a sink in one go.
+    - TerminalSink: Writes to the terminal.
+    - SocketSink: Writes to a socket.
+    - MemorySink: Keeps what was written in memory.
+
+Functions:
+    - frame: Render lines into one block of text, for menus that never change.
+    - configure: Change the module level sink.
+    - redirect: Use another sink for the duration of a with block.
+    - show: Write a few lines as a screen of their own.
+    - ask: Write a prompt through the sink and read the player's answer.
+
+Typical usage example:
+    MENU = frame('1) Attack', '2) Run')
+    with Screen() as screen:
+        screen.line(f'Your HP: {health}')
+        screen.add(MENU)
+        choice = screen.ask('What\'s your next move: ')
+"""
+import contextlib
+import sys
+
+import gamePacing
+
+def frame(*lines):
+    """
+    Renders lines into one block of text ending in a newline, for menus that never change.
+
+    Arguments:
+        lines (str): The lines, without newlines.
+
+    Returns:
+        text (str): The lines joined with newlines.
+    """
+    return ''.join(line + '\n' for line in lines)
+
+class TerminalSink:
+    """
+    Writes to the terminal, one write and one flush of sys.stdout per screen.
+
+    sys.stdout is looked up at every write, so contextlib.redirect_stdout (used by the harness
+    and the server to capture what the game prints) still captures screens.
+
+    Attributes:
+        writes (int): The number of writes made.
+        characters (int): The number of characters written.
+    """
+    def __init__(self):
+        self.writes = 0
+        self.characters = 0
+
+    def write(self, text):
+        stream = sys.stdout
+        stream.write(text)
+        stream.flush()
+        self.writes += 1
+        self.characters += len(text)
+
+class SocketSink:
+    """
+    Writes to a connected socket, one sendall per screen.
+
+    Attributes:
+        connection (socket.socket): The socket to write to.
+        encoding (str): The encoding of the text on the wire.
+        writes (int): The number of writes made.
+        characters (int): The number of characters written.
+    """
+    def __init__(self, connection, encoding='utf-8'):
+        self.connection = connection
+        self.encoding = encoding
+        self.writes = 0
+        self.characters = 0
+
+    def write(self, text):
+        self.connection.sendall(text.encode(self.encoding))
+        self.writes += 1
+        self.characters += len(text)
+
+class MemorySink:
+    """
+    Keeps every write in memory, for tests and benchmarks.
+
+    Attributes:
+        chunks (list): The text of every write, in order.
+        writes (int): The number of writes made.
+        characters (int): The number of characters written.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.writes = 0
+        self.characters = 0
+
+    def write(self, text):
+        self.chunks.append(text)
+        self.writes += 1
+        self.characters += len(text)
+
+    def text(self):
+        """
+        Returns everything written so far as one string.
+        """
+        return ''.join(self.chunks)
+
+    def clear(self):
+        """
+        Forgets everything written so far.
+        """
+        self.chunks.clear()
+
+# Where screens are written
+sink = TerminalSink()
+
+def configure(newSink=None):
+    """
+    Change the module level sink.
+
+    Arguments:
+        newSink (optional): An object with a write(text) method, such as a SocketSink. Defaults to a new TerminalSink.
+
+    Returns:
+        sink: The sink now in use.
+    """
+    global sink
+    sink = TerminalSink() if newSink is None else newSink
+    return sink
+
+@contextlib.contextmanager
+def redirect(newSink):
+    """
+    Writes screens to another sink for the duration of the with block, like contextlib.redirect_stdout.
+    """
+    global sink
+    previous = sink
+    sink = newSink
+    try:
+        yield newSink
+    finally:
+        sink = previous
+
+class Screen:
+    """
+    One screen of text, buffered and written to a sink in one go.
+
+    The screen is written when the game asks for input, before a pause that really waits and
+    when the with block ends (even on an error). Nothing is written while the buffer is empty.
+
+    Attributes:
+        sink: Where the screen is written, or None for the module level sink at the time of writing.
+    """
+    __slots__ = ('sink', '_parts')
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self._parts = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.flush()
+
+    def line(self, text=''):
+        """
+        Adds one line, like print(text).
+        """
+        self._parts.append(text)
+        self._parts.append('\n')
+
+    def add(self, text):
+        """
+        Adds text as it is, such as a frame.
+        """
+        self._parts.append(text)
+
+    def text(self):
+        """
+        Returns what is in the buffer, without writing it.
+        """
+        return ''.join(self._parts)
+
+    def flush(self):
+        """
+        Writes the buffer to the sink in one write and empties it.
+        """
+        if self._parts:
+            text = ''.join(self._parts)
+            self._parts.clear()
+            (sink if self.sink is None else self.sink).write(text)
+
+    def ask(self, prompt=''):
+        """
+        Writes the buffer and the prompt in one write, then reads a line from the player like input(prompt).
+        """
+        self._parts.append(prompt)
+        self.flush()
+        return input()
+
+    def pause(self, seconds):
+        """
+        Pauses with gamePacing, writing the buffer first if the pause will really wait, so the player sees the text before it.
+        """
+        if gamePacing.pacer.duration(seconds) > 0:
+            self.flush()
+        gamePacing.pause(seconds)
+
+def show(*lines):
+    """
+    Writes a few lines to the sink as a screen of their own, like one print per line.
+    """
+    with Screen() as screen:
+        for line in lines:
+            screen.line(line)
+
+def ask(prompt=''):
+    """
+    Writes a prompt to the sink and reads a line from the player, like input(prompt).
+    """
+    return Screen().ask(prompt)
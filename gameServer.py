@@ -0,0 +1,518 @@
+"""
+Many game sessions in one process, played over a line protocol
+
+game.game() plays one game: the player, the enemies and the menus live in its local variables
+and it talks to the console through input() and print(). This module hosts many games at once
+instead. Each connection gets its own GameSession, with its own player, enemies, board, random
+generator and save slot, built on the same rules as the console game (gamefunctions and
+gameCombat). Sessions never share state, so one player's moves cannot reach another's game.
+
+The server runs on asyncio, so one process serves thousands of idle connections; saves are
+written on a thread pool so the loop never waits for the disk. With workers above one, that
+many processes listen on the same port (SO_REUSEPORT) and the kernel spreads the connections
+between them, one core each. Save slots are claimed through gameSave, so two sessions (in any
+worker) can never play the same slot at the same time.
+
+Protocol:
+    The client sends one command per line. The server answers every line, and greets a new
+    connection, with one line of JSON: {"ok": bool, "mode": str, "text": [str, ...]}, plus
+    "state" for the status command. mode is 'start' (new or load a game), 'map', 'fight' or 'over'.
+
+    start:  new NAME | load SLOT
+    map:    move left|right|up|down | sleep | shop | buy ITEM QUANTITY | inventory | save | status
+    fight:  attack | run | weapon NUMBER | use NUMBER | status
+    always: help | quit
+
+Classes:
+    - GameSession: One player's game, driven by command lines.
+    - GameServer: Serves GameSessions to the connections on a socket.
+
+Functions:
+    - serve: Runs the server, across several worker processes if asked.
+    - main: Command line entry point.
+
+Typical usage example:
+    python gameServer.py --port 8765 --workers 4
+    python gameClient.py --port 8765
+"""
+import argparse
+import asyncio
+import contextlib
+import inspect
+import io
+import json
+import multiprocessing
+import random
+import traceback
+
+import gameCombat
+import gameData
+import gameEntities
+import gamefunctions
+import gamePacing
+import gamePath
+import gameSave
+import gameShop
+import gameSpatial
+import gameSpecies
+
+# The board, the same size as the gameGraphics window grid
+GRID_SIZE = 10
+
+# Hostile enemies within this many cells chase the player, like gameGraphics.chaseRadius
+CHASE_RADIUS = 4
+
+# How far each move command takes the player
+DIRECTIONS = {'left': (-1, 0), 'right': (1, 0), 'up': (0, -1), 'down': (0, 1)}
+
+# How often, in seconds, each worker checks data/ for edited game data (see gameData)
+RELOAD_INTERVAL = 2.0
+
+# Session modes
+START = 'start'
+MAP = 'map'
+FIGHT = 'fight'
+OVER = 'over'
+
+# The commands each mode accepts; help and quit work in every mode
+COMMANDS = {
+    START: ('new', 'load'),
+    MAP: ('move', 'sleep', 'shop', 'buy', 'inventory', 'save', 'status'),
+    FIGHT: ('attack', 'run', 'weapon', 'use', 'status'),
+    OVER: (),
+}
+
+class Enemy:
+    """
+    A monster on a session's board.
+
+    Attributes:
+        position (list): The cell [x, y] the enemy is on.
+        data (gameEntities.Monster): The enemy's stats.
+    """
+    __slots__ = ('position', 'data')
+
+    def __init__(self, rng):
+        self.position = [rng.randint(0, GRID_SIZE - 1), rng.randint(0, GRID_SIZE - 1)]
+        self.data = gamefunctions.random_monster(rng)
+
+class GameSession:
+    """
+    One player's game, driven by command lines instead of the console.
+
+    The rules are the console game's: the same monsters, combat engine, shop prices, sleeping and
+    save slots. Enemies move on every second move of the player, and the hostile ones chase.
+
+    Attributes:
+        sessionId (int): The number of the session on its server.
+        mode (str): START, MAP, FIGHT or OVER.
+        username (str): The player's name, once a game is started.
+        monster (gameEntities.Monster): The player's monster, once a game is started.
+        slot (str): The save slot the session has claimed, or None.
+        enemies (list): The Enemy objects on the board.
+        position (list): The player's cell [x, y].
+        rng (random.Random): Where every random number in the session comes from.
+        pendingSave (tuple): (slot, state, username) for the server to write, or None.
+        shop (gameShop.Shop): The shop of the last shop command, or None before the first.
+    """
+    def __init__(self, sessionId, saves, rng=None):
+        self.sessionId = sessionId
+        self.saves = saves
+        self.rng = random.Random() if rng is None else rng
+        self.mode = START
+        self.username = None
+        self.monster = None
+        self.slot = None
+        self.enemies = []
+        self.position = [0, 0]
+        self.occupancy = gameSpatial.OccupancyGrid()
+        self.paths = gamePath.DistanceField(GRID_SIZE, GRID_SIZE, radius=CHASE_RADIUS)
+        self.pendingSave = None
+        self.moves = 0
+        self._engaged = (None, set())
+        self._fight = None
+        self._enemy = None
+        self.shop = None
+        self._text = []
+
+    def greeting(self):
+        """
+        Returns the response sent when the connection opens.
+        """
+        return self._respond(True, ['Welcome to the adventure game!', 'Type "new NAME" to start a new game or "load SLOT" to load a saved one.'])
+
+    def handle(self, line):
+        """
+        Runs one command line.
+
+        Arguments:
+            line (str): The command and its arguments, separated by spaces.
+
+        Returns:
+            response (dict): ok, mode and the text lines to show the player.
+        """
+        self._text = []
+        words = line.split()
+        if not words:
+            return self._respond(False, ['Type "help" to see the commands.'])
+        command, arguments = words[0].lower(), words[1:]
+        if command == 'help':
+            return self._respond(True, ['Commands: ' + ', '.join(COMMANDS[self.mode] + ('help', 'quit'))])
+        if command == 'quit':
+            return self._quit()
+        if command not in COMMANDS[self.mode]:
+            return self._respond(False, [f'"{command}" is not a command here. Type "help" to see the commands.'])
+        handler = getattr(self, '_' + command)
+        try:
+            inspect.signature(handler).bind(*arguments)
+        except TypeError:
+            return self._respond(False, [f'Wrong arguments for "{command}". Type "help" to see the commands.'])
+        return handler(*arguments)
+
+    def close(self):
+        """
+        Frees the session's save slot. Called when the connection ends.
+        """
+        if self.slot is not None:
+            self.saves.release(self.slot)
+            self.slot = None
+
+    def state(self):
+        """
+        Returns the player, the board and the fight, as plain data.
+        """
+        state = {'mode': self.mode, 'username': self.username, 'position': list(self.position),
+                 'enemies': [{'name': enemy.data['name'], 'position': list(enemy.position)} for enemy in self.enemies]}
+        if self.monster is not None:
+            state['monster'] = self.monster.to_dict()
+        if self._enemy is not None:
+            state['enemy'] = {'name': self._enemy.data['name'], 'health': self._enemy.data['health']}
+        return state
+
+    def _respond(self, ok, text=None, **extra):
+        response = {'ok': ok, 'mode': self.mode, 'text': self._text + (text or [])}
+        response.update(extra)
+        return response
+
+    def _say(self, function, *arguments):
+        # Runs a console function from gamefunctions and keeps what it printed for the response
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            result = function(*arguments)
+        self._text.extend(output.getvalue().splitlines())
+        return result
+
+    def _start(self, username, monster, slot, loaded=False):
+        if not self.saves.claim(slot):
+            return self._respond(False, [f'The save slot "{slot}" is being played in another session.'])
+        if loaded:
+            self._text.append('Game loaded successfully.')
+        self.username = username
+        self.monster = monster
+        self.slot = slot
+        self.mode = MAP
+        self.enemies = [Enemy(self.rng)]
+        self.occupancy.sync(self.enemies)
+        self.occupancy.move(gameSpatial.PLAYER, self.position)
+        self.paths.set_target(self.position)
+        self._say(gamefunctions.print_welcome, username)
+        return self._respond(True, ['Type "move left", "move right", "move up" or "move down" to walk.'])
+
+    def _new(self, *name):
+        if not name:
+            return self._respond(False, ['Give a name: new NAME'])
+        username = ' '.join(name)
+        return self._start(username, gamefunctions.random_monster(self.rng), username)
+
+    def _load(self, slot):
+        monster, username = self.saves.load(slot)
+        if monster is None:
+            return self._respond(False, [f'No saved game in the slot "{slot}".'])
+        return self._start(username, monster, slot, loaded=True)
+
+    def _move(self, direction):
+        step = DIRECTIONS.get(direction)
+        if step is None:
+            return self._respond(False, ['Move left, right, up or down.'])
+        x = min(GRID_SIZE - 1, max(0, self.position[0] + step[0]))
+        y = min(GRID_SIZE - 1, max(0, self.position[1] + step[1]))
+        self.position[:] = [x, y]
+        self.occupancy.move(gameSpatial.PLAYER, self.position)
+        self.paths.set_target(self.position)
+        self.moves += 1
+        if self.moves % 2 == 0:
+            for enemy in self.enemies:
+                self._move_enemy(enemy)
+        enemy = self._find_encounter()
+        if enemy is None:
+            return self._respond(True, [f'You are at ({x}, {y}).'])
+        self._enemy = enemy
+        self._fight = gameCombat.CombatEngine(self.monster, enemy.data, rng=self.rng)
+        self.mode = FIGHT
+        self._text.extend([f'A {enemy.data["name"]} appears!', enemy.data['description'],
+                           f'Your HP: {self.monster["health"]}', f'Enemy HP: {enemy.data["health"]}'])
+        self._say(gamefunctions.print_combat_events, self._fight.check_end())
+        return self._after_fight_move()
+
+    def _move_enemy(self, enemy):
+        # WanderingMonster.move for this board: hostile enemies step along the distance field, the rest wander
+        step = None
+        if gameSpecies.SPECIES_BY_NAME[enemy.data['name']].hostile:
+            step = self.paths.next_step(enemy.position)
+        if step is None:
+            dx, dy = self.rng.choice(list(DIRECTIONS.values()))
+            step = (min(GRID_SIZE - 1, max(0, enemy.position[0] + dx)), min(GRID_SIZE - 1, max(0, enemy.position[1] + dy)))
+        self.occupancy.move(enemy, step)
+        enemy.position[:] = step
+
+    def _find_encounter(self):
+        # The same rule as GameRenderer: an enemy the player already met on this cell does not start another fight
+        cell = tuple(self.position)
+        occupants = self.occupancy.at(cell) - {gameSpatial.PLAYER}
+        engagedCell, engaged = self._engaged
+        if engagedCell != cell:
+            engaged = set()
+        engaged &= occupants
+        self._engaged = (cell, engaged)
+        for enemy in occupants - engaged:
+            engaged.add(enemy)
+            return enemy
+        return None
+
+    def _attack(self):
+        self._say(gamefunctions.print_combat_events, self._fight.attack())
+        return self._after_fight_move()
+
+    def _run(self):
+        self._say(gamefunctions.print_combat_events, self._fight.run())
+        return self._after_fight_move()
+
+    def _weapon(self, number='1'):
+        return self._use_item(self._fight.weapons(), number, self._fight.use_weapon, 'weapon')
+
+    def _use(self, number='1'):
+        return self._use_item(self._fight.consumables(), number, self._fight.use_consumable, 'consumable')
+
+    def _use_item(self, items, number, use, kind):
+        if not items:
+            return self._respond(False, [f'You have no {kind} to use.'])
+        if not number.isdigit() or not 1 <= int(number) <= len(items):
+            return self._respond(False, ['Invalid choice.'])
+        self._say(gamefunctions.print_combat_events, use(items[int(number) - 1]))
+        return self._after_fight_move()
+
+    def _after_fight_move(self):
+        engine = self._fight
+        if engine.outcome is None:
+            return self._respond(True)
+        enemy = self._enemy
+        if engine.outcome == gameCombat.LOST:
+            self.monster = gamefunctions.random_monster(self.rng)
+            self._text.append(f'You respawned as a {self.monster["name"]}')
+        if enemy.data['health'] <= 0:
+            self.enemies.remove(enemy)
+            self.occupancy.remove(enemy)
+        if not self.enemies:
+            self.enemies = [Enemy(self.rng), Enemy(self.rng)]
+            self.occupancy.sync(self.enemies)
+        self._fight = None
+        self._enemy = None
+        self.mode = MAP
+        # Autosave after every fight, like the console game
+        self._request_save()
+        return self._respond(True)
+
+    def _sleep(self):
+        self.monster = self._say(gamefunctions.sleep, self.monster)
+        return self._respond(True)
+
+    def _shop(self):
+        self.shop = gameShop.Shop(rng=self.rng)
+        return self._respond(True, [f'{item["name"]}: ${item["price"]:.2f}' for item in self.shop.stock] +
+                             ['Type "buy ITEM QUANTITY" to buy.'])
+
+    def _buy(self, name, quantity='1'):
+        if self.shop is None:
+            self._shop()
+            self._text = []
+        item = self.shop.find(name)
+        if item is None:
+            return self._respond(False, [f'The shop has no {name}.'])
+        if not quantity.isdigit() or int(quantity) == 0:
+            return self._respond(False, ['Invalid input. Please enter a number.'])
+        receipt = self.shop.buy(self.monster, item['name'], int(quantity))
+        if not receipt.ok:
+            return self._respond(False, ['You do not have enough money to make this purchase.'])
+        return self._respond(True, [f'You purchased {receipt.lines[0].bought} {item["name"]}(s).'])
+
+    def _inventory(self):
+        inventory = self.monster['inventory']
+        if not inventory:
+            return self._respond(True, ['Your inventory is empty.'])
+        lines = []
+        for item in inventory.stacks():
+            count = inventory.count(item)
+            if item['type'] == 'weapon':
+                lines.append(f'{item["name"]} x{count} (Weapon) - Durability: {item["currentDurability"]}/{item["maxDurability"]}')
+            else:
+                lines.append(f'{item["name"]} x{count} ({item["type"].capitalize()})')
+        return self._respond(True, lines)
+
+    def _save(self):
+        self._request_save()
+        return self._respond(True)
+
+    def _status(self):
+        return self._respond(True, [f'Current HP: {self.monster["health"]}', f'Current Gold: {self.monster["money"]}'], state=self.state())
+
+    def _quit(self):
+        if self.monster is not None and self.mode != OVER:
+            self._request_save()
+        self.mode = OVER
+        return self._respond(True, ['Goodbye!'])
+
+    def _request_save(self):
+        # Plain data, so the server can write it on another thread while the session carries on
+        self.pendingSave = (self.slot, self.monster.to_dict(), self.username)
+
+class GameServer:
+    """
+    Serves a GameSession to every connection on a socket.
+
+    Attributes:
+        saves (gameSave.SaveManager): Where the sessions' slots are saved.
+        seed (str): Seeds every session's random generator, for repeatable load tests, or None.
+        worker (int): The number of this worker process, to keep session seeds apart.
+        sessions (int): The number of sessions started.
+        commands (int): The number of command lines handled.
+        active (int): The number of sessions connected now.
+    """
+    def __init__(self, saves, seed=None, worker=0):
+        self.saves = saves
+        self.seed = seed
+        self.worker = worker
+        self.sessions = 0
+        self.commands = 0
+        self.active = 0
+
+    async def start(self, host='127.0.0.1', port=8765, reusePort=False):
+        """
+        Starts listening. Returns the asyncio server; serve_forever on it keeps serving.
+        """
+        return await asyncio.start_server(self.handle_connection, host, port, reuse_port=reusePort or None)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Plays one session over a connection until the player quits or disconnects.
+        """
+        self.sessions += 1
+        self.active += 1
+        rng = None if self.seed is None else random.Random(f'{self.seed}:{self.worker}:{self.sessions}')
+        session = GameSession(self.sessions, self.saves, rng)
+        loop = asyncio.get_running_loop()
+        try:
+            await self._send(writer, session.greeting())
+            while session.mode != OVER:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.commands += 1
+                try:
+                    response = session.handle(line.decode('utf-8', 'replace'))
+                    if session.pendingSave is not None:
+                        slot, state, username = session.pendingSave
+                        session.pendingSave = None
+                        await loop.run_in_executor(None, self.saves.save, slot, state, username)
+                        response['text'].append('Game saved successfully.')
+                except Exception as error:
+                    # A damaged save or a data reload race fails the command, not the whole connection
+                    traceback.print_exc()
+                    session.pendingSave = None
+                    response = {'ok': False, 'mode': session.mode, 'text': [f'Something went wrong: {error}']}
+                await self._send(writer, response)
+        except ConnectionError:
+            pass
+        finally:
+            session.close()
+            self.active -= 1
+            writer.close()
+
+    @staticmethod
+    async def _send(writer, response):
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+async def _watch_data():
+    # Picks up edited species and items without a restart; sessions see them from their next lookup
+    while True:
+        await asyncio.sleep(RELOAD_INTERVAL)
+        try:
+            if gameData.pack.reload_if_changed():
+                print(f'Reloaded game data (generation {gameData.pack.generation})', flush=True)
+        except (OSError, ValueError, KeyError) as error:
+            print(f'Could not reload game data, keeping the old data: {error}', flush=True)
+
+async def _run_server(host, port, saveDir, seed, worker, reusePort, ready=None):
+    gamePacing.configure('instant')
+    server = GameServer(gameSave.SaveManager(saveDir), seed, worker)
+    listener = await server.start(host, port, reusePort)
+    if ready is not None:
+        ready.set()
+    watcher = asyncio.create_task(_watch_data())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        watcher.cancel()
+
+def _worker_main(host, port, saveDir, seed, worker, reusePort, ready):
+    try:
+        asyncio.run(_run_server(host, port, saveDir, seed, worker, reusePort, ready))
+    except KeyboardInterrupt:
+        pass
+
+def serve(host='127.0.0.1', port=8765, workers=1, saveDir=gameSave.DEFAULT_SAVE_DIR, seed=None):
+    """
+    Runs the server until it is interrupted.
+
+    Parameters:
+    host (str, optional): The address to listen on. Default is 127.0.0.1.
+    port (int, optional): The port to listen on. Default is 8765.
+    workers (int, optional): The number of processes sharing the port. Default is 1.
+    saveDir (str, optional): The folder for the save slots. Default is gameSave.DEFAULT_SAVE_DIR.
+    seed (str, optional): Seeds every session, for repeatable load tests.
+
+    Returns:
+    None
+    """
+    # Claims left behind by a server that did not shut down cleanly
+    gameSave.SaveManager(saveDir).release_all()
+    if workers <= 1:
+        _worker_main(host, port, saveDir, seed, 0, False, None)
+        return
+    processes = []
+    for worker in range(workers):
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(target=_worker_main, args=(host, port, saveDir, seed, worker, True, ready), daemon=True)
+        process.start()
+        ready.wait(10)
+        processes.append(process)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=1, help='processes sharing the port, one per core')
+    parser.add_argument('--saves', default=gameSave.DEFAULT_SAVE_DIR, help='folder for the save slots')
+    parser.add_argument('--seed', default=None, help='seed every session, for repeatable load tests')
+    args = parser.parse_args()
+    print(f'Serving on {args.host}:{args.port} with {args.workers} worker(s)', flush=True)
+    serve(args.host, args.port, args.workers, args.saves, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+Shop transactions without the interactive menu
+
+shop_menu asks the player what to buy one item at a time. This module is the shop underneath
+it, for the menu, the server and bots alike. A Shop holds the stock for one visit. Purchases
+go through a Cart that can hold several kinds of item, and checkout settles a cart in one step.
+
+Every line of a cart is priced with gamefunctions.purchase_item against the money left after
+the lines before it, so a line the player cannot fully afford is cut down to what they can pay
+for, exactly as in the menu. By default checkout is all or nothing: if any line is cut down,
+nothing is bought. With partial=True the cut-down lines are bought anyway. Either way the
+cart is worked out completely before the player is touched, so a checkout never leaves them
+half charged. Bought items are credited as stacks (see gameEntities.Inventory), so a checkout
+costs the same for one potion as for a million.
+
+Every checkout, bought or refused, is kept as a Receipt in the shop's transaction log.
+
+Classes:
+    - Cart: The kinds of item and quantities a player wants to buy.
+    - Shop: The stock for one visit to the shop, with checkout and a transaction log.
+    - Receipt: The outcome of one checkout.
+    - ReceiptLine: One line of a Receipt.
+
+Typical usage example:
+    shop = Shop()
+    cart = shop.cart().add('Potion', 3).add('Sword')
+    receipt = shop.checkout(monster, cart)
+    if not receipt.ok:
+        print('You do not have enough money to make this purchase.')
+"""
+import collections
+import random
+
+import gameEntities
+import gamefunctions
+
+# requested is what was asked for, bought what was (or would have been) paid for
+ReceiptLine = collections.namedtuple('ReceiptLine', ['name', 'price', 'requested', 'bought'])
+
+# ok is False when nothing was bought; moneyBefore and moneyAfter are the player's money around the checkout
+Receipt = collections.namedtuple('Receipt', ['number', 'ok', 'lines', 'total', 'moneyBefore', 'moneyAfter'])
+
+class Cart:
+    """
+    The kinds of item and quantities a player wants to buy from a Shop, in the order they were added.
+
+    Attributes:
+        shop (Shop): The shop the items come from.
+    """
+    __slots__ = ('shop', '_lines')
+
+    def __init__(self, shop):
+        self.shop = shop
+        self._lines = {}
+
+    def __len__(self):
+        return len(self._lines)
+
+    def __iter__(self):
+        # (item, quantity) pairs
+        for (item, name, price), quantity in self._lines.values():
+            yield item, quantity
+
+    def add(self, name, quantity=1):
+        """
+        Adds some of an item the shop sells. Adding the same item again adds to its quantity.
+
+        Arguments:
+            name (str): The item's name, in any case.
+            quantity (int, optional): How many to add. Default is 1.
+
+        Returns:
+            cart (Cart): This cart, so adds can be chained.
+
+        Raises:
+            KeyError: If the shop does not sell the item.
+            ValueError: If quantity is less than 1.
+        """
+        entry = self.shop._entry(name, quantity)
+        key = entry[1]
+        line = self._lines.get(key)
+        self._lines[key] = (entry, quantity if line is None else line[1] + quantity)
+        return self
+
+    def remove(self, name):
+        """
+        Takes an item out of the cart. Does nothing if it is not in the cart.
+        """
+        item = self.shop.find(name)
+        if item is not None:
+            self._lines.pop(item['name'], None)
+
+    def clear(self):
+        """
+        Empties the cart.
+        """
+        self._lines.clear()
+
+    def total(self):
+        """
+        Returns what the whole cart would cost.
+        """
+        return sum(entry[2] * quantity for entry, quantity in self._lines.values())
+
+class Shop:
+    """
+    The stock for one visit to the shop, with checkout and a transaction log.
+
+    Attributes:
+        stock (list): The items for sale, one of each kind. Bought items are copies of these.
+        log (collections.deque): The Receipt of every checkout, the newest last, up to history of them.
+        transactions (int): The number of checkouts that bought something.
+        unitsSold (int): The number of items sold.
+        revenue (int): The money taken.
+    """
+    def __init__(self, stock=None, rng=None, history=10000):
+        if stock is None:
+            stock = gameEntities.shop_stock(random if rng is None else rng)
+        self.stock = list(stock)
+        self.log = collections.deque(maxlen=history)
+        self.transactions = 0
+        self.unitsSold = 0
+        self.revenue = 0
+        # Lower case name -> (item, name, price), so checkout does not look up the same values on every purchase
+        self._byName = {item['name'].lower(): (item, item['name'], item['price']) for item in self.stock}
+        self._receipts = 0
+
+    def find(self, name):
+        """
+        Returns the item for sale with the given name, in any case, or None if the shop does not sell it.
+        """
+        entry = self._byName.get(name.lower())
+        return None if entry is None else entry[0]
+
+    def _entry(self, name, quantity):
+        # The (item, name, price) of an item for sale, checking the name and quantity like Cart.add
+        if quantity < 1:
+            raise ValueError(f'quantity must be at least 1, not {quantity}')
+        entry = self._byName.get(name.lower())
+        if entry is None:
+            raise KeyError(name)
+        return entry
+
+    def cart(self):
+        """
+        Returns a new, empty Cart for this shop.
+        """
+        return Cart(self)
+
+    def checkout(self, monster, cart, partial=False):
+        """
+        Settles a cart: takes the money and credits the items, or changes nothing.
+
+        Arguments:
+            monster (gameEntities.Monster): The player. Their money and inventory are updated.
+            cart (Cart): What to buy. The cart is left as it is.
+            partial (bool, optional): Buy what the player can afford when they cannot afford the whole cart. Default is False.
+
+        Returns:
+            receipt (Receipt): What was bought. Also added to the log.
+        """
+        return self._settle(monster, cart._lines.values(), partial)
+
+    def buy(self, monster, name, quantity=1):
+        """
+        Buys as many of one item as the player asks for, or as many as they can afford, like the shop menu.
+
+        Arguments:
+            monster (gameEntities.Monster): The player.
+            name (str): The item's name, in any case.
+            quantity (int, optional): How many to buy. Default is 1.
+
+        Returns:
+            receipt (Receipt): What was bought. ok is False if the player could not afford even one.
+
+        Raises:
+            KeyError: If the shop does not sell the item.
+            ValueError: If quantity is less than 1.
+        """
+        # A cart of one line, without making the Cart
+        return self._settle(monster, ((self._entry(name, quantity), quantity),), True)
+
+    def _settle(self, monster, order, partial):
+        # Prices every ((item, name, price), quantity) line of the order, then charges and credits the player or changes nothing
+        # tuple.__new__ skips the namedtuples' argument handling, which is a large part of a small checkout
+        moneyBefore = remaining = monster['money']
+        lines = []
+        complete = True
+        anything = False
+        for (item, name, price), quantity in order:
+            bought, remaining = gamefunctions.purchase_item(price, remaining, quantity)
+            lines.append(tuple.__new__(ReceiptLine, (name, price, quantity, bought)))
+            complete = complete and bought == quantity
+            anything = anything or bought > 0
+        self._receipts += 1
+        if not (anything and (complete or partial)):
+            receipt = tuple.__new__(Receipt, (self._receipts, False, tuple(lines), 0, moneyBefore, moneyBefore))
+        else:
+            monster['money'] = remaining
+            inventory = monster['inventory']
+            for ((item, name, price), quantity), line in zip(order, lines):
+                if line[3] > 0:
+                    inventory = gamefunctions.add_item_to_inventory(inventory, item.copy(), line[3])
+                    self.unitsSold += line[3]
+            # An Inventory is updated in place, so only a replaced one has to be stored
+            if inventory is not monster['inventory']:
+                monster['inventory'] = inventory
+            self.transactions += 1
+            self.revenue += moneyBefore - remaining
+            receipt = tuple.__new__(Receipt, (self._receipts, True, tuple(lines), moneyBefore - remaining, moneyBefore, remaining))
+        self.log.append(receipt)
+        return receipt
@@ -0,0 +1,225 @@
+"""
+Monte Carlo balance simulator for monsters and combat
+
+This module fights many random_monster draws against each other with the headless combat engine
+to see how the species ranges in random_monster play out. Matchups are split into chunks and
+run across a pool of worker processes. Every chunk has its own seed, so a run gives the same
+numbers no matter how many workers it uses. Chunk results are written to a CSV or JSON Lines
+file as they come in, and only the running totals are kept in memory.
+
+Functions:
+    - run_chunk: Runs one seeded chunk of matchups and returns its totals.
+    - simulate: Runs a whole simulation across a process pool and returns the report.
+    - print_report: Prints win rates, turns, gold flow and item usefulness.
+    - main: Command line entry point.
+
+Typical usage example:
+    python gameSimulate.py --matchups 1000000 --workers 8 --out results.csv
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+import gameCombat
+import gamefunctions
+
+# Items the player starts each matchup with, like a player who visited the shop once
+SWORD = {'name': 'Sword', 'type': 'weapon', 'price': 15, 'power': 10, 'maxDurability': 100, 'currentDurability': 100}
+POTION = {'name': 'Potion', 'type': 'consumable', 'price': 100}
+
+# Totals kept for every (strategy, player species, enemy species) group
+FIELDS = ['fights', 'won', 'lost', 'ran', 'unfinished', 'turns', 'gold']
+
+def _chunk_seed(seed, chunk):
+    return f'{seed}:{chunk}'
+
+def run_chunk(chunk, matchups, seed, strategies):
+    """
+    Runs one chunk of matchups. Every strategy fights the same pair of monsters, so the strategies can be compared directly.
+
+    Parameters:
+    chunk (int): The number of the chunk, used with seed to seed it.
+    matchups (int): The number of monster pairs to draw.
+    seed (int): The seed of the whole run.
+    strategies (list): Names from gameCombat.STRATEGIES.
+
+    Returns:
+    The chunk number and a dictionary mapping 'strategy,player,enemy' keys to lists of totals in FIELDS order.
+    """
+    # random_monster draws from the random module, so seed it for this chunk too
+    random.seed(_chunk_seed(seed, chunk))
+    rng = random.Random(_chunk_seed(seed, chunk))
+    totals = {}
+    for matchup in range(matchups):
+        player = gamefunctions.random_monster()
+        enemy = gamefunctions.random_monster()
+        for strategy in strategies:
+            fighter = dict(player, inventory=[dict(SWORD), POTION])
+            result = gameCombat.simulate_fight(fighter, dict(enemy), strategy, rng, record=False)
+            key = f'{strategy},{player["name"]},{enemy["name"]}'
+            row = totals.get(key)
+            if row is None:
+                row = totals[key] = [0] * len(FIELDS)
+            row[0] += 1
+            if result['outcome'] == gameCombat.WON:
+                row[1] += 1
+            elif result['outcome'] == gameCombat.LOST:
+                row[2] += 1
+            elif result['outcome'] == gameCombat.RAN:
+                row[3] += 1
+            else:
+                row[4] += 1
+            row[5] += result['turns']
+            row[6] += result['gold']
+    return chunk, totals
+
+class _ResultWriter:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.writer = None
+        if path is None:
+            return
+        self.file = open(path, 'w', newline='')
+        if path.endswith('.csv'):
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(['chunk', 'strategy', 'player', 'enemy'] + FIELDS)
+
+    def write(self, chunk, totals):
+        if self.file is None:
+            return
+        for key, row in sorted(totals.items()):
+            strategy, player, enemy = key.split(',')
+            if self.writer is not None:
+                self.writer.writerow([chunk, strategy, player, enemy] + row)
+            else:
+                record = dict(zip(FIELDS, row), chunk=chunk, strategy=strategy, player=player, enemy=enemy)
+                self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+def simulate(matchups, seed=0, workers=None, strategies=None, chunkSize=2000, out=None):
+    """
+    Runs a whole simulation across a pool of worker processes.
+
+    Parameters:
+    matchups (int): The number of monster pairs to draw.
+    seed (int, optional): The seed of the run. Default is 0.
+    workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+    strategies (list, optional): Names from gameCombat.STRATEGIES. Defaults to all of them.
+    chunkSize (int, optional): The number of matchups per chunk. Default is 2000.
+    out (str, optional): A .csv or .jsonl path the chunk results are streamed to.
+
+    Returns:
+    A dictionary mapping 'strategy,player,enemy' keys to totals in FIELDS order, sorted by key so runs with any number of workers come out the same.
+    """
+    strategies = list(gameCombat.STRATEGIES) if strategies is None else strategies
+    workers = workers or os.cpu_count() or 1
+    chunks = [(chunk, min(chunkSize, matchups - start)) for chunk, start in enumerate(range(0, matchups, chunkSize))]
+    totals = {}
+    writer = _ResultWriter(out)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            remaining = iter(chunks)
+            while True:
+                # Keep a few chunks per worker in flight instead of queueing the whole run
+                for chunk, size in remaining:
+                    pending.add(executor.submit(run_chunk, chunk, size, seed, strategies))
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    break
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    chunk, chunkTotals = future.result()
+                    writer.write(chunk, chunkTotals)
+                    for key, row in chunkTotals.items():
+                        total = totals.setdefault(key, [0] * len(FIELDS))
+                        for index, value in enumerate(row):
+                            total[index] += value
+    finally:
+        writer.close()
+    # Chunks finish in any order, so the keys were added in any order
+    return dict(sorted(totals.items()))
+
+def summarize(totals):
+    """
+    Adds up the totals by strategy and by player species.
+
+    Parameters:
+    totals (dict): The result of simulate.
+
+    Returns:
+    A dictionary mapping each strategy to a dictionary of species (and 'all') to totals in FIELDS order.
+    """
+    summary = {}
+    for key, row in totals.items():
+        strategy, player, enemy = key.split(',')
+        bySpecies = summary.setdefault(strategy, {})
+        for group in ('all', player):
+            total = bySpecies.setdefault(group, [0] * len(FIELDS))
+            for index, value in enumerate(row):
+                total[index] += value
+    return summary
+
+def print_report(totals):
+    """
+    Prints the win rate, average turns and average gold per fight for every strategy and player species, and how much the sword and potion add over plain attacks.
+
+    Parameters:
+    totals (dict): The result of simulate.
+
+    Returns:
+    None, but prints the report.
+    """
+    summary = summarize(totals)
+    print(f'{"strategy":<8} {"player":<8} {"fights":>9} {"win %":>6} {"lose %":>7} {"turns":>6} {"gold":>8}')
+    for strategy, bySpecies in summary.items():
+        for species, row in sorted(bySpecies.items()):
+            fights = row[0] or 1
+            print(f'{strategy:<8} {species:<8} {row[0]:>9} {100 * row[1] / fights:>6.1f} {100 * row[2] / fights:>7.1f} '
+                  f'{row[5] / fights:>6.2f} {row[6] / fights:>8.1f}')
+    if 'attack' in summary:
+        baseline = summary['attack']['all']
+        for strategy, item in (('weapon', 'Sword'), ('potion', 'Potion')):
+            if strategy in summary:
+                row = summary[strategy]['all']
+                gain = 100 * (row[1] / (row[0] or 1) - baseline[1] / (baseline[0] or 1))
+                print(f'{item} usefulness: {gain:+.1f} win % over plain attacks')
+
+def main(argv=None):
+    """
+    Command line entry point for the balance simulator.
+    """
+    parser = argparse.ArgumentParser(description='Monte Carlo balance simulator for monsters and combat.')
+    parser.add_argument('--matchups', type=int, default=100000, help='number of monster pairs to draw')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=2000)
+    parser.add_argument('--strategy', action='append', choices=list(gameCombat.STRATEGIES), help='strategy to test (repeatable, default: all)')
+    parser.add_argument('--out', help='stream chunk results to this .csv or .jsonl file')
+    parser.add_argument('--json', action='store_true', help='print the totals as JSON instead of a table')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    totals = simulate(args.matchups, args.seed, args.workers, args.strategy, args.chunk_size, args.out)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        json.dump(summarize(totals), sys.stdout, indent=4, sort_keys=True)
+        print()
+    else:
+        print_report(totals)
+    fights = sum(row[0] for row in totals.values())
+    print(f'{fights} fights in {elapsed:.2f}s ({fights / elapsed:.0f} fights/s)', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Grid occupancy index for the game map
+
+This module keeps track of which entities stand on which cell of the map, so finding the
+monster the player ran into, checking whether a cell is free and looking at the cells around
+a position do not need to scan every monster.
+
+Classes:
+    - OccupancyGrid: Maps each cell to the set of entities standing on it.
+
+Typical usage example:
+    occupancy = OccupancyGrid()
+    occupancy.add(monster, monster.position)
+    occupancy.move(monster, [3, 4])
+    enemies = occupancy.at([3, 4])
+"""
+
+# Key used for the player in the occupancy grid
+PLAYER = 'player'
+
+class OccupancyGrid:
+    """
+    Maps each (x, y) cell to the set of entities standing on it.
+
+    Entities can be anything hashable. Every entity is in at most one cell; adding it again
+    moves it.
+
+    Attributes:
+        cells (dict): Maps each occupied (x, y) cell to the set of entities on it.
+    """
+    def __init__(self):
+        self.cells = {}
+        self._where = {}
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, entity):
+        return entity in self._where
+
+    def add(self, entity, position):
+        """
+        Places an entity on the given cell, moving it if it is already on the grid.
+
+        Arguments:
+            entity: The entity to place.
+            position (list): The cell [x, y] to place it on.
+
+        Returns:
+            None
+        """
+        cell = (position[0], position[1])
+        old = self._where.get(entity)
+        if old == cell:
+            return
+        if old is not None:
+            self._discard(entity, old)
+        self._where[entity] = cell
+        occupants = self.cells.get(cell)
+        if occupants is None:
+            self.cells[cell] = {entity}
+        else:
+            occupants.add(entity)
+
+    # Moving is the same as adding again
+    move = add
+
+    def remove(self, entity):
+        """
+        Takes an entity off the grid. Does nothing if it is not on the grid.
+
+        Arguments:
+            entity: The entity to remove.
+
+        Returns:
+            None
+        """
+        cell = self._where.pop(entity, None)
+        if cell is not None:
+            self._discard(entity, cell)
+
+    def cell_of(self, entity):
+        """
+        Returns the cell an entity is on, or None if it is not on the grid.
+        """
+        return self._where.get(entity)
+
+    def at(self, position):
+        """
+        Returns the entities on a cell.
+
+        Arguments:
+            position (list): The cell [x, y] to look at.
+
+        Returns:
+            occupants (frozenset): The entities on the cell, empty if there are none.
+        """
+        occupants = self.cells.get((position[0], position[1]))
+        return frozenset(occupants) if occupants else frozenset()
+
+    def is_occupied(self, position, ignore=()):
+        """
+        Checks whether any entity other than the ignored ones stands on a cell.
+
+        Arguments:
+            position (list): The cell [x, y] to check.
+            ignore (iterable, optional): Entities that do not count as occupying the cell.
+
+        Returns:
+            occupied (bool): True if the cell holds an entity that is not ignored.
+        """
+        occupants = self.cells.get((position[0], position[1]))
+        if not occupants:
+            return False
+        return any(entity not in ignore for entity in occupants)
+
+    def neighbors(self, position, radius=1):
+        """
+        Returns the entities within a square of cells around a position, not counting the cell itself.
+
+        Arguments:
+            position (list): The center cell [x, y].
+            radius (int, optional): How many cells to look in each direction. Default is 1.
+
+        Returns:
+            found (list): (cell, entity) pairs for every entity near the position.
+        """
+        found = []
+        x, y = position[0], position[1]
+        for dx in range(-radius, radius + 1):
+            for dy in range(-radius, radius + 1):
+                if dx == 0 and dy == 0:
+                    continue
+                occupants = self.cells.get((x + dx, y + dy))
+                if occupants:
+                    found.extend(((x + dx, y + dy), entity) for entity in occupants)
+        return found
+
+    def sync(self, entities):
+        """
+        Makes the grid hold exactly the given positioned entities (and the player), adding new ones and dropping ones that are gone.
+
+        Arguments:
+            entities (list): Objects with a position attribute, such as WanderingMonster objects.
+
+        Returns:
+            None
+        """
+        keep = set()
+        for entity in entities:
+            keep.add(entity)
+            self.add(entity, entity.position)
+        for entity in [entity for entity in self._where if entity not in keep and entity != PLAYER]:
+            self.remove(entity)
+
+    def clear(self):
+        """
+        Removes every entity from the grid.
+        """
+        self.cells.clear()
+        self._where.clear()
+
+    def _discard(self, entity, cell):
+        occupants = self.cells[cell]
+        occupants.discard(entity)
+        if not occupants:
+            del self.cells[cell]
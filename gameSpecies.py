@@ -0,0 +1,124 @@
+"""
+Monster species table and batched monster generation
+
+This module exposes the monster species (name, description, the ranges for health, power and
+money, how many cells a second the species wanders and whether it chases the player). The
+table is defined in data/species.json and read from the compiled pack in gameData, so SPECIES
+and SPECIES_BY_NAME follow the pack when it is reloaded; look them up through the module
+rather than keeping a reference. random_monster picks from this table, and random_monsters
+draws the stats for many monsters at once with NumPy.
+
+Functions:
+    - load_species: Reads a species definition file into a tuple of Species records.
+    - random_monsters: Draw the stats of many monsters in one vectorized pass.
+
+Classes:
+    - Species: One row of the species table.
+    - MonsterBatch: The stats of many monsters as NumPy arrays.
+
+Typical usage example:
+    batch = random_monsters(1000, rng=42)
+    for monster in batch:
+        print(monster.name, monster.health)
+"""
+import collections
+
+import gameData
+
+SPECIES_FILE = gameData.SPECIES_FILE
+
+# Each stat range is an inclusive (low, high) pair, like the arguments to random.randint. moveRate is in moves a second.
+Species = gameData.Species
+
+# A single monster drawn by random_monsters
+MonsterRecord = collections.namedtuple('MonsterRecord', ['name', 'description', 'health', 'power', 'money'])
+
+def load_species(path=SPECIES_FILE):
+    """
+    Reads a species definition file, without going through the pack.
+
+    Arguments:
+        path (str, optional): The JSON file to read. Defaults to data/species.json.
+
+    Returns:
+        species (tuple): A Species record for each entry, in file order.
+    """
+    return gameData.read_species(path)
+
+# A sequence of Species records in file order, and a mapping from name to record
+SPECIES = gameData.pack.species
+SPECIES_BY_NAME = gameData.pack.speciesByName
+
+def _reload(data):
+    global SPECIES, SPECIES_BY_NAME
+    SPECIES = data.species
+    SPECIES_BY_NAME = data.speciesByName
+
+gameData.pack.on_reload(_reload)
+
+class MonsterBatch:
+    """
+    The stats of many monsters, one NumPy array per stat.
+
+    Names and descriptions are not copied per monster; species holds an index into the
+    species table the batch was drawn from.
+
+    Attributes:
+        table (sequence): The Species records the batch was drawn from.
+        species (numpy.ndarray): The index into table of every monster.
+        health, power, money (numpy.ndarray): The stats of every monster.
+    """
+    __slots__ = ('table', 'species', 'health', 'power', 'money')
+
+    def __init__(self, table, species, health, power, money):
+        self.table = table
+        self.species = species
+        self.health = health
+        self.power = power
+        self.money = money
+
+    def __len__(self):
+        return len(self.species)
+
+    def __getitem__(self, index):
+        species = self.table[self.species[index]]
+        return MonsterRecord(species.name, species.description, int(self.health[index]), int(self.power[index]), int(self.money[index]))
+
+    def __iter__(self):
+        for index in range(len(self.species)):
+            yield self[index]
+
+    def to_dict(self, index):
+        """
+        Returns one monster as a dictionary shaped like the result of random_monster, with its own empty inventory.
+        """
+        return dict(self[index]._asdict(), inventory=[])
+
+def random_monsters(count, rng=None, table=None):
+    """
+    Draws the species and stats of many monsters in one vectorized pass.
+
+    Every species is equally likely, and each stat is drawn uniformly from the species' inclusive range, like random_monster does.
+
+    Arguments:
+        count (int): The number of monsters to draw.
+        rng (numpy.random.Generator or int, optional): The generator to draw from, or a seed for a new one.
+        table (sequence, optional): The Species records to draw from. Defaults to SPECIES.
+
+    Returns:
+        batch (MonsterBatch): The drawn monsters.
+    """
+    # NumPy is only needed for batches, so plain random_monster calls do not pay for importing it
+    import numpy as np
+
+    if table is None:
+        table = SPECIES
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+    species = rng.integers(0, len(table), size=count).astype(np.int16)
+    stats = []
+    for field in ('health', 'power', 'money'):
+        low = np.array([getattr(entry, field)[0] for entry in table], dtype=np.int32)
+        high = np.array([getattr(entry, field)[1] for entry in table], dtype=np.int32)
+        stats.append(rng.integers(low[species], high[species], endpoint=True, dtype=np.int32))
+    return MonsterBatch(table, species, *stats)
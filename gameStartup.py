@@ -0,0 +1,150 @@
+"""
+Lazy imports and cold start measurement
+
+Importing pygame takes most of the game's start-up time: it loads SDL and NumPy and prints a
+banner. The console parts of the game (the menus, loading a save, the gamefunctions self-test,
+console mode and the server) never draw, so they should not pay for it. Modules that draw get
+pygame from lazy_import instead of a plain import. The name is bound straight away, but pygame
+is only really imported the first time one of its attributes is used, which is when the window
+opens.
+
+startup_report keeps the cold start tracked. It starts fresh interpreters with Python's
+-X importtime, the same way the game is started, and reports how long each way in takes, the
+slowest imports and whether pygame was loaded.
+
+Functions:
+    - lazy_import: Bind a module now and import it on first use.
+    - import_profile: Time a command's imports in fresh interpreters.
+    - startup_report: Print the cold start times of the game's ways in.
+
+Typical usage example:
+    pygame = lazy_import('pygame')
+    python game.py --startup-bench
+"""
+import importlib.util
+import os
+import sys
+import time
+
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The ways into the game that startup_report times: (label, arguments to python, what to type)
+ENTRIES = [
+    ('import gamefunctions', ['-c', 'import gamefunctions'], ''),
+    ('import game', ['-c', 'import game'], ''),
+    ('console session', [os.path.join(GAME_DIR, 'game.py'), '--console'], '1\nBench\nq\n'),
+    ('window opened', ['-c', 'import gameGraphics; gameGraphics.renderer.open(); gameGraphics.renderer.close()'], ''),
+]
+
+# A module pygame imports while it loads, so its import-time line shows pygame was really imported and not just bound lazily
+PYGAME_MARKER = 'pygame.base'
+
+def lazy_import(name):
+    """
+    Returns a module that is imported the first time one of its attributes is used.
+
+    Arguments:
+        name (str): The module's name, such as 'pygame'.
+
+    Returns:
+        module (module): The module, or the real module if it has already been imported.
+
+    Raises:
+        ModuleNotFoundError: If the module is not installed.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+def import_profile(arguments, stdin='', runs=5):
+    """
+    Runs python with -X importtime in fresh interpreters and collects the import times.
+
+    The runs use SDL's dummy video driver, instant pacing and a temporary working folder, so no window opens, nothing waits and no saves are left behind.
+
+    Parameters:
+    arguments (list): The arguments to python after -X importtime, such as ['-c', 'import game'].
+    stdin (str, optional): What to type into the program.
+    runs (int, optional): The number of fresh interpreters to start. Default is 5.
+
+    Returns:
+    profile (dict): 'wall' (the median run time in seconds), 'imports' (the median total import time in seconds),
+    'modules' (each module's median (self, cumulative) import time in seconds) and 'pygame' (whether pygame was imported).
+
+    Example:
+    profile = import_profile(['-c', 'import game'])
+    print(profile['wall'], profile['pygame'])
+    """
+    # Only needed for measuring, so lazy_import stays cheap to import
+    import statistics
+    import subprocess
+    import tempfile
+
+    environment = dict(os.environ, SDL_VIDEODRIVER='dummy', GAME_PACING='instant', PYTHONPATH=GAME_DIR)
+    walls = []
+    totals = []
+    modules = {}
+    pygame = False
+    with tempfile.TemporaryDirectory() as folder:
+        for run in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, '-X', 'importtime'] + arguments, input=stdin, capture_output=True, text=True,
+                                    cwd=folder, env=environment)
+            walls.append(time.perf_counter() - start)
+            if result.returncode != 0:
+                raise RuntimeError(f'{" ".join(arguments)} failed:\n{result.stderr[-2000:]}')
+            total = 0
+            for line in result.stderr.splitlines():
+                if not line.startswith('import time:') or 'imported package' in line:
+                    continue
+                selfTime, cumulative, name = line[len('import time:'):].split('|')
+                # Nested imports are indented under the module that imported them
+                depth = len(name) - len(name.lstrip()) - 1
+                name = name.strip()
+                modules.setdefault(name, []).append((int(selfTime) / 1e6, int(cumulative) / 1e6))
+                if depth == 0:
+                    total += int(cumulative) / 1e6
+                pygame = pygame or name == PYGAME_MARKER
+            totals.append(total)
+    return {
+        'wall': statistics.median(walls),
+        'imports': statistics.median(totals),
+        'modules': {name: (statistics.median(sample[0] for sample in samples), statistics.median(sample[1] for sample in samples))
+                    for name, samples in modules.items()},
+        'pygame': pygame,
+    }
+
+def startup_report(runs=5, top=10, detail='import game'):
+    """
+    Prints how long each way into the game takes from a cold interpreter, and the slowest imports of one of them.
+
+    Parameters:
+    runs (int, optional): Fresh interpreters per way in; the median is shown. Default is 5.
+    top (int, optional): The number of slowest imports to list. Default is 10.
+    detail (str, optional): The way in to list the slowest imports of. Default is 'import game'.
+
+    Returns:
+    profiles (dict): The import_profile of each way in, by label.
+    """
+    profiles = {}
+    print(f'Cold start, median of {runs} fresh interpreters')
+    print(f'{"way in":<22} {"total ms":>9} {"imports ms":>11} {"pygame":>7}')
+    for label, arguments, stdin in ENTRIES:
+        profile = profiles[label] = import_profile(arguments, stdin, runs)
+        print(f'{label:<22} {profile["wall"] * 1000:>9.1f} {profile["imports"] * 1000:>11.1f} {"yes" if profile["pygame"] else "no":>7}')
+    print()
+    print(f'Slowest imports for {detail}')
+    print(f'{"cumulative ms":>14} {"self ms":>8}  module')
+    modules = profiles[detail]['modules']
+    for name, (selfTime, cumulative) in sorted(modules.items(), key=lambda entry: -entry[1][1])[:top]:
+        print(f'{cumulative * 1000:>14.1f} {selfTime * 1000:>8.1f}  {name}')
+    return profiles
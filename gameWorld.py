@@ -0,0 +1,509 @@
+"""
+A large world map split into chunks and streamed around the player
+
+The original map is a single gridSize by gridSize board that fits the window. This module
+lets the map be far larger than the window. The world is split into square chunks; a chunk,
+its rock and its monsters are only made (by gameWorldGen, from the world seed) when the
+camera comes near it, and at most maxChunks chunks are kept in memory, the least recently
+used ones being dropped first. Dropped chunks are made again the same way when the player
+comes back; only the monsters the player killed or hurt are remembered. The window shows a gridSize by gridSize camera view that follows
+the player, and only the monsters in the chunks around the camera move, so the cost of a
+frame depends on the view and not on the size of the world.
+
+The streamed world is opt in: the game plays the single board unless it is started with
+python game.py --world SIZE (or python gameWorld.py), which calls install before the game starts.
+
+Classes:
+    - WorldMonster: A monster at a cell of the world.
+    - Camera: The part of the world shown in the window.
+    - World: The chunks, their monsters and the occupancy grid for the resident part of the world.
+    - WorldRenderer: A gameGraphics.GameRenderer that plays the map in a World.
+
+Functions:
+    - install: Make gameGraphics.main play the map in a world.
+    - main: Command line entry point that plays the game in a large world.
+
+Typical usage example:
+    world = World(10000, 10000, maxChunks=64, seed=1)
+    install(world)
+    asyncio.run(gameLoop.GameLoop().run(game.game))
+"""
+import argparse
+import collections
+import concurrent.futures
+import random
+
+import gameEntities
+import gameGraphics
+import gamePath
+import gameProfile
+import gameSpatial
+import gameSpecies
+import gameStartup
+import gameWorldGen
+
+pygame = gameStartup.lazy_import('pygame')
+
+# The moves a wandering monster picks from: left, right, up, down
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+class WorldMonster:
+    """
+    A monster at a cell of the world. Like gameGraphics.WanderingMonster, it has a position and the monster's data.
+
+    Attributes:
+        home (tuple): The chunk the monster was made in and its number among the chunk's spawns.
+        original (tuple): The health, power and money it was made with, to tell whether the player hurt it.
+    """
+    __slots__ = ('position', 'data', 'home', 'original')
+
+    def __init__(self, position, data, home=None, original=None):
+        self.position = list(position)
+        self.data = data
+        self.home = home
+        self.original = original
+
+class Camera:
+    """
+    The part of the world shown in the window, kept centred on the player where the edges of the world allow.
+
+    Attributes:
+        width, height (int): The size of the view in cells.
+        origin (tuple): The world cell shown in the top left corner of the window.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.origin = (0, 0)
+
+    def follow(self, position, worldWidth, worldHeight):
+        """
+        Moves the view so the given position is in the middle of it, without showing anything past the edge of the world.
+
+        Returns:
+            moved (bool): Whether the view moved.
+        """
+        x = min(max(position[0] - self.width // 2, 0), max(worldWidth - self.width, 0))
+        y = min(max(position[1] - self.height // 2, 0), max(worldHeight - self.height, 0))
+        moved = (x, y) != self.origin
+        self.origin = (x, y)
+        return moved
+
+    def contains(self, position):
+        """
+        Returns whether a world cell is in the view.
+        """
+        return 0 <= position[0] - self.origin[0] < self.width and 0 <= position[1] - self.origin[1] < self.height
+
+class _Chunk:
+    __slots__ = ('key', 'terrain', 'monsters', 'bounds')
+
+    def __init__(self, key, terrain, monsters, bounds):
+        self.key = key
+        self.terrain = terrain
+        self.monsters = monsters
+        self.bounds = bounds
+
+class World:
+    """
+    A width by height world split into chunkSize by chunkSize chunks, streamed in around the camera.
+
+    Chunks are made by gameWorldGen from the world seed, so a chunk that is dropped can be made
+    again exactly as it was. The only things kept for chunks that are not in memory are the
+    player's changes to them: which of their monsters were killed or hurt. Monsters wander
+    inside the chunk they were made in. With workers above zero, the chunks just past the active
+    ones are made ahead of time in a process pool.
+
+    Attributes:
+        width, height (int): The size of the world in cells.
+        seed (int): The world seed.
+        chunkSize (int): The width and height of a chunk in cells.
+        maxChunks (int): The most chunks kept in memory at once.
+        density (int): The average number of monsters in a new chunk.
+        start (list): Where the player starts, in the middle of the world.
+        occupancy (gameSpatial.OccupancyGrid): Which cell the player and every resident monster is on.
+        active (list): The monsters in the chunks around the camera, which move and can be met. Updated in place.
+        generated, evicted (int): How many chunks were made and dropped.
+    """
+    def __init__(self, width, height, chunkSize=16, maxChunks=64, density=2, seed=None, workers=0):
+        self.width = width
+        self.height = height
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.chunkSize = chunkSize
+        self.maxChunks = maxChunks
+        self.density = density
+        self.start = [width // 2, height // 2]
+        self.occupancy = gameSpatial.OccupancyGrid()
+        self.active = []
+        self.generated = 0
+        self.evicted = 0
+        self._chunks = collections.OrderedDict()
+        self._diffs = {}
+        self._activeKeys = frozenset()
+        self._pool = concurrent.futures.ProcessPoolExecutor(workers) if workers > 0 else None
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def chunk_key(self, position):
+        """
+        Returns the (x, y) in chunks of the chunk a cell is in.
+        """
+        return (position[0] // self.chunkSize, position[1] // self.chunkSize)
+
+    def chunk_bounds(self, key):
+        """
+        Returns the left, top, right and bottom cells of a chunk, with right and bottom just past the chunk.
+        """
+        left = key[0] * self.chunkSize
+        top = key[1] * self.chunkSize
+        return left, top, min(left + self.chunkSize, self.width), min(top + self.chunkSize, self.height)
+
+    def in_bounds(self, position):
+        """
+        Returns whether a cell is inside the world.
+        """
+        return 0 <= position[0] < self.width and 0 <= position[1] < self.height
+
+    def terrain_at(self, position):
+        """
+        Returns the terrain of a cell (gameWorldGen.GRASS or gameWorldGen.ROCK), bringing its chunk into memory if needed.
+        """
+        key = self.chunk_key(position)
+        chunk = self._chunks.get(key) or self._load(key)
+        return chunk.terrain[(position[1] - key[1] * self.chunkSize) * self.chunkSize + position[0] - key[0] * self.chunkSize]
+
+    def is_blocked(self, position):
+        """
+        Returns whether a cell is outside the world or rock.
+        """
+        return not self.in_bounds(position) or self.terrain_at(position) == gameWorldGen.ROCK
+
+    def rocks_in(self, left, top, width, height):
+        """
+        Lists the rock cells in a rectangle of the world, bringing its chunks into memory if needed.
+
+        Arguments:
+            left, top (int): The top left cell of the rectangle.
+            width, height (int): The size of the rectangle in cells.
+
+        Returns:
+            rocks (list): The (x, y) of every rock cell.
+        """
+        size = self.chunkSize
+        right = min(left + width, self.width)
+        bottom = min(top + height, self.height)
+        rocks = []
+        for chunkY in range(top // size, (bottom - 1) // size + 1):
+            for chunkX in range(left // size, (right - 1) // size + 1):
+                key = (chunkX, chunkY)
+                terrain = (self._chunks.get(key) or self._load(key)).terrain
+                startX = max(left, chunkX * size)
+                endX = min(right, chunkX * size + size)
+                for y in range(max(top, chunkY * size), min(bottom, chunkY * size + size)):
+                    # Position of cell (0, y) in the chunk's terrain, so x + offset is cell (x, y)
+                    offset = (y - chunkY * size) * size - chunkX * size
+                    index = terrain.find(gameWorldGen.ROCK, startX + offset, endX + offset)
+                    while index != -1:
+                        rocks.append((index - offset, y))
+                        index = terrain.find(gameWorldGen.ROCK, index + 1, endX + offset)
+        return rocks
+
+    def chunk(self, key):
+        """
+        Returns the monsters of a chunk, making the chunk if it is not in memory.
+
+        Arguments:
+            key (tuple): The chunk's (x, y) in chunks.
+
+        Returns:
+            monsters (list): The chunk's WorldMonster objects.
+        """
+        chunk = self._chunks.get(key)
+        if chunk is not None:
+            self._chunks.move_to_end(key)
+            return chunk.monsters
+        return self._load(key).monsters
+
+    def _load(self, key):
+        pending = self._pending.pop(key, None)
+        with gameProfile.span('world.generate'):
+            if pending is not None:
+                data = pending.result()
+            else:
+                data = gameWorldGen.generate_chunk(self.seed, key, self.chunkSize, self.width, self.height, self.density, tuple(self.start))
+        self.generated += 1
+        changes = self._diffs.get(key, {})
+        species = gameSpecies.SPECIES
+        monsters = []
+        for number, spawn in enumerate(data.spawns):
+            change = changes.get(number, False)
+            if change is None:
+                # Killed by the player
+                continue
+            if change:
+                monsterData = gameEntities.Monster.from_dict(change)
+            else:
+                kind = species[spawn.species]
+                monsterData = gameEntities.Monster(kind.name, kind.description, spawn.health, spawn.power, spawn.money)
+            monster = WorldMonster((spawn.x, spawn.y), monsterData, (key, number), (spawn.health, spawn.power, spawn.money))
+            self.occupancy.add(monster, monster.position)
+            monsters.append(monster)
+        chunk = _Chunk(key, data.terrain, monsters, self.chunk_bounds(key))
+        self._chunks[key] = chunk
+        self._evict()
+        return chunk
+
+    def _evict(self):
+        while len(self._chunks) > self.maxChunks:
+            for key in self._chunks:
+                # The oldest chunk the camera is not using
+                if key not in self._activeKeys:
+                    break
+            else:
+                return
+            chunk = self._chunks.pop(key)
+            for monster in chunk.monsters:
+                self.occupancy.remove(monster)
+                data = monster.data
+                if (data['health'], data['power'], data['money']) != monster.original:
+                    # Hurt in a fight the player ran away from
+                    self._diffs.setdefault(key, {})[monster.home[1]] = data.to_dict()
+            self.evicted += 1
+
+    def update(self, camera, margin=1):
+        """
+        Brings in the chunks the camera can see plus a margin of chunks around them, and updates the active monsters.
+
+        Arguments:
+            camera (Camera): The view to stream around.
+            margin (int, optional): How many chunks past the view are kept active. Default is 1.
+
+        Returns:
+            None
+        """
+        keys = self._keys_around(camera, margin)
+        activeKeys = frozenset(keys)
+        if activeKeys == self._activeKeys:
+            return
+        with gameProfile.span('world.stream'):
+            # Mark the new chunks active first, so loading them never drops one of them
+            self._activeKeys = activeKeys
+            active = []
+            for key in keys:
+                active.extend(self.chunk(key))
+            self.active[:] = active
+            if self._pool is not None:
+                self.prefetch(self._keys_around(camera, margin + 1))
+
+    def _keys_around(self, camera, margin):
+        left, top = self.chunk_key(camera.origin)
+        right, bottom = self.chunk_key((camera.origin[0] + camera.width - 1, camera.origin[1] + camera.height - 1))
+        lastX = (self.width - 1) // self.chunkSize
+        lastY = (self.height - 1) // self.chunkSize
+        return tuple((x, y) for x in range(max(left - margin, 0), min(right + margin, lastX) + 1)
+                     for y in range(max(top - margin, 0), min(bottom + margin, lastY) + 1))
+
+    def prefetch(self, keys):
+        """
+        Starts making the given chunks in the process pool, so they are ready when the camera reaches them.
+
+        Arguments:
+            keys (list): The (x, y) of the chunks to make. Chunks already in memory or being made are skipped.
+
+        Returns:
+            started (int): The number of chunks sent to the pool.
+        """
+        if self._pool is None:
+            return 0
+        started = 0
+        for key in keys:
+            if key not in self._chunks and key not in self._pending:
+                self._pending[key] = self._pool.submit(gameWorldGen.generate_chunk, self.seed, key, self.chunkSize,
+                                                       self.width, self.height, self.density, tuple(self.start))
+                started += 1
+        # Forget chunks the camera turned away from before they were needed
+        if len(self._pending) > self.maxChunks:
+            for key in [key for key in self._pending if key not in keys]:
+                self._pending.pop(key).cancel()
+        return started
+
+    def move_monster(self, monster, blocking=False, paths=None):
+        """
+        Moves a monster one cell in a random direction, or towards the player for a hostile monster close to them. Monsters stay inside the chunk they were made in and off rock.
+
+        Arguments:
+            monster (WorldMonster): The monster to move.
+            blocking (bool, optional): If True, the monster stays put instead of stepping onto a cell another monster is on.
+            paths (gamePath.DistanceField, optional): Distances to the player, for hostile monsters to follow.
+
+        Returns:
+            None
+        """
+        position = monster.position
+        target = None
+        if paths is not None and gameSpecies.SPECIES_BY_NAME[monster.data['name']].hostile:
+            target = paths.next_step(position)
+        if target is None:
+            step = random.choice(DIRECTIONS)
+            target = (position[0] + step[0], position[1] + step[1])
+        chunk = self._chunks[monster.home[0]]
+        left, top, right, bottom = chunk.bounds
+        if not (left <= target[0] < right and top <= target[1] < bottom):
+            return
+        if chunk.terrain[(target[1] - top) * self.chunkSize + target[0] - left] == gameWorldGen.ROCK:
+            return
+        if blocking and self.occupancy.is_occupied(target, ignore=(monster, gameSpatial.PLAYER)):
+            return
+        self.occupancy.move(monster, target)
+        position[0], position[1] = target
+
+    def remove_dead(self):
+        """
+        Drops the monsters that were killed from the active chunks and remembers that they are gone.
+
+        Returns:
+            removed (int): The number of monsters dropped.
+        """
+        removed = 0
+        for key in self._activeKeys:
+            chunk = self._chunks[key]
+            alive = []
+            for monster in chunk.monsters:
+                if monster.data['health'] > 0:
+                    alive.append(monster)
+                    continue
+                if monster in self.occupancy:
+                    self.occupancy.remove(monster)
+                self._diffs.setdefault(key, {})[monster.home[1]] = None
+                removed += 1
+            chunk.monsters = alive
+        if removed:
+            self.active[:] = [monster for key in self._activeKeys for monster in self._chunks[key].monsters]
+        return removed
+
+    def stats(self):
+        """
+        Returns how many chunks are in memory, have player changes, were made and were dropped, and how many monsters are active.
+        """
+        return {'resident': len(self._chunks), 'changed': len(self._diffs), 'generated': self.generated,
+                'evicted': self.evicted, 'active': len(self.active)}
+
+    def close(self):
+        """
+        Stops the process pool, if there is one.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._pending.clear()
+
+class WorldRenderer(gameGraphics.GameRenderer):
+    """
+    A GameRenderer that plays the map in a World, showing a camera view that follows the player.
+
+    The monsters passed to run are ignored; the world's active monsters are played instead, and
+    monsters killed in a fight are dropped from the world the next time the map is entered.
+
+    Attributes:
+        world (World): The world being played.
+        camera (Camera): The part of the world shown in the window.
+    """
+    def __init__(self, world, **kwargs):
+        super().__init__(**kwargs)
+        self.world = world
+        self.camera = Camera(gameGraphics.gridSize, gameGraphics.gridSize)
+        self.occupancy = world.occupancy
+        if self.paths is not None:
+            self.paths = gamePath.DistanceField(world.width, world.height, radius=gameGraphics.chaseRadius, obstacles=world.rocks_in)
+        self._placed = False
+        self._rocks = None
+        # How far each arrow key moves the player; made here so importing the module does not import pygame
+        self._steps = {pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1)}
+
+    def enter_map(self, monsters):
+        if not self._placed:
+            self.position[:] = self.world.start
+            self._placed = True
+        self.world.remove_dead()
+        self.follow()
+        self.occupancy.move(gameSpatial.PLAYER, self.position)
+        if self.paths is not None:
+            self.paths.set_target(self.position)
+        return self.world.active
+
+    def follow(self):
+        """
+        Moves the camera to the player and streams the chunks around it.
+        """
+        if self.camera.follow(self.position, self.world.width, self.world.height) or self._rocks is None:
+            self.world.update(self.camera)
+            originX, originY = self.camera.origin
+            # The rock in view only changes when the camera moves
+            self._rocks = [(x - originX, y - originY) for x, y in self.world.rocks_in(originX, originY, self.camera.width, self.camera.height)]
+
+    def move_player(self, key):
+        step = self._steps[key]
+        target = [self.position[0] + step[0], self.position[1] + step[1]]
+        if not self.world.is_blocked(target):
+            self.position[:] = target
+            self.occupancy.move(gameSpatial.PLAYER, self.position)
+            if self.paths is not None:
+                self.paths.set_target(self.position)
+            self.follow()
+
+    def move_monster(self, monster):
+        self.world.move_monster(monster, gameGraphics.blockOccupiedCells, self.paths)
+
+    def cell_contents(self, monsters):
+        originX, originY = self.camera.origin
+        cells = {cell: ('rock',) for cell in self._rocks}
+        cells[(self.position[0] - originX, self.position[1] - originY)] = ('player',)
+        contains = self.camera.contains
+        for monster in monsters:
+            if contains(monster.position):
+                cell = (monster.position[0] - originX, monster.position[1] - originY)
+                cells[cell] = cells.get(cell, ()) + ('monster',)
+        return cells
+
+def install(world, **kwargs):
+    """
+    Makes gameGraphics.main (and a gameLoop.GameLoop made afterwards) play the map in the given world.
+
+    Arguments:
+        world (World): The world to play in.
+        **kwargs: Passed on to WorldRenderer, such as fps.
+
+    Returns:
+        renderer (WorldRenderer): The renderer now used by gameGraphics.
+    """
+    gameGraphics.renderer = WorldRenderer(world, **kwargs)
+    return gameGraphics.renderer
+
+def main(argv=None):
+    """
+    Plays the game in a large world.
+    """
+    import asyncio
+    import game
+    import gameLoop
+
+    parser = argparse.ArgumentParser(description='Play the game in a large streamed world.')
+    parser.add_argument('--size', type=int, default=1000, help='width and height of the world in cells')
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--max-chunks', type=int, default=64)
+    parser.add_argument('--density', type=int, default=2, help='average monsters per chunk')
+    parser.add_argument('--seed', type=int, help='world seed; the same seed always gives the same world')
+    parser.add_argument('--workers', type=int, default=0, help='processes that make chunks ahead of the camera')
+    args = parser.parse_args(argv)
+
+    world = World(args.size, args.size, args.chunk_size, args.max_chunks, args.density, args.seed, args.workers)
+    install(world)
+    try:
+        asyncio.run(gameLoop.GameLoop().run(game.game))
+    finally:
+        world.close()
+
+if __name__ == '__main__':
+    main()
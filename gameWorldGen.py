@@ -0,0 +1,109 @@
+"""
+Deterministic generation of world chunks
+
+Every chunk of a gameWorld.World is made from the world seed and the chunk's coordinates
+alone, so the same seed always gives the same world and a chunk can be thrown away and made
+again at any time instead of being stored. Each chunk gets its own random.Random seeded with
+"seed:x:y", which draws the chunk's terrain (grass or rock) and its monsters, picked from the
+gameSpecies table the same way as gamefunctions.random_monster.
+
+Chunks are returned as plain tuples, so they can be made in worker processes; generate_chunks
+makes many chunks at once, across a process pool when workers is above zero. This module does
+not import pygame, so the workers stay light.
+
+Functions:
+    - chunk_rng: The random generator for one chunk of a world.
+    - generate_chunk: Make the terrain and monster spawns of one chunk.
+    - generate_chunks: Make many chunks, optionally across a process pool.
+
+Typical usage example:
+    chunk = generate_chunk(seed=1, key=(3, 4), chunkSize=16, width=10000, height=10000)
+    print(chunk.terrain[0], len(chunk.spawns))
+    chunks = generate_chunks(1, [(x, 0) for x in range(100)], 16, 10000, 10000, workers=4)
+"""
+import collections
+import concurrent.futures
+import functools
+import random
+
+import gameSpecies
+
+# Terrain kinds, one byte per cell
+GRASS = 0
+ROCK = 1
+
+# The chance that a cell is rock
+ROCK_CHANCE = 0.08
+
+# A chunk's terrain (bytes, row by row) and the monsters that start in it
+ChunkData = collections.namedtuple('ChunkData', ['key', 'terrain', 'spawns'])
+
+# A monster that starts in a chunk; species is an index into gameSpecies.SPECIES
+Spawn = collections.namedtuple('Spawn', ['x', 'y', 'species', 'health', 'power', 'money'])
+
+def chunk_rng(seed, key):
+    """
+    Returns the random generator for one chunk of a world. The same seed and key always give the same numbers, in any process.
+    """
+    return random.Random(f'{seed}:{key[0]}:{key[1]}')
+
+def generate_chunk(seed, key, chunkSize, width, height, density=2, clear=None):
+    """
+    Makes the terrain and monster spawns of one chunk.
+
+    Arguments:
+        seed (int): The world seed.
+        key (tuple): The chunk's (x, y) in chunks.
+        chunkSize (int): The width and height of a chunk in cells.
+        width, height (int): The size of the world in cells. Chunks on the far edges are cut short.
+        density (int, optional): The average number of monsters in a chunk. Default is 2.
+        clear (tuple, optional): A cell that is always grass and never has a monster, such as where the player starts.
+
+    Returns:
+        chunk (ChunkData): The chunk's terrain and spawns.
+    """
+    rng = chunk_rng(seed, key)
+    left = key[0] * chunkSize
+    top = key[1] * chunkSize
+    right = min(left + chunkSize, width)
+    bottom = min(top + chunkSize, height)
+    terrain = bytearray(chunkSize * chunkSize)
+    openCells = []
+    chance = rng.random
+    for y in range(top, bottom):
+        row = (y - top) * chunkSize - left
+        for x in range(left, right):
+            if chance() < ROCK_CHANCE and (x, y) != clear:
+                terrain[row + x] = ROCK
+            elif (x, y) != clear:
+                openCells.append((x, y))
+    spawns = []
+    species = gameSpecies.SPECIES
+    for cell in rng.sample(openCells, min(len(openCells), rng.randint(0, 2 * density))):
+        # The same draws as gamefunctions.random_monster, from this chunk's generator
+        index = rng.randrange(len(species))
+        kind = species[index]
+        spawns.append(Spawn(cell[0], cell[1], index, rng.randint(*kind.health), rng.randint(*kind.power), rng.randint(*kind.money)))
+    return ChunkData(key, bytes(terrain), tuple(spawns))
+
+def generate_chunks(seed, keys, chunkSize, width, height, density=2, clear=None, workers=0):
+    """
+    Makes many chunks, optionally across a process pool.
+
+    Arguments:
+        seed (int): The world seed.
+        keys (list): The (x, y) of every chunk to make.
+        chunkSize, width, height, density, clear: As for generate_chunk.
+        workers (int, optional): How many worker processes to use. Default is 0, which makes the chunks in this process.
+
+    Returns:
+        chunks (list): A ChunkData for every key, in the same order.
+    """
+    make = functools.partial(_generate_key, seed, chunkSize, width, height, density, clear)
+    if workers <= 0:
+        return [make(key) for key in keys]
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(make, keys, chunksize=max(1, len(keys) // (workers * 4))))
+
+def _generate_key(seed, chunkSize, width, height, density, clear, key):
+    return generate_chunk(seed, key, chunkSize, width, height, density, clear)
@@ -2,11 +2,14 @@
 
 This module provides several functions to support the adventure game. These functions include purchasing items, generating random monsters, and printing welcome messages and shop menus.
 
+Everything the module shows and asks goes through gameScreen, so it reaches whichever sink is configured. The menus, the shop, the inventory and fights build each screen in a gameScreen.Screen and write it in one go instead of printing line by line.
+
 Functions:
   - purchase_item: Purchase as many items as possible with the starting money, given the item price and quantity to purchase.
   - random_monster: Generate a random monster with a name, description, health, power, and money.
   - print_welcome: Print a centered welcome message using the provided name and width.
   - print_shop_menu: Print a formatted shop menu using the provided item names and prices.
+  - fight_monster: Ask the player for moves in a fight and print what happens (rules in gameCombat).
 
 Typical usage example:
 
@@ -17,54 +20,92 @@ Typical usage example:
 """
 
 # Import the random module for the random_monster function
+import functools
 import random
-import time
-import math
-import json
-import os
 
-def save_game(monster, username):
+import gameCombat
+import gameEntities
+import gameProfile
+import gameSave
+import gameSaveFormat
+import gameScreen
+import gameSpecies
+
+# Save slots for this game, in the saves folder
+saves = gameSave.SaveManager()
+
+# Menus that never change, rendered once (see gameScreen)
+PREGAME_MENU = gameScreen.frame('Welcome to the adventure game!', '', '1) Start New Game', '2) Load Saved Game', '')
+USER_MENU = gameScreen.frame('', '1) Sleep (5 Gold, restores 10 HP)', '2) Visit Shop', '3) View Inventory', '', '4) Save Game', '5) Quit', '',
+                             '0) Return to Game')
+FIGHT_MENU = gameScreen.frame('1) Attack', '2) Run', '3) Use Weapon', '4) Use Consumable')
+
+@gameProfile.profiled('save_game')
+def save_game(monster, username, slot=None):
     """
-    Save the game state to a JSON file for use in future game sessions.
+    Save the game state to a save slot for use in future game sessions.
 
     Parameters:
     monster (dict): The dictionary containing the monster's information
     username (str): The name of the user playing the game
+    slot (str, optional): The name of the save slot. Defaults to the username.
 
     Returns:
     None
     """
-    filename = 'game_save_data.json'
-    game_data = {
-        'username': username,
-        'monster': monster
-    }
-    with open(filename, 'w') as file:
-        json.dump(game_data, file, indent=4)
-        file.flush()
-    print('Game saved successfully.')
-
-def load_game():
+    saves.save(slot or username, monster, username)
+    gameScreen.show('Game saved successfully.')
+
+def _describe_slot(slot):
+    # One line for the list of saves; a slot whose snapshot is missing or damaged still gets a line
+    label = slot
+    if slot.endswith(gameSave.AUTOSAVE_SUFFIX):
+        label = f'{slot[:-len(gameSave.AUTOSAVE_SUFFIX)]} (autosave)'
+    try:
+        summary = saves.summary(slot)
+    except gameSaveFormat.SaveFormatError:
+        summary = None
+    if summary is None:
+        return f'{label} - details unavailable'
+    return f'{label} - {summary["name"]}, {summary["health"]} HP, {summary["money"]} Gold'
+
+def load_game(slot=None):
     """
-    Load the game state from a JSON file.
+    Load the game state from a save slot. If no slot is given and there are several, the player picks one; autosave slots are marked as such. A save from before save slots existed is moved into a slot first. A damaged save is reported to the player instead of loaded.
 
     Parameters:
-    username (str): The name of the user playing the game
+    slot (str, optional): The name of the save slot to load.
 
     Returns:
     The dictionary containing the monster's information and username if the game was loaded successfully, otherwise None
     """
-    filename = 'game_save_data.json'
-    if os.path.exists(filename):
-        with open(filename, 'r') as file:
-            game_data = json.load(file)
-            monster = game_data['monster']
-            username = game_data['username']
-            print('Game loaded successfully.')
-            time.sleep(1)
-            return monster, username
-    else:
+    slots = saves.slots()
+    if not slots:
+        legacySlot = saves.import_legacy()
+        if legacySlot is not None:
+            slots = [legacySlot]
+    if slot is None:
+        if not slots:
+            return None, None
+        slot = slots[0]
+        if len(slots) > 1:
+            with gameScreen.Screen() as screen:
+                screen.line('Saved games:')
+                for index, name in enumerate(slots):
+                    screen.line(f'{index + 1}) {_describe_slot(name)}')
+                choice = screen.ask('Enter the number of the save to load: ')
+            if not choice.isdigit() or not 1 <= int(choice) <= len(slots):
+                return None, None
+            slot = slots[int(choice) - 1]
+    try:
+        monster, username = saves.load(slot)
+    except gameSaveFormat.SaveFormatError as error:
+        gameScreen.show(f'Could not load the save "{slot}": {error}.')
+        return None, None
+    if monster is None:
         return None, None
+    gameScreen.show('Game loaded successfully.')
+    return monster, username
 
 def pregame_menu():
     """
@@ -76,12 +117,9 @@ def pregame_menu():
     Returns:
     The user's choice for starting a new game or loading a saved game
     """
-    print('Welcome to the adventure game!')
-    print()
-    print('1) Start New Game')
-    print('2) Load Saved Game')
-    print()
-    choice = input('Enter your choice: ')
+    with gameScreen.Screen() as screen:
+        screen.add(PREGAME_MENU)
+        choice = screen.ask('Enter your choice: ')
     return choice
 
 # Define purchase_item function
@@ -110,63 +148,54 @@ def purchase_item(itemPrice, startingMoney, quantityToPurchase=1):
         remainingMoney = startingMoney - (itemPrice * quantityToPurchase)
     return quantityPurchased, remainingMoney
 
-def add_item_to_inventory(inventory, item):
+def add_item_to_inventory(inventory, item, count=1):
     """
-    Add an item to the inventory list.
+    Add an item to the inventory.
 
     Parameters:
-    inventory (list): The dictionary of items in the inventory.
-    item (dict): The item to add to the inventory.
+    inventory (gameEntities.Inventory or list): The items in the inventory.
+    item (gameEntities.Item): The item to add to the inventory.
+    count (int, optional): How many of the item to add. An Inventory stacks them, so this does not depend on the count. Default is 1.
 
     Returns:
-    The updated inventory list with the new item added.
+    The updated inventory with the new item added.
 
     Example:
     monster["inventory"] = add_item_to_inventory(inventory, item)
     """
-    inventory.append(item)
+    if isinstance(inventory, gameEntities.Inventory):
+        inventory.add(item, count)
+    else:
+        for number in range(count):
+            inventory.append(item.copy() if number else item)
     return inventory
 
 # Define random_monster function
-def random_monster():
+def random_monster(rng=None):
     """
     Generate a random monster with a name, description, health, power, and money.
 
+    The species and their stat ranges come from the table in gameSpecies (data/species.json). Use gameSpecies.random_monsters to draw many monsters at once.
+
     Parameters:
-    None
+    rng (random.Random, optional): The generator to draw from, for repeatable monsters. Defaults to the random module.
 
     Returns:
-    A dictionary containing the monster's name, description, health, power, and money, as well as base inventory.
+    A gameEntities.Monster with the monster's name, description, health, power, and money, as well as base inventory. It can be read and written like a dictionary.
 
     Example:
     monster = random_monster()
     """
-    # Create a list of monster names and descriptions
-    names = ['Goblin', 'Dragon', 'Ogre', 'Troll']
-    descriptions = ['This is a lone goblin. When it notices you, it rushes at you quickly with a sharp dagger drawn.', 'This is a mighty dragon. It soars above you, casting a shadow over the land before unleashing a torrent of flames.', 'This is a fearsome ogre. It lumbers towards you, its massive club swinging menacingly.', 'This is a menacing troll. It grunts and growls, brandishing a large, jagged rock.']
-    # Randomly select a monster based by name in the list
-    name = random.choice(names)
-    # match the description based on the randomly selected name above
-    description = descriptions[names.index(name)]
-    # Randomly generate health, power, and money values based on the monster name with a range of acceptable values
-    if name == 'Goblin':
-        health = random.randint(10, 30)
-        power = random.randint(5, 15)
-        money = random.randint(1, 50)
-    elif name == 'Dragon':
-        health = random.randint(50, 100)
-        power = random.randint(70, 80)
-        money = random.randint(100, 1000)
-    elif name == 'Ogre':
-        health = random.randint(30, 60)
-        power = random.randint(45, 60)
-        money = random.randint(50, 200)
-    elif name == 'Troll':
-        health = random.randint(20, 50)
-        power = random.randint(15, 30)
-        money = random.randint(20, 100)
+    if rng is None:
+        rng = random
+    # Randomly select a species from the table
+    species = rng.choice(gameSpecies.SPECIES)
+    # Randomly generate health, power, and money values within the species' range of acceptable values
+    health = rng.randint(*species.health)
+    power = rng.randint(*species.power)
+    money = rng.randint(*species.money)
     # define the dictionary to return later
-    myMonster = {'name': name,'description': description, 'health': health, 'power': power, 'money': money, 'inventory': []}
+    myMonster = gameEntities.Monster(species.name, species.description, health, power, money)
     return myMonster
 
 # Define print_welcome function
@@ -185,7 +214,7 @@ def print_welcome(name, width=20):
     print_welcome('Cameron')
     """
     string_to_print = f'Hello, {name}!'
-    print(f'{string_to_print:^{width}}')
+    gameScreen.show(f'{string_to_print:^{width}}')
 
 # Define shop_menu function
 def print_shop_menu(item1Name, item1Price, item2Name, item2Price):
@@ -201,73 +230,77 @@ def print_shop_menu(item1Name, item1Price, item2Name, item2Price):
     Returns:
     None, but prints the shop menu.
     """
-    price1 = f'${item1Price:.2f}'
-    price2 = f'${item2Price:.2f}'
-    print('/----------------------\\')
-    print(f'| {item1Name:<12}{price1:>8} |')
-    print(f'| {item2Name:<12}{price2:>8} |')
-    print('\\----------------------/')
-
+    with gameScreen.Screen() as screen:
+        screen.add(_shop_box(((item1Name, item1Price), (item2Name, item2Price)), False))
+
+@functools.lru_cache(maxsize=256)
+def _shop_box(rows, numbered):
+    # The boxed price list for the given (name, price) rows, rendered once for every different stock
+    lines = ['/----------------------\\']
+    for number, (name, price) in enumerate(rows):
+        price = f'${price:.2f}'
+        if numbered:
+            lines.append(f'| {number + 1}) {name:<9}{price:>8} |')
+        else:
+            lines.append(f'| {name:<12}{price:>8} |')
+    lines.append('\\----------------------/')
+    if numbered:
+        lines.append('0) Exit Shop')
+    return gameScreen.frame(*lines)
 
 
 def shop_menu(monster):
-    items = [
-        {'name': 'Sword', 'type': 'weapon', 'price': 15, 'power': 10, 'maxDurability': 100, 'currentDurability': random.randint(30, 100)},
-        {'name': 'Potion', 'type': 'consumable', 'price': 100},
-    ]
-    while True:
-        print('/----------------------\\')
-        for itemid, item in enumerate(items):
-            price = f'${item["price"]:.2f}'
-            print(f'| {itemid + 1}) {item["name"]:<9}{price:>8} |')
-        print('\\----------------------/')
-        print('0) Exit Shop')
-
-        choice = input('Enter the number of the item you want to purchase (or 0 to exit shop): ')
-
-        while not choice.isdigit() or int(choice) < 1 or int(choice) > len(items):
-            if choice == '0':
-                print('Exiting shop...')
-                time.sleep(1)
-                print()
-                print()
-                return monster
-            print('Invalid choice, please try again.')
-            choice = input('Enter the number of the item you want to purchase (or 0 to exit shop): ')
-
-        choice = int(choice) - 1
-        if choice >= 0 and choice < len(items):
-            item = items[choice]
-            quantity = input(f'How many {item["name"]}s would you like to purchase? (or 0 to exit shop): ')
-            if quantity.isdigit():
-                if int(quantity) == 0:
-                    print('Exiting shop...')
-                    print()
-                    time.sleep(1)
+    # gameShop is built on purchase_item and add_item_to_inventory, so it can only be imported once this module has loaded
+    import gameShop
+
+    shop = gameShop.Shop()
+    items = shop.stock
+    box = _shop_box(tuple((item['name'], item['price']) for item in items), True)
+    with gameScreen.Screen() as screen:
+        while True:
+            screen.add(box)
+
+            choice = screen.ask('Enter the number of the item you want to purchase (or 0 to exit shop): ')
+
+            while not choice.isdigit() or int(choice) < 1 or int(choice) > len(items):
+                if choice == '0':
+                    screen.line('Exiting shop...')
+                    screen.pause(1)
+                    screen.line()
+                    screen.line()
                     return monster
-                quantity = int(quantity)
-                quantityPurchased, remainingMoney = purchase_item(item['price'], monster['money'], quantity)
-                if quantityPurchased > 0:
-                    print('Purchasing...')
-                    time.sleep(2)
-                    monster['money'] = remainingMoney
-                    for number in range(quantityPurchased):
-                        monster['inventory'] = add_item_to_inventory(monster['inventory'], item.copy())
-                    print(f'You purchased {quantityPurchased} {item["name"]}(s).')
-                    print()
-                    time.sleep(1)
+                screen.line('Invalid choice, please try again.')
+                choice = screen.ask('Enter the number of the item you want to purchase (or 0 to exit shop): ')
+
+            choice = int(choice) - 1
+            if choice >= 0 and choice < len(items):
+                item = items[choice]
+                quantity = screen.ask(f'How many {item["name"]}s would you like to purchase? (or 0 to exit shop): ')
+                if quantity.isdigit():
+                    if int(quantity) == 0:
+                        screen.line('Exiting shop...')
+                        screen.line()
+                        screen.pause(1)
+                        return monster
+                    receipt = shop.buy(monster, item['name'], int(quantity))
+                    if receipt.ok:
+                        screen.line('Purchasing...')
+                        screen.pause(2)
+                        screen.line(f'You purchased {receipt.lines[0].bought} {item["name"]}(s).')
+                        screen.line()
+                        screen.pause(1)
+                    else:
+                        screen.line('You do not have enough money to make this purchase.')
+                        screen.pause(1)
+                        screen.line()
+                        screen.line('Exiting shop...')
+                        screen.line()
+                        screen.pause(1)
                 else:
-                    print('You do not have enough money to make this purchase.')
-                    time.sleep(1)
-                    print()
-                    print('Exiting shop...')
-                    print()
-                    time.sleep(1)
+                    screen.line('Invalid input. Please enter a number.')
             else:
-                print('Invalid input. Please enter a number.')
-        else:
-            print('Invalid choice. Please try again.')
-        return monster
+                screen.line('Invalid choice. Please try again.')
+            return monster
 
 def print_user_menu(username, monster):
     """
@@ -280,144 +313,141 @@ def print_user_menu(username, monster):
     Returns:
     The user's choice for the game
     """
-    print(f'Current HP: {monster["health"]}')
-    print(f'Current Gold: {monster["money"]}')
-    print(f'{username}, what would you like to do?')
-    print()
-    print('1) Sleep (5 Gold, restores 10 HP)')
-    print('2) Visit Shop')
-    print('3) View Inventory')
-    print()
-    print('4) Save Game')
-    print('5) Quit')
-    print()
-    print('0) Return to Game')
-    option = input('Enter your choice: ')
+    with gameScreen.Screen() as screen:
+        screen.line(f'Current HP: {monster["health"]}')
+        screen.line(f'Current Gold: {monster["money"]}')
+        screen.line(f'{username}, what would you like to do?')
+        screen.add(USER_MENU)
+        option = screen.ask('Enter your choice: ')
     return option
 
+@gameProfile.profiled('fight_monster')
 def fight_monster(monster, enemymonster):
     """
     Fight the monster in the game. The player's health and money will be updated based on the outcome of the fight.
 
+    The combat rules live in gameCombat.CombatEngine; this function asks the player for each move and prints what happened.
+
     Parameters:
     monster (dict): The dictionary containing the monster's health and power
+    enemymonster (dict): The dictionary containing the enemy monster's health and power
 
     Returns:
     The updated monster dictionary after the fight
     """
     enemy_monster = enemymonster
-    print()
-    print(f'A {enemy_monster["name"]} appears!')
-    print(f'{enemy_monster["description"]}')
-    print()
-    print(f'Your HP: {monster["health"]}')
-    print(f'Enemy HP: {enemy_monster["health"]}')
-    print()
-    weapon_used = False
-
-    while monster["health"] > 0 and enemy_monster["health"] > 0:
-        print('1) Attack')
-        print('2) Run')
-        print('3) Use Weapon')
-        print('4) Use Consumable')
-        choice = input('What\'s your next move: ')
-        if choice == '1':
-            base_damage = monster["power"]
-            if weapon_used:
-                base_damage += 20
-                print('You swing your sword with increased power!')
-                weapon_used = False
-                damage_enemy = math.floor(base_damage * random.uniform(0.8, 1.2))
-            else:
-                damage_enemy = math.floor(base_damage * random.uniform(0.3, 0.8))
-            print(f'You attack the enemy for {damage_enemy} damage!')
-            enemy_monster["health"] -= damage_enemy
-            if enemy_monster["health"] <= 0:
-                enemy_monster["health"] = 0
-            print(f'Enemy HP: {enemy_monster["health"]}')
-            time.sleep(1)
-            if enemy_monster["health"] > 0:
-                damage = math.floor(enemy_monster["power"] * random.random())
-                print(f'The enemy attacks you for {damage} damage!')
-                time.sleep(1)
-                monster["health"] -= damage
-                if monster["health"] <= 0:
-                    monster["health"] = 0
-                print()
-                print(f'Your HP: {monster["health"]}')
-                print(f'Enemy HP: {enemy_monster["health"]}')
-                print()
-        elif choice == '2':
-            print('You run away!')
-            print('You dropped some gold while running away.')
-            monster["money"] -= random.randint(1, 10)
-            if monster["money"] < 0:
-                monster["money"] = 0
-            return monster, enemy_monster
-        elif choice == '3':
-            weapons = [item for item in monster["inventory"] if item["type"] == "weapon"]
-            if weapons:
-                print('Choose a weapon to use:')
-                for idx, weapon in enumerate(weapons):
-                    print(f'{idx + 1}) {weapon["name"]} (Durability: {weapon["currentDurability"]}/{weapon["maxDurability"]})')
-                weapon_choice = input('Enter the number of the weapon you want to use: ')
-                if weapon_choice.isdigit() and 1 <= int(weapon_choice) <= len(weapons):
-                    weapon = weapons[int(weapon_choice) - 1]
-                    print(f'You wield the {weapon["name"]} to increase your attack damage!')
-                    weapon_used = True
-                    weapon['currentDurability'] -= 10
-                    if weapon['currentDurability'] <= 0:
-                        print()
-                        print(f'Your {weapon["name"]} will break after your next move!')
-                        print()
-                        monster["inventory"].remove(weapon)
+    with gameScreen.Screen() as screen:
+        screen.line()
+        screen.line(f'A {enemy_monster["name"]} appears!')
+        screen.line(f'{enemy_monster["description"]}')
+        screen.line()
+        screen.line(f'Your HP: {monster["health"]}')
+        screen.line(f'Enemy HP: {enemy_monster["health"]}')
+        screen.line()
+        engine = gameCombat.CombatEngine(monster, enemy_monster)
+        print_combat_events(engine.check_end(), screen)
+
+        while engine.outcome is None:
+            screen.add(FIGHT_MENU)
+            choice = screen.ask('What\'s your next move: ')
+            if choice == '1':
+                print_combat_events(engine.attack(), screen)
+            elif choice == '2':
+                print_combat_events(engine.run(), screen)
+                return monster, enemy_monster
+            elif choice == '3':
+                weapons = engine.weapons()
+                if weapons:
+                    screen.line('Choose a weapon to use:')
+                    for idx, weapon in enumerate(weapons):
+                        screen.line(f'{idx + 1}) {weapon["name"]}{_count_suffix(monster["inventory"], weapon)} (Durability: {weapon["currentDurability"]}/{weapon["maxDurability"]})')
+                    weapon_choice = screen.ask('Enter the number of the weapon you want to use: ')
+                    if weapon_choice.isdigit() and 1 <= int(weapon_choice) <= len(weapons):
+                        print_combat_events(engine.use_weapon(weapons[int(weapon_choice) - 1]), screen)
                     else:
-                        print(f'New Durability of {weapon["name"]}: {weapon["currentDurability"]}/{weapon["maxDurability"]}')
+                        screen.line('Invalid choice.')
                 else:
-                    print('Invalid choice.')
-            else:
-                print('You have no weapon to use.')
-        elif choice == '4':
-            consumables = [item for item in monster["inventory"] if item["type"] == "consumable"]
-            if consumables:
-                print('Choose a consumable to use:')
-                for idx, consumable in enumerate(consumables):
-                    print(f'{idx + 1}) {consumable["name"]}')
-                consumable_choice = input('Enter the number of the consumable you want to use: ')
-                if consumable_choice.isdigit() and 1 <= int(consumable_choice) <= len(consumables):
-                    if consumables[int(consumable_choice) - 1]["name"] == "Potion":
-                        print('You used a Potion!')
-                        print('This grants you the ability to defeat your enemy in one strike!')
-                        print()
-                        print('You attack the enemy for full damage!')
-                        print()
-                        time.sleep(1)
-                        enemy_monster["health"] = 0
-                        monster["inventory"].remove(consumables[int(consumable_choice) - 1])
+                    screen.line('You have no weapon to use.')
+            elif choice == '4':
+                consumables = engine.consumables()
+                if consumables:
+                    screen.line('Choose a consumable to use:')
+                    for idx, consumable in enumerate(consumables):
+                        screen.line(f'{idx + 1}) {consumable["name"]}{_count_suffix(monster["inventory"], consumable)}')
+                    consumable_choice = screen.ask('Enter the number of the consumable you want to use: ')
+                    if consumable_choice.isdigit() and 1 <= int(consumable_choice) <= len(consumables):
+                        print_combat_events(engine.use_consumable(consumables[int(consumable_choice) - 1]), screen)
                     else:
-                        print('This has not been implemented yet.')
-                        # TODO: Implement other consumables as needed in future
+                        screen.line('Invalid choice.')
                 else:
-                    print('Invalid choice.')
-            else:
-                print('You have no consumable to use.')
-
-    if monster["health"] <= 0:
-        print('You were defeated!')
-        monster["money"] = monster["money"] // 2
-        print('Respawning as a new monster...')
-        time.sleep(2)
-        monster = random_monster()
-        print(f'You respawned as a {monster["name"]}')
-    elif enemy_monster["health"] <= 0:
-        time.sleep(1)
-        print()
-        print(f'You defeated the {enemy_monster["name"]}!')
-        print('You gain some gold.')
-        time.sleep(1)
-        monster["money"] += enemy_monster["money"]
+                    screen.line('You have no consumable to use.')
+
+        if engine.outcome == gameCombat.LOST:
+            monster = random_monster()
+            screen.line(f'You respawned as a {monster["name"]}')
     return monster, enemy_monster
 
+def print_combat_events(events, screen=None):
+    """
+    Print the messages for the events returned by a gameCombat.CombatEngine move.
+
+    Parameters:
+    events (list): The event dictionaries to print, in order
+    screen (gameScreen.Screen, optional): The screen to add the messages to. By default they are written when the function returns.
+
+    Returns:
+    None, but prints the messages
+    """
+    if screen is None:
+        with gameScreen.Screen() as screen:
+            print_combat_events(events, screen)
+        return
+    for event in events:
+        if event['type'] == 'attack':
+            if event['boosted']:
+                screen.line('You swing your sword with increased power!')
+            screen.line(f'You attack the enemy for {event["damage"]} damage!')
+            screen.line(f'Enemy HP: {event["enemyHealth"]}')
+            screen.pause(1)
+        elif event['type'] == 'enemy_attack':
+            screen.line(f'The enemy attacks you for {event["damage"]} damage!')
+            screen.pause(1)
+            screen.line()
+            screen.line(f'Your HP: {event["playerHealth"]}')
+            screen.line(f'Enemy HP: {event["enemyHealth"]}')
+            screen.line()
+        elif event['type'] == 'ran':
+            screen.line('You run away!')
+            screen.line('You dropped some gold while running away.')
+        elif event['type'] == 'weapon':
+            weapon = event['weapon']
+            screen.line(f'You wield the {weapon["name"]} to increase your attack damage!')
+            if event['broken']:
+                screen.line()
+                screen.line(f'Your {weapon["name"]} will break after your next move!')
+                screen.line()
+            else:
+                screen.line(f'New Durability of {weapon["name"]}: {weapon["currentDurability"]}/{weapon["maxDurability"]}')
+        elif event['type'] == 'potion':
+            screen.line('You used a Potion!')
+            screen.line('This grants you the ability to defeat your enemy in one strike!')
+            screen.line()
+            screen.line('You attack the enemy for full damage!')
+            screen.line()
+            screen.pause(1)
+        elif event['type'] == 'unusable':
+            screen.line('This has not been implemented yet.')
+        elif event['type'] == 'defeat':
+            screen.line('You were defeated!')
+            screen.line('Respawning as a new monster...')
+            screen.pause(2)
+        elif event['type'] == 'victory':
+            screen.pause(1)
+            screen.line()
+            screen.line(f'You defeated the {event["enemy"]}!')
+            screen.line('You gain some gold.')
+            screen.pause(1)
+
 def sleep(monster):
     """
     Sleep in the game to restore health. The player's health and money will be updated based on the outcome of sleeping.
@@ -428,15 +458,24 @@ def sleep(monster):
     Returns:
     The updated monster dictionary after sleeping
     """
-    if monster["money"] >= 5:
-        print('You sleep and gain 10 HP.')
-        monster["health"] += 10
-        monster["money"] -= 5
-        time.sleep(1)
-    else:
-        print('You do not have enough gold to sleep.')
+    with gameScreen.Screen() as screen:
+        if monster["money"] >= 5:
+            screen.line('You sleep and gain 10 HP.')
+            monster["health"] += 10
+            monster["money"] -= 5
+            screen.pause(1)
+        else:
+            screen.line('You do not have enough gold to sleep.')
     return monster
 
+def _count_suffix(inventory, item):
+    # Stacks of more than one item are shown as 'Potion x3'
+    if isinstance(inventory, gameEntities.Inventory):
+        count = inventory.count(item)
+        if count > 1:
+            return f' x{count}'
+    return ''
+
 def view_inventory(monster):
     """
     View the inventory of the monster in the game.
@@ -447,19 +486,23 @@ def view_inventory(monster):
     Returns:
     None, but prints the items in the monster's inventory
     """
-    print('Inventory:')
-    if monster["inventory"]:
-        for item in monster["inventory"]:
-            if item["type"] == "weapon":
-                # TODO: Add other weapon types as needed in future, similar to consumables
-                print(f'{item["name"]} (Weapon) - Durability: {item["currentDurability"]}/{item["maxDurability"]} - Adds extra damage to attacks')
-            elif item["type"] == "consumable":
-                if item["name"] == "Potion":
-                    print(f'{item["name"]} (Consumable) - Defeat your enemy_monster in one strike.')
-    else:
-        print('Your inventory is empty.')
-    print('Press any key to continue...')
-    input()
+    with gameScreen.Screen() as screen:
+        screen.line('Inventory:')
+        inventory = monster["inventory"]
+        if inventory:
+            items = inventory.stacks() if isinstance(inventory, gameEntities.Inventory) else inventory
+            for item in items:
+                count = _count_suffix(inventory, item)
+                if item["type"] == "weapon":
+                    # TODO: Add other weapon types as needed in future, similar to consumables
+                    screen.line(f'{item["name"]}{count} (Weapon) - Durability: {item["currentDurability"]}/{item["maxDurability"]} - Adds extra damage to attacks')
+                elif item["type"] == "consumable":
+                    if item["name"] == "Potion":
+                        screen.line(f'{item["name"]}{count} (Consumable) - Defeat your enemy_monster in one strike.')
+        else:
+            screen.line('Your inventory is empty.')
+        screen.line('Press any key to continue...')
+        screen.ask()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,119 @@
+"""
+Tests for the AI scheduler's move credit, sleeping and dropped ticks, under a fake clock
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import collections
+import unittest
+
+import gameAI
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class Monster:
+    # Just what the scheduler looks at: a position and the species name
+    def __init__(self, name, position=(0, 0)):
+        self.position = list(position)
+        self.data = {'name': name}
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.moves = collections.Counter()
+
+    def move(self, monster):
+        self.moves[monster] += 1
+
+    def scheduler(self, **kwargs):
+        # A tick every quarter second, which a float adds up exactly
+        settings = {'tickRate': 4, 'buckets': 1, 'budget': None, 'wakeRadius': None, 'clock': self.clock}
+        settings.update(kwargs)
+        scheduler = gameAI.AIScheduler(**settings)
+        # The first update only starts the scheduler's clock
+        scheduler.update([], [0, 0], self.move)
+        return scheduler
+
+    def play(self, scheduler, monsters, seconds, player=(0, 0)):
+        for frame in range(int(seconds * 4)):
+            self.clock.now += 0.25
+            scheduler.update(monsters, list(player), self.move)
+
+    def test_moves_follow_the_species_rate(self):
+        # Goblins move twice a second and Ogres once every two seconds (data/species.json)
+        goblin, ogre = Monster('Goblin'), Monster('Ogre')
+        scheduler = self.scheduler()
+        self.play(scheduler, [goblin, ogre], 10)
+        # Credit starts at each monster's first visit, a quarter second in
+        self.assertEqual(self.moves[goblin], 19)
+        self.assertEqual(self.moves[ogre], 4)
+        self.assertEqual(scheduler.ticks, 40)
+
+    def test_buckets_take_turns(self):
+        monsters = [Monster('Goblin') for index in range(8)]
+        scheduler = self.scheduler(buckets=4)
+        self.play(scheduler, monsters, 4)
+        for tick in range(8):
+            self.moves.clear()
+            self.play(scheduler, monsters, 0.25)
+            bucket = scheduler.ticks - 1
+            self.assertEqual(set(self.moves), {monster for index, monster in enumerate(monsters) if index % 4 == bucket % 4})
+            # A visit every second makes up for a whole second of moves
+            self.assertEqual(set(self.moves.values()), {2})
+
+    def test_sleeping_monsters_wake_without_catching_up(self):
+        near, far = Monster('Goblin', (2, 2)), Monster('Goblin', (100, 100))
+        scheduler = self.scheduler(wakeRadius=5)
+        self.play(scheduler, [near, far], 5)
+        self.assertEqual(self.moves[far], 0)
+        self.assertEqual(scheduler.sleeping, 1)
+
+        self.play(scheduler, [near, far], 1, player=(100, 100))
+        self.assertEqual(scheduler.sleeping, 1)
+        # One second awake is worth two moves, however long it slept
+        self.assertEqual(self.moves[far], 2)
+
+    def test_ticks_far_behind_are_dropped(self):
+        monster = Monster('Goblin')
+        scheduler = self.scheduler(maxTicksBehind=5)
+        self.play(scheduler, [monster], 1)
+        before = self.moves[monster]
+        self.clock.now += 10
+        scheduler.update([monster], [0, 0], self.move)
+        self.assertEqual(scheduler.droppedTicks, 35)
+        self.assertEqual(scheduler.ticks, 4 + 5)
+        # The first visit after the jump is capped; the others only owe a quarter second each
+        self.assertLessEqual(self.moves[monster] - before, gameAI.AIScheduler.MAX_MOVES_PER_VISIT + 4)
+
+    def test_restart_forgets_the_pause(self):
+        monster = Monster('Goblin')
+        scheduler = self.scheduler()
+        self.play(scheduler, [monster], 1)
+        ticks = scheduler.ticks
+        self.clock.now += 100
+        scheduler.restart()
+        self.assertEqual(scheduler.update([monster], [0, 0], self.move), 0)
+        self.assertEqual((scheduler.ticks, scheduler.droppedTicks), (ticks, 0))
+
+    def test_tick_over_budget_carries_on_next_frame(self):
+        monsters = [Monster('Goblin') for index in range(100)]
+        # No time at all: each frame stops at the first budget check, every 32 monsters
+        scheduler = self.scheduler(budget=0.0)
+        self.clock.now += 0.25
+        for frames in range(1, 10):
+            scheduler.update(monsters, [0, 0], self.move)
+            if scheduler.ticks:
+                break
+        self.assertEqual(frames, 4)
+        self.assertEqual(len(scheduler._state), 100)
+        # The next tick is not due yet, so the frame after does nothing
+        scheduler.update(monsters, [0, 0], self.move)
+        self.assertEqual(scheduler.ticks, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests for CombatEngine giving the same fights as the original fight_monster loop
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import math
+import random
+import unittest
+
+import gameCombat
+import gameEntities
+
+def baseline_fight(monster, enemy, strategy, rng):
+    # The rules of the original fight_monster, with the printing, input and sleeps taken out.
+    # strategy is 'attack', 'weapon' or 'potion', chosen the way gameCombat.STRATEGIES choose.
+    weapon_used = False
+    turns = 0
+    while monster["health"] > 0 and enemy["health"] > 0:
+        turns += 1
+        weapons = [item for item in monster["inventory"] if item["type"] == "weapon"]
+        potions = [item for item in monster["inventory"] if item["type"] == "consumable" and item["name"] == "Potion"]
+        if strategy == 'weapon' and not weapon_used and weapons:
+            weapon = weapons[0]
+            weapon_used = True
+            weapon['currentDurability'] -= 10
+            if weapon['currentDurability'] <= 0:
+                monster["inventory"].remove(weapon)
+        elif strategy == 'potion' and potions:
+            enemy["health"] = 0
+            monster["inventory"].remove(potions[0])
+        else:
+            base_damage = monster["power"]
+            if weapon_used:
+                base_damage += 20
+                weapon_used = False
+                damage_enemy = math.floor(base_damage * rng.uniform(0.8, 1.2))
+            else:
+                damage_enemy = math.floor(base_damage * rng.uniform(0.3, 0.8))
+            enemy["health"] -= damage_enemy
+            if enemy["health"] <= 0:
+                enemy["health"] = 0
+            if enemy["health"] > 0:
+                damage = math.floor(enemy["power"] * rng.random())
+                monster["health"] -= damage
+                if monster["health"] <= 0:
+                    monster["health"] = 0
+    if monster["health"] <= 0:
+        monster["money"] = monster["money"] // 2
+        outcome = gameCombat.LOST
+    else:
+        monster["money"] += enemy["money"]
+        outcome = gameCombat.WON
+    return outcome, turns
+
+def make_fighters(health, power, potions, swords):
+    player = gameEntities.Monster('Hero', 'The player.', health, power, 50)
+    player['inventory'].add(gameEntities.make_item('Potion'), potions)
+    player['inventory'].add(gameEntities.make_item('Sword'), swords)
+    enemy = gameEntities.Monster('Troll', 'A troll.', 120, 14, 30)
+    return player, enemy
+
+def as_dicts(monster):
+    # The original game kept monsters as dictionaries with one inventory entry per unit
+    data = monster.to_dict()
+    items = []
+    for item in data['inventory']:
+        count = item.pop('count', 1)
+        items.extend(dict(item) for unit in range(count))
+    data['inventory'] = items
+    return data
+
+class BaselineParityTest(unittest.TestCase):
+    def check(self, strategy, seed, health=60, power=12, potions=0, swords=0):
+        player, enemy = make_fighters(health, power, potions, swords)
+        basePlayer, baseEnemy = as_dicts(player), as_dicts(enemy)
+        outcome, turns = baseline_fight(basePlayer, baseEnemy, strategy, random.Random(seed))
+
+        result = gameCombat.simulate_fight(player, enemy, strategy, random.Random(seed))
+        self.assertEqual((result['outcome'], result['turns']), (outcome, turns))
+        self.assertEqual((player['health'], player['money'], enemy['health']),
+                         (basePlayer['health'], basePlayer['money'], baseEnemy['health']))
+        self.assertEqual(as_dicts(player)['inventory'], basePlayer['inventory'])
+
+    def test_attack(self):
+        for seed in range(20):
+            with self.subTest(seed=seed):
+                self.check('attack', seed)
+
+    def test_weapon(self):
+        for seed in range(20):
+            with self.subTest(seed=seed):
+                self.check('weapon', seed, swords=2)
+
+    def test_weak_player_loses_like_the_baseline(self):
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                self.check('attack', seed, health=15, power=3)
+
+    def test_potion(self):
+        self.check('potion', 0, potions=2)
+
+    def test_run_drops_the_same_gold(self):
+        player, enemy = make_fighters(60, 12, 0, 0)
+        result = gameCombat.simulate_fight(player, enemy, 'run', random.Random(5))
+        self.assertEqual(result['outcome'], gameCombat.RAN)
+        self.assertEqual(result['gold'], -random.Random(5).randint(1, 10))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for stacking items in an Inventory
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import unittest
+
+import gameEntities
+
+class InventoryTest(unittest.TestCase):
+    def test_identical_items_share_a_stack(self):
+        inventory = gameEntities.Inventory()
+        inventory.add(gameEntities.make_item('Potion'), 3)
+        inventory.add(gameEntities.make_item('Potion'))
+        inventory.add(gameEntities.make_item('Sword', currentDurability=80), 2)
+        inventory.add(gameEntities.make_item('Sword', currentDurability=50))
+        self.assertEqual(len(inventory), 7)
+        self.assertEqual(inventory.count(gameEntities.make_item('Potion')), 4)
+        self.assertEqual(inventory.count(gameEntities.make_item('Sword', currentDurability=80)), 2)
+        self.assertEqual([item['name'] for item in inventory.stacks()], ['Potion', 'Sword', 'Sword'])
+        self.assertEqual([weapon['currentDurability'] for weapon in inventory.weapons()], [80, 50])
+        self.assertEqual([item['name'] for item in inventory.consumables()], ['Potion'])
+        self.assertEqual(len(list(inventory)), 7)
+
+    def test_remove_use_and_wear(self):
+        inventory = gameEntities.Inventory()
+        potion = gameEntities.make_item('Potion')
+        sword = gameEntities.make_item('Sword', currentDurability=15)
+        inventory.add(potion, 2)
+        inventory.add(sword)
+        self.assertEqual(inventory.use('Potion')['name'], 'Potion')
+        self.assertEqual(inventory.count(potion), 1)
+        inventory.remove(potion)
+        self.assertNotIn(potion, inventory)
+        self.assertIsNone(inventory.use('Potion'))
+        with self.assertRaises(ValueError):
+            inventory.remove(potion)
+
+        worn = inventory.wear(sword, 10)
+        self.assertEqual(worn['currentDurability'], 5)
+        self.assertEqual(inventory.weapons()[0]['currentDurability'], 5)
+        broken = inventory.wear(worn, 10)
+        self.assertLessEqual(broken['currentDurability'], 0)
+        self.assertFalse(inventory)
+
+    def test_worn_weapon_keeps_its_place(self):
+        inventory = gameEntities.Inventory()
+        inventory.add(gameEntities.make_item('Potion'))
+        inventory.add(gameEntities.make_item('Sword'), 2)
+        worn = inventory.wear(inventory.weapons()[0], 10)
+        worn = inventory.wear(worn, 10)
+        self.assertEqual([item.get('currentDurability') for item in inventory.stacks()], [None, 80, 100])
+        self.assertEqual(len(inventory), 3)
+
+    def test_list_round_trip(self):
+        inventory = gameEntities.Inventory()
+        inventory.add(gameEntities.make_item('Potion'), 3)
+        inventory.add(gameEntities.make_item('Sword', currentDurability=70))
+        data = inventory.to_list()
+        self.assertEqual(data, [{'name': 'Potion', 'type': 'consumable', 'price': 100, 'count': 3},
+                                {'name': 'Sword', 'type': 'weapon', 'price': 15, 'power': 10, 'maxDurability': 100, 'currentDurability': 70}])
+        copy = gameEntities.Inventory.from_list(data)
+        self.assertEqual(copy.to_list(), data)
+        self.assertEqual(len(copy), 4)
+        # Older saves list every unit on its own
+        old = gameEntities.Inventory.from_list([{'name': 'Potion', 'type': 'consumable', 'price': 100}] * 2)
+        self.assertEqual(old.to_list(), [{'name': 'Potion', 'type': 'consumable', 'price': 100, 'count': 2}])
+
+    def test_empty_inventories_share_nothing_they_write_to(self):
+        first = gameEntities.Monster('Goblin', 'A goblin.', 10, 2, 3)
+        second = gameEntities.Monster('Goblin', 'A goblin.', 10, 2, 3)
+        first['inventory'].add(gameEntities.make_item('Potion'))
+        self.assertEqual(len(first['inventory']), 1)
+        self.assertEqual(len(second['inventory']), 0)
+        self.assertEqual(second['inventory'].to_list(), [])
+        copy = first.copy()
+        copy['inventory'].add(gameEntities.make_item('Potion'))
+        self.assertEqual(len(first['inventory']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
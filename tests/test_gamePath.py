@@ -0,0 +1,78 @@
+"""
+Tests for DistanceField keeping its distances right as obstacles come and go
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import random
+import unittest
+
+import gamePath
+
+def all_distances(field, width, height):
+    return [[field.distance((x, y)) for x in range(width)] for y in range(height)]
+
+class RemoveObstacleTest(unittest.TestCase):
+    def check_against_rebuild(self, seed, radius=None, terrain=()):
+        rng = random.Random(seed)
+        width = height = 16
+        cells = [(x, y) for x in range(width) for y in range(height)]
+        target = rng.choice(cells)
+        walls = [cell for cell in rng.sample(cells, 90) if cell != target and cell not in terrain]
+        terrainCells = set(terrain)
+
+        def obstacles(left, top, windowWidth, windowHeight):
+            return [(x, y) for x, y in terrainCells if left <= x < left + windowWidth and top <= y < top + windowHeight]
+
+        field = gamePath.DistanceField(width, height, radius=radius, blocked=walls, obstacles=obstacles)
+        field.set_target(target)
+        field.distance(target)
+        builds = field.builds
+        rng.shuffle(walls)
+        for wall in walls:
+            field.remove_obstacle(wall)
+            rebuilt = gamePath.DistanceField(width, height, radius=radius, blocked=field.blocked, obstacles=obstacles)
+            rebuilt.set_target(target)
+            self.assertEqual(all_distances(field, width, height), all_distances(rebuilt, width, height), f'after removing {wall}')
+        # Every removal was patched up in place
+        self.assertEqual(field.builds, builds)
+
+    def test_whole_grid(self):
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                self.check_against_rebuild(seed)
+
+    def test_with_radius(self):
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                self.check_against_rebuild(seed, radius=5)
+
+    def test_with_terrain(self):
+        # Terrain from the map stays blocked while the walls around it are removed
+        terrain = [(x, 8) for x in range(2, 14)]
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                self.check_against_rebuild(seed, terrain=terrain)
+
+    def test_removing_a_wall_opens_a_shorter_way(self):
+        wall = [(2, y) for y in range(5)]
+        field = gamePath.DistanceField(5, 5, blocked=wall)
+        field.set_target((0, 0))
+        self.assertEqual(field.distance((4, 0)), gamePath.UNREACHED)
+        field.remove_obstacle((2, 4))
+        self.assertEqual(field.distance((4, 0)), 12)
+        field.remove_obstacle((2, 0))
+        self.assertEqual(field.distance((4, 0)), 4)
+        self.assertEqual(field.next_step([4, 0]), (3, 0))
+        self.assertEqual(field.builds, 1)
+
+    def test_adding_an_obstacle_rebuilds(self):
+        field = gamePath.DistanceField(5, 5)
+        field.set_target((0, 0))
+        self.assertEqual(field.distance((2, 0)), 2)
+        field.add_obstacle((1, 0))
+        self.assertEqual(field.distance((2, 0)), 4)
+        self.assertEqual(field.builds, 2)
+
+if __name__ == '__main__':
+    unittest.main()
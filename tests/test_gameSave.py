@@ -0,0 +1,135 @@
+"""
+Tests for save slots surviving crashes and being shared between server workers
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+import gameEntities
+import gameSave
+
+class JournalReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.directory = self.folder.name
+
+    def journal_lines(self, saves, slot):
+        with open(saves._path(slot, gameSave.JOURNAL_SUFFIX), 'rb') as file:
+            return file.read().splitlines()
+
+    def test_changes_are_journalled_and_replayed(self):
+        saves = gameSave.SaveManager(self.directory)
+        monster = gameEntities.Monster('Hero', 'The player.', 30, 5, 10)
+        saves.save('bob', monster, 'bob')
+        with open(saves._path('bob', gameSave.SNAPSHOT_SUFFIX), 'rb') as file:
+            snapshot = file.read()
+
+        monster['money'] = 40
+        monster['inventory'].add(gameEntities.make_item('Potion'), 2)
+        saves.save('bob', monster, 'bob')
+        monster['health'] = 12
+        monster['inventory'].add(gameEntities.make_item('Sword', currentDurability=60))
+        monster['inventory'].use('Potion')
+        saves.save('bob', monster, 'bob')
+        # Saving an unchanged monster writes nothing
+        saves.save('bob', monster, 'bob')
+
+        self.assertEqual(len(self.journal_lines(saves, 'bob')), 2)
+        with open(saves._path('bob', gameSave.SNAPSHOT_SUFFIX), 'rb') as file:
+            self.assertEqual(file.read(), snapshot)
+
+        loaded, username = gameSave.SaveManager(self.directory).load('bob')
+        self.assertEqual(username, 'bob')
+        self.assertEqual(loaded.to_dict(), monster.to_dict())
+        summary = gameSave.SaveManager(self.directory).summary('bob')
+        self.assertEqual((summary['health'], summary['money']), (12, 40))
+
+    def test_long_journal_is_folded_into_a_snapshot(self):
+        saves = gameSave.SaveManager(self.directory, compactEvery=3)
+        monster = gameEntities.Monster('Hero', 'The player.', 30, 5, 0)
+        for money in range(1, 6):
+            monster['money'] = money
+            saves.save('bob', monster, 'bob')
+        # Saves 2 and 3 were journalled, save 4 folded them into a snapshot and save 5 started a new journal
+        self.assertEqual(len(self.journal_lines(saves, 'bob')), 1)
+        self.assertEqual(gameSave.SaveManager(self.directory).load('bob')[0]['money'], 5)
+
+    def test_entries_already_in_the_snapshot_are_skipped(self):
+        saves = gameSave.SaveManager(self.directory)
+        monster = gameEntities.Monster('Hero', 'The player.', 30, 5, 0)
+        saves.save('bob', monster, 'bob')
+        monster['money'] = 7
+        saves.save('bob', monster, 'bob')
+        journal = self.journal_lines(saves, 'bob')
+        monster['money'] = 9
+        saves.save('bob', monster, 'bob')
+        saves.compact('bob')
+        # A crash after writing the snapshot but before removing the journal leaves the old entries behind
+        with open(saves._path('bob', gameSave.JOURNAL_SUFFIX), 'wb') as file:
+            file.write(b'\n'.join(journal) + b'\n')
+
+        self.assertEqual(gameSave.SaveManager(self.directory).load('bob')[0]['money'], 9)
+        self.assertEqual(gameSave.SaveManager(self.directory).summary('bob')['money'], 9)
+
+class JournalCrashTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.directory = self.folder.name
+
+    def test_save_after_torn_journal_line(self):
+        saves = gameSave.SaveManager(self.directory)
+        monster = gameEntities.Monster('Hero', 'The player.', 30, 5, 1)
+        saves.save('bob', monster, 'bob')
+        monster['money'] = 2
+        saves.save('bob', monster, 'bob')
+        # A crash half way through appending the next entry
+        with open(saves._path('bob', gameSave.JOURNAL_SUFFIX), 'ab') as file:
+            file.write(b'{"set":{"money":3')
+
+        saves = gameSave.SaveManager(self.directory)
+        monster, username = saves.load('bob')
+        self.assertEqual(monster['money'], 2)
+        monster['money'] = 60
+        saves.save('bob', monster, 'bob')
+        monster['money'] = 70
+        saves.save('bob', monster, 'bob')
+
+        monster, username = gameSave.SaveManager(self.directory).load('bob')
+        self.assertEqual(monster['money'], 70)
+        with open(saves._path('bob', gameSave.JOURNAL_SUFFIX), 'rb') as file:
+            self.assertTrue(file.read().endswith(b'\n'))
+
+class SharedSlotTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.directory = self.folder.name
+
+    def test_new_game_after_another_worker_saved_the_slot(self):
+        # Two workers of one server, sharing the save folder
+        workerA = gameSave.SaveManager(self.directory)
+        workerB = gameSave.SaveManager(self.directory)
+        self.assertTrue(workerB.claim('bob'))
+        workerB.save('bob', gameEntities.Monster('Goblin', 'A goblin.', 30, 3, 5), 'bob')
+        workerB.release('bob')
+
+        self.assertTrue(workerA.claim('bob'))
+        monster, username = workerA.load('bob')
+        workerA.save('bob', gameEntities.Monster('Dragon', 'A dragon.', 1, 9, 999), 'bob')
+        workerA.release('bob')
+
+        # "new bob" on worker B saves without loading the slot first
+        self.assertTrue(workerB.claim('bob'))
+        workerB.save('bob', gameEntities.Monster('Goblin', 'A goblin.', 12, 3, 20), 'bob')
+        workerB.release('bob')
+
+        monster, username = gameSave.SaveManager(self.directory).load('bob')
+        self.assertEqual((monster['name'], monster['health'], monster['money']), ('Goblin', 12, 20))
+
+if __name__ == '__main__':
+    unittest.main()
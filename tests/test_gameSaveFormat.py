@@ -0,0 +1,81 @@
+"""
+Tests for the binary save snapshot format
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import os
+import tempfile
+import unittest
+
+import gameEntities
+import gameSaveFormat
+
+def make_state(health=30, power=5, money=10):
+    monster = gameEntities.Monster('Hero', 'The player.', health, power, money)
+    monster['inventory'].add(gameEntities.make_item('Potion'), 2)
+    monster['inventory'].add(gameEntities.make_item('Sword', currentDurability=40))
+    return {'username': 'bob', 'monster': monster.to_dict()}
+
+class RoundTripTest(unittest.TestCase):
+    def test_integer_summary(self):
+        state = make_state()
+        self.assertEqual(gameSaveFormat.decode_state(gameSaveFormat.encode_state(state, 7)), (state, 7))
+
+    def test_float_summary(self):
+        state = make_state(health=29.5, power=5, money=12.25)
+        decoded, sequence = gameSaveFormat.decode_state(gameSaveFormat.encode_state(state, 3))
+        self.assertEqual(decoded, state)
+        self.assertIsInstance(decoded['monster']['power'], int)
+        self.assertIsInstance(decoded['monster']['money'], float)
+
+    def test_summary_read_from_a_file(self):
+        state = make_state(money=0.1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bob.sav')
+            with open(path, 'wb') as file:
+                file.write(gameSaveFormat.encode_state(state, 2))
+            summary = gameSaveFormat.read_summary(path)
+            self.assertEqual((summary['seq'], summary['username'], summary['money']), (2, 'bob', 0.1))
+            self.assertEqual(gameSaveFormat.SaveFile(path).state(), (state, 2))
+
+    def test_other_money_is_rejected(self):
+        state = make_state(money='10')
+        with self.assertRaises(TypeError):
+            gameSaveFormat.encode_state(state)
+
+    def test_version_1_snapshot(self):
+        # Version 1 summaries had no flags and only integer numbers
+        state = make_state()
+        data = gameSaveFormat.encode_state(state, 4)
+        version, table = gameSaveFormat._read_table(lambda offset, length: data[offset:offset + length])
+        summary = b''.join([
+            gameSaveFormat._SUMMARY_V1.pack(4, 30, 5, 10),
+            gameSaveFormat._pack_string('bob'),
+            gameSaveFormat._pack_string('Hero'),
+            gameSaveFormat._pack_string('The player.'),
+        ])
+        sections = [(b'SUMM', summary)] + [(tag, data[offset:offset + length]) for tag, (offset, length) in table.items() if tag != b'SUMM']
+        offset = gameSaveFormat._HEADER.size + gameSaveFormat._SECTION.size * len(sections)
+        entries = []
+        for tag, section in sections:
+            entries.append(gameSaveFormat._SECTION.pack(tag, offset, len(section)))
+            offset += len(section)
+        old = b''.join([gameSaveFormat._HEADER.pack(gameSaveFormat.MAGIC, 1, len(sections))] + entries + [section for tag, section in sections])
+        self.assertEqual(gameSaveFormat.decode_state(old), (state, 4))
+
+class DamagedDataTest(unittest.TestCase):
+    def test_damaged_data_raises_save_format_error(self):
+        data = gameSaveFormat.encode_state(make_state(), 1)
+        for damaged in (b'', b'AGSV', b'not a save at all', data[:len(data) // 2], data[:-1]):
+            with self.assertRaises(gameSaveFormat.SaveFormatError):
+                gameSaveFormat.decode_state(damaged)
+
+    def test_newer_version_is_refused(self):
+        data = bytearray(gameSaveFormat.encode_state(make_state(), 1))
+        gameSaveFormat._HEADER.pack_into(data, 0, gameSaveFormat.MAGIC, gameSaveFormat.VERSION + 1, 3)
+        with self.assertRaisesRegex(gameSaveFormat.SaveFormatError, 'newer version'):
+            gameSaveFormat.decode_state(bytes(data))
+
+if __name__ == '__main__':
+    unittest.main()
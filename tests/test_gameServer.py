@@ -0,0 +1,54 @@
+"""
+Tests for the game server keeping a connection going when a command fails
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+
+import gameEntities
+import gamePacing
+import gameSave
+import gameServer
+
+class FailedCommandTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.addCleanup(gamePacing.configure, gamePacing.pacer.mode, gamePacing.pacer.scale)
+        gamePacing.configure(gamePacing.INSTANT)
+
+    def test_damaged_save_is_reported_and_the_session_goes_on(self):
+        saves = gameSave.SaveManager(self.folder.name)
+        saves.save('bob', gameEntities.Monster('Hero', 'The player.', 30, 5, 10), 'bob')
+        with open(saves._path('bob', gameSave.SNAPSHOT_SUFFIX), 'wb') as file:
+            file.write(b'damaged')
+
+        async def play():
+            server = await gameServer.GameServer(saves).start(port=0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            responses = [json.loads(await reader.readline())]
+            for line in ('load bob', 'new alice', 'quit'):
+                writer.write(line.encode() + b'\n')
+                await writer.drain()
+                responses.append(json.loads(await reader.readline()))
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            greeting, load, new, quit = asyncio.run(play())
+        self.assertFalse(load['ok'])
+        self.assertEqual(load['mode'], gameServer.START)
+        self.assertTrue(new['ok'])
+        self.assertEqual(new['mode'], gameServer.MAP)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for shop checkouts matching purchase_item, all or nothing and partial
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import random
+import unittest
+
+import gameEntities
+import gamefunctions
+import gameShop
+
+def new_shop():
+    return gameShop.Shop(stock=[gameEntities.make_item('Potion'), gameEntities.make_item('Sword', currentDurability=90)])
+
+def new_player(money):
+    return gameEntities.Monster('Hero', 'The player.', 30, 5, money)
+
+def one_at_a_time(shop, money, order):
+    # What the shop menu does: purchase_item for each line against the money left after the ones before
+    bought = []
+    for name, quantity in order:
+        count, money = gamefunctions.purchase_item(shop.find(name)['price'], money, quantity)
+        bought.append(count)
+    return bought, money
+
+class CheckoutTest(unittest.TestCase):
+    def test_affordable_cart(self):
+        shop = new_shop()
+        player = new_player(1000)
+        receipt = shop.checkout(player, shop.cart().add('Potion', 3).add('sword', 2).add('Potion'))
+        self.assertTrue(receipt.ok)
+        self.assertEqual([(line.name, line.requested, line.bought) for line in receipt.lines], [('Potion', 4, 4), ('Sword', 2, 2)])
+        self.assertEqual((receipt.total, player['money']), (430, 570))
+        self.assertEqual(player['inventory'].count(gameEntities.make_item('Potion')), 4)
+        self.assertEqual(player['inventory'].count(gameEntities.make_item('Sword', currentDurability=90)), 2)
+        self.assertEqual((shop.transactions, shop.unitsSold, shop.revenue), (1, 6, 430))
+
+    def test_all_or_nothing(self):
+        shop = new_shop()
+        player = new_player(250)
+        receipt = shop.checkout(player, shop.cart().add('Potion', 2).add('Sword', 4))
+        self.assertFalse(receipt.ok)
+        # The receipt still says what the player could have had
+        self.assertEqual([line.bought for line in receipt.lines], [2, 3])
+        self.assertEqual((receipt.total, receipt.moneyBefore, receipt.moneyAfter), (0, 250, 250))
+        self.assertEqual(player['money'], 250)
+        self.assertEqual(len(player['inventory']), 0)
+        self.assertEqual((shop.transactions, len(shop.log)), (0, 1))
+
+    def test_partial(self):
+        shop = new_shop()
+        player = new_player(250)
+        receipt = shop.checkout(player, shop.cart().add('Potion', 2).add('Sword', 4), partial=True)
+        self.assertTrue(receipt.ok)
+        self.assertEqual([line.bought for line in receipt.lines], [2, 3])
+        self.assertEqual((receipt.total, player['money']), (245, 5))
+        self.assertEqual(len(player['inventory']), 5)
+
+    def test_nothing_affordable_is_refused_even_partly(self):
+        shop = new_shop()
+        player = new_player(10)
+        receipt = shop.checkout(player, shop.cart().add('Potion').add('Sword'), partial=True)
+        self.assertFalse(receipt.ok)
+        self.assertEqual(player['money'], 10)
+
+    def test_matches_purchase_item(self):
+        rng = random.Random(3)
+        shop = new_shop()
+        for trial in range(200):
+            money = rng.randint(0, 2000)
+            order = [(rng.choice(['Potion', 'Sword']), rng.randint(1, 20)) for line in range(rng.randint(1, 4))]
+            bought, left = one_at_a_time(shop, money, order)
+            for partial in (False, True):
+                with self.subTest(trial=trial, partial=partial):
+                    player = new_player(money)
+                    cart = shop.cart()
+                    for name, quantity in order:
+                        cart.add(name, quantity)
+                    receipt = shop.checkout(player, cart, partial=partial)
+                    # The cart adds up lines for the same item, so compare what it was asked for in total
+                    wanted = {}
+                    for name, quantity in order:
+                        wanted[name] = wanted.get(name, 0) + quantity
+                    expected, expectedLeft = one_at_a_time(shop, money, list(wanted.items()))
+                    self.assertEqual([line.bought for line in receipt.lines], expected)
+                    complete = expected == list(wanted.values())
+                    if complete or (partial and any(expected)):
+                        self.assertEqual(player['money'], expectedLeft)
+                        self.assertEqual(len(player['inventory']), sum(expected))
+                    else:
+                        self.assertEqual(player['money'], money)
+                        self.assertEqual(len(player['inventory']), 0)
+            # One line at a time gives the same as the shop menu
+            player = new_player(money)
+            for (name, quantity), count in zip(order, bought):
+                self.assertEqual(shop.buy(player, name, quantity).lines[0].bought, count)
+            self.assertEqual(player['money'], left)
+
+class CartTest(unittest.TestCase):
+    def test_bad_lines_are_refused(self):
+        cart = new_shop().cart()
+        with self.assertRaises(KeyError):
+            cart.add('Shield')
+        with self.assertRaises(ValueError):
+            cart.add('Potion', 0)
+        cart.add('Potion', 2).add('Sword')
+        cart.remove('POTION')
+        self.assertEqual((len(cart), cart.total()), (1, 15))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for picking a save to load from the console menu
+
+Run from the game folder:
+    python -m pytest tests
+"""
+import tempfile
+import unittest
+from unittest import mock
+
+import gameEntities
+import gamefunctions
+import gameSave
+import gameScreen
+
+class LoadGameTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        self.saves = gameSave.SaveManager(self.folder.name)
+        patcher = mock.patch.object(gamefunctions, 'saves', self.saves)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.output = gameScreen.MemorySink()
+        redirect = gameScreen.redirect(self.output)
+        redirect.__enter__()
+        self.addCleanup(redirect.__exit__, None, None, None)
+
+        self.saves.save('alice', gameEntities.Monster('Goblin', 'A goblin.', 20, 3, 15), 'alice')
+        self.saves.save('alice' + gameSave.AUTOSAVE_SUFFIX, gameEntities.Monster('Goblin', 'A goblin.', 18, 3, 25), 'alice')
+        self.saves.save('bob', gameEntities.Monster('Troll', 'A troll.', 40, 6, 5), 'bob')
+        with open(self.saves._path('bob', gameSave.SNAPSHOT_SUFFIX), 'wb') as file:
+            file.write(b'damaged')
+        # A journal left behind after its snapshot was deleted
+        with open(self.saves._path('carol', gameSave.JOURNAL_SUFFIX), 'wb') as file:
+            file.write(b'{"seq":1,"set":{"money":3}}\n')
+
+    def load(self, choice):
+        with mock.patch('builtins.input', return_value=choice):
+            return gamefunctions.load_game()
+
+    def test_every_slot_is_listed(self):
+        monster, username = self.load('9')
+        self.assertIsNone(monster)
+        text = self.output.text()
+        self.assertIn('1) alice - Goblin, 20 HP, 15 Gold', text)
+        self.assertIn('2) alice (autosave) - Goblin, 18 HP, 25 Gold', text)
+        self.assertIn('3) bob - details unavailable', text)
+        self.assertIn('4) carol - details unavailable', text)
+
+    def test_autosave_loads(self):
+        monster, username = self.load('2')
+        self.assertEqual((username, monster['money']), ('alice', 25))
+
+    def test_damaged_save_is_reported(self):
+        monster, username = self.load('3')
+        self.assertEqual((monster, username), (None, None))
+        self.assertIn('Could not load the save "bob"', self.output.text())
+
+    def test_journal_without_a_snapshot_loads_nothing(self):
+        self.assertEqual(self.load('4'), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()